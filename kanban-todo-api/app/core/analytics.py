@@ -0,0 +1,122 @@
+"""
+Flow analytics của board từ task_events (app.database.history).
+
+- Lead time: từ lúc task được tạo tới lúc done
+- Cycle time: từ lần đầu chuyển sang in_progress tới lúc done
+- Throughput: số task done mỗi ngày trong cửa sổ `days` ngày
+
+Event được đọc theo (task_id, id) nhờ index (board_id, task_id) rồi đưa vào
+numpy array; mọi bước tính theo task (event đầu/cuối, lần đầu in_progress,
+percentiles, đếm theo ngày) đều vectorized, không lặp Python theo event.
+Task được tính là done nếu event cuối cùng của nó đưa task vào done (task bị
+mở lại thì không tính). Task có từ trước khi có task_events không có event
+"created" nên chỉ được tính cycle time/throughput.
+"""
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.database.models import TaskEvent, StatusEnum
+from app.schemas.board import BoardAnalytics, DurationStats, ThroughputPoint
+
+CREATED, MOVED, DELETED = 0, 1, 2
+EVENT_CODES = {"created": CREATED, "moved": MOVED, "deleted": DELETED}
+STATUS_CODES = {StatusEnum.todo: 0, StatusEnum.in_progress: 1, StatusEnum.done: 2}
+IN_PROGRESS, DONE = STATUS_CODES[StatusEnum.in_progress], STATUS_CODES[StatusEnum.done]
+PERCENTILES = (50, 85, 95)
+EPOCH = np.datetime64("1970-01-01T00:00:00", "us")
+
+EventArrays = Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]  # task_ids, types, statuses, timestamps (s)
+
+
+def load_board_events(db: Session, board_id: int) -> EventArrays:
+    """Event created/moved/deleted của board dưới dạng các cột numpy, sắp xếp theo (task_id, id)"""
+    stmt = (
+        select(TaskEvent.task_id, TaskEvent.type, TaskEvent.to_status, TaskEvent.created_at)
+        .where(TaskEvent.board_id == board_id, TaskEvent.type != "assigned")
+        .order_by(TaskEvent.task_id, TaskEvent.id)
+    )
+    rows = db.execute(stmt).all()
+    count = len(rows)
+    if count == 0:
+        empty = np.empty(0)
+        return empty.astype(np.int64), empty.astype(np.int8), empty.astype(np.int8), empty
+    task_ids, types, statuses, created = zip(*rows)
+    return (
+        np.fromiter(task_ids, dtype=np.int64, count=count),
+        np.fromiter((EVENT_CODES[t] for t in types), dtype=np.int8, count=count),
+        np.fromiter((STATUS_CODES.get(s, -1) for s in statuses), dtype=np.int8, count=count),
+        (np.array(created, dtype="datetime64[us]") - EPOCH) / np.timedelta64(1, "s"),
+    )
+
+
+def _duration_stats(hours: np.ndarray) -> DurationStats:
+    if hours.size == 0:
+        return DurationStats(count=0)
+    p50, p85, p95 = np.percentile(hours, PERCENTILES)
+    return DurationStats(
+        count=int(hours.size),
+        mean_hours=round(float(hours.mean()), 2),
+        p50_hours=round(float(p50), 2),
+        p85_hours=round(float(p85), 2),
+        p95_hours=round(float(p95), 2),
+    )
+
+
+def flow_metrics(events: EventArrays, window_start: float, days: int) -> Dict[str, object]:
+    """Lead time, cycle time và throughput theo ngày cho các task done từ `window_start` (epoch giây)"""
+    task_ids, types, statuses, timestamps = events
+    count = task_ids.size
+    if count == 0:
+        return {"lead_time": _duration_stats(np.empty(0)), "cycle_time": _duration_stats(np.empty(0)),
+                "throughput": np.zeros(days, dtype=np.int64)}
+
+    # Vị trí event đầu/cuối của mỗi task (events đã sort theo task_id, id).
+    # Event "created" luôn bắt đầu vòng đời mới vì SQLite có thể dùng lại id của task đã xóa
+    firsts = np.flatnonzero(np.r_[True, (task_ids[1:] != task_ids[:-1]) | (types[1:] == CREATED)])
+    lasts = np.r_[firsts[1:], count] - 1
+    groups = np.repeat(np.arange(firsts.size), np.diff(np.r_[firsts, count]))
+
+    created_at = np.where(types[firsts] == CREATED, timestamps[firsts], np.nan)
+    done_at = timestamps[lasts]
+    completed = (statuses[lasts] == DONE) & (types[lasts] != DELETED) & (done_at >= window_start)
+
+    # Lần đầu chuyển sang in_progress của mỗi task
+    started_at = np.full(firsts.size, np.nan)
+    in_progress = statuses == IN_PROGRESS
+    started_groups, first_index = np.unique(groups[in_progress], return_index=True)
+    started_at[started_groups] = timestamps[in_progress][first_index]
+
+    lead = (done_at - created_at)[completed & ~np.isnan(created_at)] / 3600
+    cycle = (done_at - started_at)[completed & ~np.isnan(started_at)] / 3600
+
+    day_index = ((done_at[completed] - window_start) // 86400).astype(np.int64)
+    throughput = np.bincount(np.clip(day_index, 0, days - 1), minlength=days)[:days]
+
+    return {"lead_time": _duration_stats(lead), "cycle_time": _duration_stats(cycle), "throughput": throughput}
+
+
+def board_analytics(db: Session, board_id: int, days: int, now: Optional[datetime] = None) -> BoardAnalytics:
+    """Flow metrics của board trong `days` ngày gần nhất"""
+    now = now or datetime.utcnow()
+    start_day = (now - timedelta(days=days - 1)).replace(hour=0, minute=0, second=0, microsecond=0)
+    window_start = (start_day - datetime(1970, 1, 1)).total_seconds()
+
+    metrics = flow_metrics(load_board_events(db, board_id), window_start, days)
+    throughput: List[ThroughputPoint] = [
+        ThroughputPoint(date=(start_day + timedelta(days=i)).date(), completed=int(value))
+        for i, value in enumerate(metrics["throughput"])
+    ]
+    completed = sum(point.completed for point in throughput)
+    return BoardAnalytics(
+        board_id=board_id,
+        days=days,
+        completed=completed,
+        throughput_per_week=round(completed / days * 7, 2),
+        lead_time=metrics["lead_time"],
+        cycle_time=metrics["cycle_time"],
+        throughput=throughput,
+    )
@@ -0,0 +1,175 @@
+"""
+Audit trail cho các thao tác quản trị (sửa/xóa user, đổi role, xóa board).
+
+Request chỉ đưa entry vào một queue trong process (không chạm database),
+background thread gom entry thành batch và ghi vào bảng audit_log bằng một
+câu INSERT nhiều row khi đủ `batch_size` entry hoặc sau `flush_interval`
+kể từ entry đầu tiên của batch.
+
+- Buffer có giới hạn: khi đầy entry mới bị bỏ và được đếm (dropped) thay vì
+  làm request phải chờ
+- Entry được ghi sau khi thao tác đã commit, nên log không chứa thao tác bị
+  rollback: record(..., db=db) giữ entry trong session tới khi unit of work
+  của request commit; entry xuất hiện trong GET /audit sau tối đa một flush interval
+- Lifespan gọi stop() khi shutdown để ghi nốt các entry còn trong buffer
+"""
+import json
+import queue
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import event, insert
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from .config import settings
+from app.database import engine, SessionLocal, AuditLog, User
+
+
+class AuditWriter:
+    """Queue có giới hạn + background thread ghi audit_log theo batch"""
+
+    def __init__(self, engine: Engine, flush_interval: float, batch_size: int, max_buffer: int, enabled: bool = True):
+        self.engine = engine
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.enabled = enabled
+        self._queue: "queue.Queue[Dict[str, Any]]" = queue.Queue(maxsize=max_buffer)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._write_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stats = {"recorded": 0, "written": 0, "dropped": 0, "failed": 0, "batches": 0}
+
+    def _count(self, name: str, value: int = 1) -> None:
+        with self._stats_lock:
+            self._stats[name] += value
+
+    def record(
+        self,
+        action: str,
+        target_type: str,
+        target_id: Optional[int] = None,
+        actor: Optional[User] = None,
+        db: Optional[Session] = None,
+        **details: Any,
+    ) -> None:
+        """
+        Đưa một entry vào buffer, không bao giờ chặn request.
+        Có `db` đang trong transaction: chờ session commit (rollback thì bỏ entry)
+        """
+        if not self.enabled:
+            return
+        entry = {
+            "actor_id": actor.id if actor is not None else None,
+            "action": action,
+            "target_type": target_type,
+            "target_id": target_id,
+            "details": json.dumps(details, ensure_ascii=False, default=str) if details else None,
+            "created_at": datetime.utcnow(),
+        }
+        if db is not None and db.in_transaction():
+            db.info.setdefault("pending_audit", []).append((self, entry))
+            return
+        self._enqueue(entry)
+
+    def _enqueue(self, entry: Dict[str, Any]) -> None:
+        try:
+            self._queue.put_nowait(entry)
+            self._count("recorded")
+        except queue.Full:
+            self._count("dropped")
+
+    def start(self) -> None:
+        if self._thread is not None or not self.enabled:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Dừng background thread và ghi nốt buffer"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    def flush(self) -> None:
+        """Ghi ngay mọi entry đang chờ (đồng bộ)"""
+        while True:
+            batch = self._drain(self.batch_size)
+            if not batch:
+                return
+            self._write(batch)
+
+    def _drain(self, limit: int) -> List[Dict[str, Any]]:
+        batch = []
+        while len(batch) < limit:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _collect(self) -> List[Dict[str, Any]]:
+        """Chờ entry đầu tiên rồi gom tới khi đủ batch_size hoặc hết flush_interval"""
+        try:
+            batch = [self._queue.get(timeout=self.flush_interval)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or self._stop.is_set():
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            batch = self._collect()
+            if batch:
+                self._write(batch)
+
+    def _write(self, batch: List[Dict[str, Any]]) -> None:
+        with self._write_lock:
+            try:
+                with self.engine.begin() as conn:
+                    conn.execute(insert(AuditLog), batch)
+            except Exception as e:
+                # Không retry vô hạn: log lỗi và bỏ batch
+                print(f"⚠️  Audit log write failed ({len(batch)} entries): {e}")
+                self._count("failed", len(batch))
+                return
+        self._count("written", len(batch))
+        self._count("batches")
+
+    def stats(self) -> Dict[str, int]:
+        with self._stats_lock:
+            return {**self._stats, "pending": self._queue.qsize()}
+
+
+audit_log = AuditWriter(
+    engine,
+    flush_interval=settings.audit_flush_interval_ms / 1000,
+    batch_size=settings.audit_batch_size,
+    max_buffer=settings.audit_max_buffer,
+    enabled=settings.audit_enabled,
+)
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _enqueue_committed(session: Session) -> None:
+    for writer, entry in session.info.pop("pending_audit", ()):
+        writer._enqueue(entry)
+
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _discard_rolled_back(session: Session) -> None:
+    session.info.pop("pending_audit", None)
@@ -0,0 +1,294 @@
+"""
+Board event feed cho client real-time (Server-Sent Events).
+
+- Event task created/updated/moved/deleted và board updated/deleted được gom
+  trong flush (app.database.versions) và publish sau khi transaction commit
+- BoardEventHub: pub/sub trong process, mỗi subscriber có một queue giới hạn.
+  Subscriber đọc không kịp (queue đầy) bị ngắt và nhận event "resync" để tải
+  lại board thay vì làm chậm writer hoặc giữ memory không giới hạn
+- BroadcastBackend đưa event tới mọi worker: MemoryBroadcastBackend giao thẳng
+  cho hub của process hiện tại, SQLiteBroadcastBackend ghi event vào một file
+  SQLite dùng chung và mỗi worker poll để nhận (stand-in cho Redis pub/sub
+  hoặc Postgres LISTEN/NOTIFY)
+"""
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, NamedTuple, Optional, Set
+
+from .config import settings
+from app.database import ChangeSet, register_change_listener
+
+
+class BoardEvent(NamedTuple):
+    type: str
+    data: str  # JSON đã serialize sẵn, dùng chung cho mọi subscriber
+
+
+Deliver = Callable[[int, BoardEvent], None]
+
+
+class Subscription:
+    """Queue event của một client đang nghe một board"""
+
+    def __init__(self, board_id: int, loop: asyncio.AbstractEventLoop, max_queue: int):
+        self.board_id = board_id
+        self.loop = loop
+        self.queue: "asyncio.Queue[Optional[BoardEvent]]" = asyncio.Queue(maxsize=max_queue)
+        self.overflowed = False
+
+    def push(self, event: BoardEvent) -> bool:
+        """Chạy trên event loop của subscriber. False nếu queue đầy (subscriber bị ngắt)"""
+        if self.overflowed:
+            return False
+        try:
+            self.queue.put_nowait(event)
+            return True
+        except asyncio.QueueFull:
+            # Bỏ các event đang chờ, chỉ để lại tín hiệu resync
+            self.overflowed = True
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(None)
+            return False
+
+    async def get(self) -> Optional[BoardEvent]:
+        """Event tiếp theo, None nghĩa là đã bị ngắt vì đọc không kịp"""
+        return await self.queue.get()
+
+
+class BroadcastBackend(ABC):
+    """Interface đưa event tới hub của mọi worker"""
+
+    @abstractmethod
+    def publish(self, board_id: int, event: BoardEvent) -> None:
+        """Gửi event của board tới mọi worker"""
+
+    @abstractmethod
+    def start(self, deliver: Deliver) -> None:
+        """Bắt đầu giao event cho hub của process hiện tại"""
+
+    def stop(self) -> None:
+        pass
+
+
+class MemoryBroadcastBackend(BroadcastBackend):
+    """Chỉ trong process hiện tại (một worker)"""
+
+    def __init__(self):
+        self._deliver: Optional[Deliver] = None
+
+    def publish(self, board_id: int, event: BoardEvent) -> None:
+        if self._deliver is not None:
+            self._deliver(board_id, event)
+
+    def start(self, deliver: Deliver) -> None:
+        self._deliver = deliver
+
+
+class SQLiteBroadcastBackend(BroadcastBackend):
+    """Event log trong file SQLite dùng chung, mỗi worker poll event mới"""
+
+    def __init__(self, path: str, poll_interval: float = 0.2, retention_seconds: float = 60, table: str = "board_events"):
+        self.path = path
+        self.table = table
+        self.poll_interval = poll_interval
+        self.retention_seconds = retention_seconds
+        self._local = threading.local()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._published = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table} ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, board_id INTEGER NOT NULL, "
+                "type TEXT NOT NULL, data TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            self._local.conn = conn
+        return conn
+
+    def publish(self, board_id: int, event: BoardEvent) -> None:
+        conn = self._connection()
+        now = time.time()
+        conn.execute(
+            f"INSERT INTO {self.table} (board_id, type, data, created_at) VALUES (?, ?, ?, ?)",
+            (board_id, event.type, event.data, now),
+        )
+        self._published += 1
+        if self._published % 100 == 0:
+            # Worker đang poll chỉ cần các event gần đây
+            conn.execute(f"DELETE FROM {self.table} WHERE created_at < ?", (now - self.retention_seconds,))
+
+    def start(self, deliver: Deliver) -> None:
+        if self._thread is not None:
+            return
+        last_id = self._connection().execute(f"SELECT COALESCE(MAX(id), 0) FROM {self.table}").fetchone()[0]
+        self._thread = threading.Thread(
+            target=self._poll, args=(deliver, last_id), name=f"{self.table}-poller", daemon=True
+        )
+        self._thread.start()
+
+    def _poll(self, deliver: Deliver, last_id: int) -> None:
+        while not self._stop.wait(self.poll_interval):
+            try:
+                rows = self._connection().execute(
+                    f"SELECT id, board_id, type, data FROM {self.table} WHERE id > ? ORDER BY id", (last_id,)
+                ).fetchall()
+            except sqlite3.Error as e:
+                print(f"⚠️  {self.table} poll failed: {e}")
+                continue
+            for event_id, board_id, event_type, data in rows:
+                last_id = event_id
+                deliver(board_id, BoardEvent(event_type, data))
+
+    def stop(self) -> None:
+        self._stop.set()
+
+
+def create_broadcast_backend(
+    backend: str,
+    sqlite_path: Optional[str] = None,
+    table: str = "board_events",
+    poll_interval: Optional[float] = None,
+) -> BroadcastBackend:
+    """Tạo backend theo cấu hình ("memory" hoặc "sqlite")"""
+    if backend == "memory":
+        return MemoryBroadcastBackend()
+    if backend == "sqlite":
+        return SQLiteBroadcastBackend(
+            sqlite_path or f"{table}.db",
+            poll_interval if poll_interval is not None else settings.board_events_poll_interval,
+            table=table,
+        )
+    raise ValueError(f"Unknown broadcast backend: {backend}")
+
+
+class BoardEventHub:
+    """Pub/sub theo board trong process, nhận event từ broadcast backend"""
+
+    def __init__(self, backend: BroadcastBackend, max_queue: int = 100):
+        self.backend = backend
+        self.max_queue = max_queue
+        self._subscribers: Dict[int, Set[Subscription]] = {}
+        self._lock = threading.Lock()
+        self._started = False
+        self._delivered = 0
+        self._dropped = 0
+
+    def publish(self, board_id: int, event: Dict[str, Any]) -> None:
+        """Serialize event một lần và gửi qua backend (gọi được từ mọi thread)"""
+        data = json.dumps(event, ensure_ascii=False, separators=(",", ":"))
+        self.backend.publish(board_id, BoardEvent(event["type"], data))
+
+    def deliver(self, board_id: int, event: BoardEvent) -> None:
+        """Giao event cho các subscriber của board trong process này"""
+        with self._lock:
+            subscribers = list(self._subscribers.get(board_id, ()))
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(self._push, subscription, event)
+            except RuntimeError:
+                # Event loop của subscriber đã đóng
+                self._remove(subscription)
+
+    def _push(self, subscription: Subscription, event: BoardEvent) -> None:
+        if subscription.overflowed:
+            return
+        if subscription.push(event):
+            with self._lock:
+                self._delivered += 1
+            return
+        with self._lock:
+            self._dropped += 1
+        self._remove(subscription)
+
+    def _remove(self, subscription: Subscription) -> None:
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.board_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.board_id]
+
+    @contextmanager
+    def subscribe(self, board_id: int) -> Iterator[Subscription]:
+        """Đăng ký nhận event của board (gọi trong event loop)"""
+        with self._lock:
+            if not self._started:
+                self.backend.start(self.deliver)
+                self._started = True
+            subscription = Subscription(board_id, asyncio.get_running_loop(), self.max_queue)
+            self._subscribers.setdefault(board_id, set()).add(subscription)
+        try:
+            yield subscription
+        finally:
+            self._remove(subscription)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "boards": len(self._subscribers),
+                "subscribers": sum(len(subscribers) for subscribers in self._subscribers.values()),
+                "delivered": self._delivered,
+                "dropped_slow_consumers": self._dropped,
+            }
+
+
+board_events = BoardEventHub(
+    create_broadcast_backend(settings.board_events_backend, settings.board_events_sqlite_path),
+    max_queue=settings.board_events_queue_size,
+)
+
+
+def publish_changes(changes: ChangeSet) -> None:
+    """Publish event của một transaction vừa commit"""
+    for board_id, event in changes.events:
+        board_events.publish(board_id, event)
+
+
+register_change_listener(publish_changes)
+
+
+def _sse(event_type: str, data: str) -> str:
+    return f"event: {event_type}\ndata: {data}\n\n"
+
+
+async def board_event_stream(
+    board_id: int,
+    can_read: Callable[[Dict[str, Any]], bool],
+    heartbeat_seconds: float = 15,
+) -> AsyncIterator[str]:
+    """
+    SSE stream cho một board.
+    `can_read(board)` được kiểm tra lại khi board đổi (ví dụ chuyển sang private).
+    """
+    with board_events.subscribe(board_id) as subscription:
+        yield _sse("ready", json.dumps({"board_id": board_id}))
+        while True:
+            try:
+                event = await asyncio.wait_for(subscription.get(), timeout=heartbeat_seconds)
+            except asyncio.TimeoutError:
+                yield ": ping\n\n"  # Giữ kết nối qua proxy
+                continue
+
+            if event is None:
+                # Đọc không kịp, client cần tải lại board rồi subscribe lại
+                yield _sse("resync", json.dumps({"board_id": board_id}))
+                return
+
+            if event.type == "board.updated" and not can_read(json.loads(event.data)["board"]):
+                yield _sse("access_revoked", json.dumps({"board_id": board_id}))
+                return
+
+            yield _sse(event.type, event.data)
+            if event.type == "board.deleted":
+                return
@@ -0,0 +1,381 @@
+"""
+Response cache cho các endpoint đọc public boards.
+
+Mỗi entry lưu body JSON đã serialize sẵn cùng ETag, có TTL và bị loại theo
+LRU khi đầy. Entry được gắn tag ("board:<id>", "public-boards") và bị xóa
+chính xác khi transaction ghi board/task commit (xem
+app.database.versions.register_change_listener), kể cả khi commit ở worker
+khác (app.core.invalidation).
+
+Backend có thể thay thế:
+- MemoryCacheBackend: trong process (mặc định)
+- SQLiteCacheBackend: một file SQLite dùng chung giữa các worker trên cùng
+  máy, stand-in cho cache dùng chung như Redis
+
+Stampede protection: khi entry hết hạn chỉ một request giữ lock để build lại,
+các request khác chờ entry mới thay vì cùng query DB.
+"""
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from fastapi import Request, Response
+
+from app.database import ChangeSet, is_public_scope, register_change_listener
+from .config import settings
+from .etag import etag_matches, not_modified, set_etag
+from .invalidation import invalidation_bus
+
+PUBLIC_BOARDS_TAG = "public-boards"
+
+
+def board_tag(board_id: int) -> str:
+    return f"board:{board_id}"
+
+
+@dataclass
+class CacheEntry:
+    body: bytes
+    etag: str
+    media_type: str = "application/json"
+
+
+class CacheBackend(ABC):
+    """Interface cho cache backend"""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """Entry còn hạn của `key`, None nếu không có"""
+
+    @abstractmethod
+    def set(self, key: str, entry: CacheEntry, tags: List[str], ttl: float, generations: Dict[str, int]) -> bool:
+        """Lưu entry nếu không tag nào bị invalidate kể từ khi đọc `generations`"""
+
+    @abstractmethod
+    def generations(self, tags: List[str]) -> Dict[str, int]:
+        """Generation hiện tại của các tag (tăng mỗi lần invalidate)"""
+
+    @abstractmethod
+    def invalidate_tags(self, tags: Iterable[str]) -> None:
+        """Xóa các entry gắn tag và tăng generation của tag"""
+
+    @abstractmethod
+    def try_lock(self, key: str, timeout: float) -> bool:
+        """Lock để build lại entry, tự hết hạn sau `timeout` giây"""
+
+    @abstractmethod
+    def unlock(self, key: str) -> None:
+        """Nhả lock của try_lock"""
+
+
+class MemoryCacheBackend(CacheBackend):
+    """LRU + TTL trong memory của process"""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[CacheEntry, float, List[str]]]" = OrderedDict()
+        self._tag_keys: Dict[str, Set[str]] = {}
+        self._generations: Dict[str, int] = {}
+        self._locks: Dict[str, float] = {}
+        self._mutex = threading.Lock()
+
+    def _remove(self, key: str) -> None:
+        _, _, tags = self._entries.pop(key)
+        for tag in tags:
+            keys = self._tag_keys.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tag_keys[tag]
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        with self._mutex:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            entry, expires_at, _ = item
+            if expires_at <= time.monotonic():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, entry: CacheEntry, tags: List[str], ttl: float, generations: Dict[str, int]) -> bool:
+        with self._mutex:
+            if any(self._generations.get(tag, 0) != generation for tag, generation in generations.items()):
+                return False
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (entry, time.monotonic() + ttl, list(tags))
+            for tag in tags:
+                self._tag_keys.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+            return True
+
+    def generations(self, tags: List[str]) -> Dict[str, int]:
+        with self._mutex:
+            return {tag: self._generations.get(tag, 0) for tag in tags}
+
+    def invalidate_tags(self, tags: Iterable[str]) -> None:
+        with self._mutex:
+            for tag in tags:
+                self._generations[tag] = self._generations.get(tag, 0) + 1
+                for key in list(self._tag_keys.get(tag, ())):
+                    self._remove(key)
+
+    def try_lock(self, key: str, timeout: float) -> bool:
+        now = time.monotonic()
+        with self._mutex:
+            if self._locks.get(key, 0) > now:
+                return False
+            self._locks[key] = now + timeout
+            return True
+
+    def unlock(self, key: str) -> None:
+        with self._mutex:
+            self._locks.pop(key, None)
+
+
+class SQLiteCacheBackend(CacheBackend):
+    """LRU + TTL trong một file SQLite dùng chung giữa các worker"""
+
+    _schema = (
+        "CREATE TABLE IF NOT EXISTS cache_entries ("
+        "key TEXT PRIMARY KEY, body BLOB NOT NULL, etag TEXT NOT NULL, media_type TEXT NOT NULL, "
+        "expires_at REAL NOT NULL, accessed_at REAL NOT NULL)",
+        "CREATE INDEX IF NOT EXISTS ix_cache_entries_accessed_at ON cache_entries (accessed_at)",
+        "CREATE TABLE IF NOT EXISTS cache_tags (tag TEXT NOT NULL, key TEXT NOT NULL, PRIMARY KEY (tag, key))",
+        "CREATE TABLE IF NOT EXISTS cache_tag_generations (tag TEXT PRIMARY KEY, generation INTEGER NOT NULL)",
+        "CREATE TABLE IF NOT EXISTS cache_locks (key TEXT PRIMARY KEY, expires_at REAL NOT NULL)",
+    )
+
+    def __init__(self, path: str, max_entries: int = 1024):
+        self.path = path
+        self.max_entries = max_entries
+        self._local = threading.local()
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            for statement in self._schema:
+                conn.execute(statement)
+            self._local.conn = conn
+        return conn
+
+    def _transaction(self, func: Callable[[sqlite3.Connection], object]):
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            result = func(conn)
+            conn.execute("COMMIT")
+            return result
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    @staticmethod
+    def _delete_keys(conn: sqlite3.Connection, keys: List[str]) -> None:
+        for key in keys:
+            conn.execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+            conn.execute("DELETE FROM cache_tags WHERE key = ?", (key,))
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        now = time.time()
+        conn = self._connection()
+        row = conn.execute(
+            "SELECT body, etag, media_type, expires_at, accessed_at FROM cache_entries WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None or row[3] <= now:
+            return None
+        # LRU gần đúng: chỉ ghi accessed_at tối đa mỗi giây một lần
+        if row[4] < now - 1:
+            conn.execute("UPDATE cache_entries SET accessed_at = ? WHERE key = ?", (now, key))
+        return CacheEntry(body=row[0], etag=row[1], media_type=row[2])
+
+    def set(self, key: str, entry: CacheEntry, tags: List[str], ttl: float, generations: Dict[str, int]) -> bool:
+        now = time.time()
+
+        def store(conn: sqlite3.Connection) -> bool:
+            if self._read_generations(conn, list(generations)) != generations:
+                return False
+            self._delete_keys(conn, [key])
+            conn.execute(
+                "INSERT INTO cache_entries (key, body, etag, media_type, expires_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, entry.body, entry.etag, entry.media_type, now + ttl, now),
+            )
+            conn.executemany("INSERT INTO cache_tags (tag, key) VALUES (?, ?)", [(tag, key) for tag in tags])
+
+            overflow = conn.execute("SELECT COUNT(*) FROM cache_entries").fetchone()[0] - self.max_entries
+            if overflow > 0:
+                oldest = conn.execute(
+                    "SELECT key FROM cache_entries ORDER BY accessed_at LIMIT ?", (overflow,)
+                ).fetchall()
+                self._delete_keys(conn, [row[0] for row in oldest])
+            return True
+
+        return self._transaction(store)
+
+    @staticmethod
+    def _read_generations(conn: sqlite3.Connection, tags: List[str]) -> Dict[str, int]:
+        generations = {tag: 0 for tag in tags}
+        for tag in tags:
+            row = conn.execute("SELECT generation FROM cache_tag_generations WHERE tag = ?", (tag,)).fetchone()
+            if row is not None:
+                generations[tag] = row[0]
+        return generations
+
+    def generations(self, tags: List[str]) -> Dict[str, int]:
+        return self._read_generations(self._connection(), tags)
+
+    def invalidate_tags(self, tags: Iterable[str]) -> None:
+        tags = list(tags)
+
+        def invalidate(conn: sqlite3.Connection) -> None:
+            for tag in tags:
+                conn.execute(
+                    "INSERT INTO cache_tag_generations (tag, generation) VALUES (?, 1) "
+                    "ON CONFLICT(tag) DO UPDATE SET generation = generation + 1",
+                    (tag,),
+                )
+                keys = [row[0] for row in conn.execute("SELECT key FROM cache_tags WHERE tag = ?", (tag,))]
+                self._delete_keys(conn, keys)
+
+        self._transaction(invalidate)
+
+    def try_lock(self, key: str, timeout: float) -> bool:
+        now = time.time()
+
+        def lock(conn: sqlite3.Connection) -> bool:
+            conn.execute("DELETE FROM cache_locks WHERE key = ? AND expires_at <= ?", (key, now))
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO cache_locks (key, expires_at) VALUES (?, ?)", (key, now + timeout)
+            )
+            return cursor.rowcount == 1
+
+        return self._transaction(lock)
+
+    def unlock(self, key: str) -> None:
+        self._connection().execute("DELETE FROM cache_locks WHERE key = ?", (key,))
+
+
+class ResponseCache:
+    """Cache response đã serialize, có stampede protection"""
+
+    def __init__(self, backend: Optional[CacheBackend], ttl: float, lock_timeout: float):
+        self.backend = backend
+        self.ttl = ttl
+        self.lock_timeout = lock_timeout
+        self._stats_lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "builds": 0, "waits": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None
+
+    def _count(self, name: str) -> None:
+        with self._stats_lock:
+            self._stats[name] += 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._stats_lock:
+            return dict(self._stats)
+
+    def get_or_build(self, key: str, tags: List[str], builder: Callable[[], CacheEntry]) -> Tuple[CacheEntry, bool]:
+        """
+        Trả về (entry, hit). Khi miss chỉ một request build lại entry,
+        các request khác chờ tối đa `lock_timeout` giây rồi mới tự build.
+        """
+        if self.backend is None:
+            return builder(), False
+
+        entry = self.backend.get(key)
+        if entry is not None:
+            self._count("hits")
+            return entry, True
+        self._count("misses")
+
+        deadline = time.monotonic() + self.lock_timeout
+        while not self.backend.try_lock(key, self.lock_timeout):
+            if time.monotonic() >= deadline:
+                # Request đang build bị treo: tự build, không ghi vào cache
+                return builder(), False
+            time.sleep(0.01)
+            entry = self.backend.get(key)
+            if entry is not None:
+                self._count("waits")
+                return entry, True
+
+        try:
+            # Request trước có thể đã build xong trong lúc chờ lock
+            entry = self.backend.get(key)
+            if entry is not None:
+                return entry, True
+            generations = self.backend.generations(tags)
+            entry = builder()
+            self._count("builds")
+            self.backend.set(key, entry, tags, self.ttl, generations)
+            return entry, False
+        finally:
+            self.backend.unlock(key)
+
+    def invalidate(self, tags: Iterable[str]) -> None:
+        tags = list(tags)
+        if self.backend is not None and tags:
+            self.backend.invalidate_tags(tags)
+
+
+def create_cache_backend(backend: str) -> Optional[CacheBackend]:
+    """Tạo backend theo cấu hình ("memory", "sqlite" hoặc "none")"""
+    if backend == "none":
+        return None
+    if backend == "memory":
+        return MemoryCacheBackend(settings.response_cache_max_entries)
+    if backend == "sqlite":
+        return SQLiteCacheBackend(settings.response_cache_sqlite_path, settings.response_cache_max_entries)
+    raise ValueError(f"Unknown response cache backend: {backend}")
+
+
+def cache_key(request: Request) -> str:
+    """Key theo route + query params (không phụ thuộc thứ tự params)"""
+    query = "&".join(f"{name}={value}" for name, value in sorted(request.query_params.multi_items()))
+    return f"{request.url.path}?{query}"
+
+
+def cached_response(request: Request, entry: CacheEntry, hit: bool) -> Response:
+    """Response từ cache entry, trả 304 nếu ETag khớp"""
+    if etag_matches(request, entry.etag):
+        return not_modified(entry.etag)
+    response = Response(content=entry.body, media_type=entry.media_type)
+    set_etag(response, entry.etag)
+    response.headers["X-Cache"] = "HIT" if hit else "MISS"
+    return response
+
+
+response_cache = ResponseCache(
+    create_cache_backend(settings.response_cache_backend),
+    ttl=settings.response_cache_ttl_seconds,
+    lock_timeout=settings.response_cache_lock_timeout_seconds,
+)
+
+
+def invalidate_changes(changes: ChangeSet) -> None:
+    """Xóa các entry bị ảnh hưởng bởi một transaction vừa commit"""
+    tags = [board_tag(board_id) for board_id in changes.board_ids]
+    if any(is_public_scope(scope) for scope in changes.scopes):
+        tags.append(PUBLIC_BOARDS_TAG)
+    response_cache.invalidate(tags)
+
+
+register_change_listener(invalidate_changes)
+
+# Backend memory là riêng của từng worker: nhận thay đổi từ worker khác qua bus
+if settings.response_cache_backend == "memory":
+    invalidation_bus.add_listener(invalidate_changes)
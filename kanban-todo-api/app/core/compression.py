@@ -0,0 +1,198 @@
+"""
+Nén response (brotli/gzip) theo Accept-Encoding của client.
+
+- Response có Content-Length nhỏ hơn minimum_size được gửi nguyên, quyết định
+  ngay từ header nên không phải buffer body
+- 204/304, HEAD, response đã có Content-Encoding và text/event-stream không nén
+- Body lớn hơn offload_size được nén trên worker thread để không block event loop
+- Streaming response được nén từng chunk (flush sau mỗi chunk)
+- Strong ETag của body đã nén được gắn thêm encoding (xem app.core.etag.encoded_etag),
+  304 trả lại đúng tag của bản nén mà client đang giữ
+"""
+import gzip
+import zlib
+from typing import Callable, Optional
+
+import anyio
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .etag import encoded_etag
+
+try:
+    import brotli
+except ImportError:  # brotli là optional, không có thì chỉ dùng gzip
+    brotli = None
+
+SKIP_STATUS_CODES = {204, 304}
+SKIP_CONTENT_TYPES = ("text/event-stream",)
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """Chọn encoding theo q-value của Accept-Encoding, ưu tiên br khi bằng nhau"""
+    preferences = {}
+    for part in accept_encoding.split(","):
+        token, _, params = part.strip().partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if token:
+            preferences[token.strip().lower()] = quality
+
+    best, best_quality = None, 0.0
+    for encoding in (("br", "gzip") if brotli is not None else ("gzip",)):
+        quality = preferences.get(encoding, preferences.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+class _StreamCompressor:
+    """Nén incremental cho streaming response"""
+
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=brotli_quality)
+            self._compress = self._compressor.process
+            self._flush = self._compressor.flush
+            self._finish = self._compressor.finish
+        else:
+            self._compressor = zlib.compressobj(gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+            self._compress = self._compressor.compress
+            self._flush = lambda: self._compressor.flush(zlib.Z_SYNC_FLUSH)
+            self._finish = self._compressor.flush
+
+    def compress(self, data: bytes, more_body: bool) -> bytes:
+        # Flush sau mỗi chunk để client nhận được dữ liệu ngay
+        return self._compress(data) + (self._flush() if more_body else self._finish())
+
+
+class CompressionMiddleware:
+    """ASGI middleware nén response bằng brotli hoặc gzip"""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+        offload_size: int = 256 * 1024,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.offload_size = offload_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+
+        request_headers = Headers(scope=scope)
+        encoding = choose_encoding(request_headers.get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressionResponder(self, encoding, send, request_headers.get("if-none-match", ""))
+        await self.app(scope, receive, responder.send)
+
+    def compressor(self, encoding: str) -> Callable[[bytes], bytes]:
+        if encoding == "br":
+            return lambda body: brotli.compress(body, quality=self.brotli_quality)
+        return lambda body: gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+
+
+class _CompressionResponder:
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send: Send, if_none_match: str = ""):
+        self.middleware = middleware
+        self.encoding = encoding
+        self._send = send
+        self.if_none_match = if_none_match
+        self.start_message: Optional[Message] = None
+        self.passthrough = False
+        self.stream: Optional[_StreamCompressor] = None
+
+    def _should_skip(self, message: Message) -> bool:
+        headers = Headers(raw=message["headers"])
+        if message["status"] in SKIP_STATUS_CODES or "content-encoding" in headers:
+            return True
+        if headers.get("content-type", "").startswith(SKIP_CONTENT_TYPES):
+            return True
+        # Biết trước kích thước từ Content-Length thì quyết định luôn, không buffer
+        content_length = headers.get("content-length")
+        return content_length is not None and content_length.isdigit() and int(content_length) < self.middleware.minimum_size
+
+    def _set_not_modified_etag(self, message: Message) -> None:
+        # 304 không có body nên không qua nén: route trả ETag của bản chưa nén.
+        # Client đang giữ bản nén (tag có suffix encoding) thì trả lại đúng tag đó
+        headers = MutableHeaders(raw=message["headers"])
+        etag = headers.get("etag")
+        if etag is None:
+            return
+        encoded = encoded_etag(etag, self.encoding)
+        if encoded != etag and encoded in (tag.strip() for tag in self.if_none_match.split(",")):
+            headers["ETag"] = encoded
+            headers.add_vary_header("Accept-Encoding")
+
+    def _set_encoding_headers(self, content_length: Optional[int]) -> None:
+        headers = MutableHeaders(raw=self.start_message["headers"])
+        headers["Content-Encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+        if "etag" in headers:
+            headers["ETag"] = encoded_etag(headers["etag"], self.encoding)
+        if content_length is None:
+            del headers["Content-Length"]
+        else:
+            headers["Content-Length"] = str(content_length)
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.start_message = message
+            self.passthrough = self._should_skip(message)
+            if message["status"] == 304:
+                self._set_not_modified_etag(message)
+            if self.passthrough:
+                await self._send(message)
+            return
+
+        if self.passthrough or message["type"] != "http.response.body":
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.stream is None and not more_body:
+            # Toàn bộ body trong một message (trường hợp thường gặp)
+            if len(body) < self.middleware.minimum_size:
+                await self._send(self.start_message)
+                await self._send(message)
+                return
+
+            compress = self.middleware.compressor(self.encoding)
+            if len(body) >= self.middleware.offload_size:
+                body = await anyio.to_thread.run_sync(compress, body)
+            else:
+                body = compress(body)
+            self._set_encoding_headers(len(body))
+            await self._send(self.start_message)
+            await self._send({"type": "http.response.body", "body": body})
+            return
+
+        if self.stream is None:
+            self.stream = _StreamCompressor(self.encoding, self.middleware.gzip_level, self.middleware.brotli_quality)
+            self._set_encoding_headers(None)
+            await self._send(self.start_message)
+
+        await self._send({
+            "type": "http.response.body",
+            "body": self.stream.compress(body, more_body),
+            "more_body": more_body,
+        })
@@ -1,13 +1,25 @@
-from pydantic_settings import BaseSettings
+from pydantic_settings import BaseSettings, SettingsConfigDict
 from typing import Optional, List
 
 class Settings(BaseSettings):
     database_url: str
     database_echo: bool = False
+    database_pool_warmup: int = 2  # Số kết nối mở sẵn lúc startup, 0 = không warmup
+    database_connection_budget: int = 20  # Tổng số kết nối DB của mọi worker, chia đều cho từng worker
+
+    # SQLite (DATABASE_URL dạng file): PRAGMA cho mỗi kết nối, một kết nối ghi + pool kết nối đọc
+    sqlite_tuned: bool = True  # False = mặc định của SQLite (rollback journal, synchronous=FULL, không busy timeout)
+    sqlite_busy_timeout_ms: int = 5000
+    sqlite_synchronous: str = "NORMAL"  # WAL + NORMAL: mất điện có thể mất transaction cuối, database không hỏng
+    sqlite_cache_size_kb: int = 65536  # Page cache mỗi kết nối
+    sqlite_mmap_size_mb: int = 256
+    sqlite_reader_pool_size: int = 4
 
     # Application
     app_name: str = "Kanban TODO API"
     debug: bool = True
+    environment: str = "development"  # Ngoài "development" schema do Alembic quản lý (build.sh)
+    web_concurrency: int = 1  # Số worker, uvicorn đọc cùng biến WEB_CONCURRENCY cho --workers
 
     # CORS Settings
     cors_origins: List[str] = [
@@ -28,9 +40,85 @@ class Settings(BaseSettings):
     secret_key: str
     algorithm: str = "HS256"
     access_token_expire_minutes: int
+    refresh_token_expire_days: int = 30
+
+    # Password hashing (bcrypt)
+    bcrypt_rounds: int = 12  # Đổi cost thì hash cũ được rehash khi user login
+    password_hash_workers: int = 4
+    password_hash_max_pending: int = 32
+
+    # Login admission control
+    login_rate_limit_backend: str = "memory"  # "memory" hoặc "sqlite" (chia sẻ giữa các worker)
+    login_rate_limit_sqlite_path: str = "rate_limit.db"
+    login_rate_limit_trust_proxy: bool = False  # Lấy IP client từ X-Forwarded-For
+    login_user_burst: int = 5
+    login_user_per_minute: int = 10
+    login_ip_burst: int = 20
+    login_ip_per_minute: int = 60
+    login_max_concurrent_verifications: int = 8
+
+    # Response cache cho public boards
+    response_cache_backend: str = "memory"  # "memory", "sqlite" (chia sẻ giữa các worker) hoặc "none"
+    response_cache_sqlite_path: str = "response_cache.db"
+    response_cache_max_entries: int = 1024
+    response_cache_ttl_seconds: int = 60
+    response_cache_lock_timeout_seconds: float = 5.0
+
+    # Response compression (gzip/brotli theo Accept-Encoding)
+    compression_enabled: bool = True
+    compression_minimum_size: int = 1024  # Response nhỏ hơn (bytes) gửi nguyên
+    compression_gzip_level: int = 6
+    compression_brotli_quality: int = 4
+    compression_offload_size: int = 256 * 1024  # Body lớn hơn được nén trên worker thread
+
+    # Board event feed (SSE)
+    board_events_backend: str = "memory"  # "memory" hoặc "sqlite" (chia sẻ giữa các worker)
+    board_events_sqlite_path: str = "board_events.db"
+    board_events_poll_interval: float = 0.2
+    board_events_queue_size: int = 100  # Subscriber có nhiều event chờ hơn bị ngắt (resync)
+    board_events_heartbeat_seconds: int = 15
+
+    # Delta sync (GET /boards/{id}/changes)
+    sync_overlap_seconds: float = 5.0  # Đọc lùi lại để không sót transaction commit muộn
+    sync_tombstone_retention_days: int = 30  # Token cũ hơn phải full sync
+
+    # Board statistics (GET /boards/{id}/stats)
+    board_stats_cache_size: int = 2048  # Số board giữ kết quả trong memory
+    board_stats_overdue_granularity_seconds: int = 60  # "overdue" được tính lại tối đa sau khoảng này
+
+    # Task history (task_events) và flow analytics
+    task_events_enabled: bool = True
+    analytics_default_days: int = 90
+
+    # Audit log (ghi theo batch trên background thread)
+    audit_enabled: bool = True
+    audit_flush_interval_ms: int = 500
+    audit_batch_size: int = 100
+    audit_max_buffer: int = 10000  # Buffer đầy thì bỏ entry mới (đếm trong /health) thay vì chặn request
+
+    # Memory repository (app.database.memory) cho test/benchmark, app luôn dùng SQLAlchemy
+    memory_snapshot_path: Optional[str] = None  # File JSON, None = không snapshot
+    memory_snapshot_interval_seconds: float = 0.0  # 0 = chỉ snapshot khi stop()
+
+    # Sharding: boards/tasks chia theo board_id ra nhiều database (rỗng = chỉ DATABASE_URL)
+    database_shards: List[str] = []  # JSON list URL, ví dụ '["sqlite:///./shard1.db", "sqlite:///./shard2.db"]'
+    shard_directory_cache_seconds: float = 60.0  # Cache board -> shard trong mỗi process
+    shard_id_block_size: int = 100  # Số id boards/tasks cấp cho mỗi process một lần
+
+    # Background jobs (GET /jobs/{id})
+    job_workers: int = 2  # Số worker thread trong mỗi process, 0 = không chạy job (process chỉ nhận request)
+    job_poll_interval: float = 1.0  # Nhận job do process khác tạo
+    job_max_attempts: int = 3
+    job_retry_backoff_seconds: float = 2.0  # Nhân đôi sau mỗi lần thất bại
+    job_stale_after_seconds: int = 300  # Job running không báo progress quá lâu (worker chết) được chạy lại
+    board_delete_chunk_size: int = 500  # Số task xóa mỗi transaction khi xóa board trong background
+    board_delete_background_threshold: int = 5000  # Board nhiều task hơn được xóa bằng job (202)
 
+    # Invalidation bus giữa các worker (cache trong memory của từng worker)
+    invalidation_backend: str = "memory"  # "memory" (một worker) hoặc "sqlite" (chia sẻ giữa các worker)
+    invalidation_sqlite_path: str = "invalidations.db"
+    invalidation_poll_interval: float = 0.1
 
-    class Config:
-        env_file = "kanban-todo-api/.env"
+    model_config = SettingsConfigDict(env_file="kanban-todo-api/.env")
 
 settings = Settings()
@@ -1,8 +1,10 @@
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Query, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.routing import APIRoute
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
-from jose import JWTError
-from typing import Optional
+from jose.exceptions import JWTError
+from typing import Callable, Coroutine, Optional
 
 from app.database import get_db, user_repository
 from app.database.models import User
@@ -11,6 +13,31 @@ from .security import verify_token
 # HTTP Bearer token scheme
 security = HTTPBearer()
 
+class UnitOfWorkRoute(APIRoute):
+    """
+    Route commit session của request (get_db) đúng một lần sau khi handler
+    chạy xong và trước khi response được gửi: commit lỗi (ví dụ StaleDataError)
+    vẫn trả về 409/412 cho client. Handler raise (kể cả HTTPException) -> rollback
+    """
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[None, None, Response]]:
+        handler = super().get_route_handler()
+
+        async def unit_of_work_handler(request: Request) -> Response:
+            try:
+                response = await handler(request)
+            except Exception:
+                db = getattr(request.state, "db", None)
+                if db is not None:
+                    await run_in_threadpool(db.rollback)
+                raise
+            db = getattr(request.state, "db", None)
+            if db is not None and db.in_transaction():
+                await run_in_threadpool(db.commit)
+            return response
+
+        return unit_of_work_handler
+
 def get_current_user(
     db: Session = Depends(get_db),
     token: HTTPAuthorizationCredentials = Depends(security)
@@ -95,8 +122,27 @@ def optional_current_user(
     if token is None:
         return None
     
+    return user_from_token(db, token.credentials)
+
+def stream_current_user(
+    db: Session = Depends(get_db),
+    token: Optional[HTTPAuthorizationCredentials] = Depends(HTTPBearer(auto_error=False)),
+    access_token: Optional[str] = Query(None, description="Token cho EventSource (không gửi được header)")
+) -> Optional[User]:
+    """
+    Optional user cho streaming endpoint: token qua header Authorization
+    hoặc query param access_token
+    """
+    if token is not None:
+        return user_from_token(db, token.credentials)
+    if access_token:
+        return user_from_token(db, access_token)
+    return None
+
+def user_from_token(db: Session, token: str) -> Optional[User]:
+    """User active từ JWT token, None nếu token invalid"""
     try:
-        payload = verify_token(token.credentials)
+        payload = verify_token(token)
         if payload is None:
             return None
         
@@ -0,0 +1,79 @@
+from fastapi import HTTPException, Request, Response, status
+
+def make_etag(*parts) -> str:
+    """Tạo weak ETag từ các version counter"""
+    return 'W/"' + "-".join(str(part) for part in parts) + '"'
+
+def strong_etag(*parts) -> str:
+    """
+    Tạo strong ETag từ các version counter: chỉ dùng khi body là hàm của các
+    counter này (cùng version -> cùng bytes), ví dụ board chi tiết theo revision
+    """
+    return '"' + "-".join(str(part) for part in parts) + '"'
+
+CONTENT_ENCODINGS = ("br", "gzip")
+
+def encoded_etag(etag: str, encoding: str) -> str:
+    """
+    ETag của bản đã nén: strong ETag được gắn thêm encoding ("task-1-2-gzip")
+    vì strong ETag phải khác nhau theo từng byte của body. Weak ETag giữ nguyên.
+    """
+    if etag.startswith("W/") or not etag.endswith('"'):
+        return etag
+    return f'{etag[:-1]}-{encoding}"'
+
+def _decoded_tag(tag: str) -> str:
+    # Tag client gửi lại có thể là ETag của bản nén: bỏ suffix encoding để so với version
+    tag = tag.strip()
+    for encoding in CONTENT_ENCODINGS:
+        suffix = f'-{encoding}"'
+        if tag.endswith(suffix):
+            return tag[:-len(suffix)] + '"'
+    return tag
+
+def _opaque_tag(etag: str) -> str:
+    # Weak comparison (RFC 9110): bỏ prefix W/ trước khi so sánh
+    etag = _decoded_tag(etag)
+    return etag[2:] if etag.startswith("W/") else etag
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Kiểm tra header If-None-Match của request có khớp ETag hiện tại không"""
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    current = _opaque_tag(etag)
+    return any(_opaque_tag(tag) == current for tag in if_none_match.split(","))
+
+def set_etag(response: Response, etag: str) -> None:
+    """Gắn ETag vào response, yêu cầu client revalidate trước khi dùng lại"""
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "private, no-cache"
+
+def not_modified(etag: str) -> Response:
+    """Response 304 không có body"""
+    response = Response(status_code=status.HTTP_304_NOT_MODIFIED)
+    set_etag(response, etag)
+    return response
+
+def item_etag(kind: str, item_id: int, version: int) -> str:
+    """Strong ETag của một task/board theo version, ví dụ "task-12-3" (dùng cho If-Match)"""
+    return f'"{kind}-{item_id}-{version}"'
+
+def check_if_match(request: Request, *etags: str) -> None:
+    """
+    If-Match không khớp strong ETag nào trong `etags` -> 412. Không gửi If-Match thì bỏ qua.
+    etags[0] là ETag hiện tại (trả về trong header của 412)
+    """
+    if_match = request.headers.get("if-match")
+    if not if_match or if_match.strip() == "*":
+        return
+    # Strong comparison (RFC 9110): weak ETag (W/...) không bao giờ khớp
+    if any(_decoded_tag(tag) in etags for tag in if_match.split(",")):
+        return
+    raise HTTPException(
+        status_code=status.HTTP_412_PRECONDITION_FAILED,
+        detail="Dữ liệu đã bị thay đổi bởi người khác, vui lòng tải lại",
+        headers={"ETag": etags[0]},
+    )
@@ -0,0 +1,132 @@
+"""
+Password hashing pool.
+
+bcrypt tốn ~250ms CPU mỗi lần hash/verify (12 rounds). Chạy trực tiếp trong
+route handler sẽ chiếm hết threadpool của FastAPI khi có nhiều request login
+cùng lúc. Module này chạy bcrypt trên một thread pool riêng (bcrypt nhả GIL
+khi tính toán nên các thread chạy song song thật sự), giới hạn số job đang
+chờ và thu thập số liệu hàng đợi.
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+import bcrypt
+
+
+class PasswordHasherBusy(Exception):
+    """Pool hash password đã đầy, request nên được từ chối ngay"""
+
+
+def _hashpw(password: str, rounds: int) -> str:
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds=rounds)).decode('utf-8')
+
+
+def _checkpw(password: str, hashed_password: str) -> bool:
+    return bcrypt.checkpw(password.encode('utf-8'), hashed_password.encode('utf-8'))
+
+
+def get_hash_rounds(hashed_password: str) -> Optional[int]:
+    """Đọc cost factor từ bcrypt hash ($2b$12$...)"""
+    parts = hashed_password.split("$")
+    if len(parts) < 4 or not parts[2].isdigit():
+        return None
+    return int(parts[2])
+
+
+class PasswordHasher:
+    """Thread pool có giới hạn cho bcrypt, kèm metrics"""
+
+    def __init__(self, rounds: int = 12, max_workers: int = 4, max_pending: int = 32):
+        self.rounds = rounds
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor: Optional[ThreadPoolExecutor] = None
+        # Tổng số job được phép nằm trong pool (đang chạy + đang chờ)
+        self._slots = threading.BoundedSemaphore(max_workers + max_pending)
+        self._lock = threading.Lock()
+        self._submitted = 0
+        self._running = 0
+        self._completed = 0
+        self._rejected = 0
+        self._wait_seconds = 0.0
+        self._run_seconds = 0.0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        # Tạo pool khi dùng lần đầu để import module không tốn thread nào
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers,
+                        thread_name_prefix="password-hasher",
+                    )
+        return self._executor
+
+    def _timed(self, func: Callable[..., Any], enqueued_at: float, *args: Any) -> Any:
+        started_at = time.perf_counter()
+        with self._lock:
+            self._running += 1
+            self._wait_seconds += started_at - enqueued_at
+        try:
+            return func(*args)
+        finally:
+            with self._lock:
+                self._running -= 1
+                self._completed += 1
+                self._run_seconds += time.perf_counter() - started_at
+
+    def _submit(self, func: Callable[..., Any], *args: Any) -> Future:
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            raise PasswordHasherBusy()
+
+        with self._lock:
+            self._submitted += 1
+        try:
+            future = self._get_executor().submit(self._timed, func, time.perf_counter(), *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def hash(self, password: str) -> str:
+        """Hash password (block thread hiện tại tới khi xong)"""
+        return self._submit(_hashpw, password, self.rounds).result()
+
+    def verify(self, password: str, hashed_password: str) -> bool:
+        """Verify password (block thread hiện tại tới khi xong)"""
+        return self._submit(_checkpw, password, hashed_password).result()
+
+    async def ahash(self, password: str) -> str:
+        """Hash password mà không giữ thread nào của event loop/threadpool"""
+        return await asyncio.wrap_future(self._submit(_hashpw, password, self.rounds))
+
+    async def averify(self, password: str, hashed_password: str) -> bool:
+        """Verify password mà không giữ thread nào của event loop/threadpool"""
+        return await asyncio.wrap_future(self._submit(_checkpw, password, hashed_password))
+
+    def needs_rehash(self, hashed_password: str) -> bool:
+        """True nếu hash được tạo với cost factor khác cấu hình hiện tại"""
+        rounds = get_hash_rounds(hashed_password)
+        return rounds is not None and rounds != self.rounds
+
+    def stats(self) -> Dict[str, Any]:
+        """Số liệu hàng đợi của pool"""
+        with self._lock:
+            in_pool = self._submitted - self._completed
+            return {
+                "rounds": self.rounds,
+                "workers": self.max_workers,
+                "max_pending": self.max_pending,
+                "running": self._running,
+                "queued": max(in_pool - self._running, 0),
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "avg_wait_ms": round(self._wait_seconds / self._completed * 1000, 2) if self._completed else 0.0,
+                "avg_run_ms": round(self._run_seconds / self._completed * 1000, 2) if self._completed else 0.0,
+            }
@@ -0,0 +1,100 @@
+"""
+Invalidation bus giữa các worker (uvicorn --workers / WEB_CONCURRENCY).
+
+Cache trong memory (ví dụ response cache backend "memory") là riêng của từng
+worker, nên khi một worker commit thay đổi users/boards/tasks thì các worker
+còn lại phải được báo để xóa entry cũ:
+
+- Sau commit, ChangeSet (board ids, listing scopes, user ids) được publish
+  lên bus kèm id của worker gửi
+- Mỗi worker nhận message của worker khác và gọi các invalidation listener;
+  worker gửi đã tự invalidate qua change listener nên bỏ qua message của mình
+- Transport dùng lại BroadcastBackend: "memory" (một worker, không cần gửi)
+  hoặc "sqlite" (file SQLite dùng chung, mỗi worker poll), stand-in cho
+  Redis pub/sub trên nhiều máy
+"""
+import json
+import os
+import threading
+import uuid
+from typing import Callable, Dict, List
+
+from .broadcast import BoardEvent, BroadcastBackend, create_broadcast_backend
+from .config import settings
+from app.database import ChangeSet, register_change_listener
+
+InvalidationListener = Callable[[ChangeSet], None]
+
+
+class InvalidationBus:
+    """Gửi ChangeSet đã commit tới mọi worker khác"""
+
+    def __init__(self, backend: BroadcastBackend):
+        self.backend = backend
+        self.worker_id = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._listeners: List[InvalidationListener] = []
+        self._lock = threading.Lock()
+        self._started = False
+        self._published = 0
+        self._received = 0
+
+    def add_listener(self, listener: InvalidationListener) -> None:
+        """Đăng ký callback xóa cache local khi worker khác commit thay đổi"""
+        self._listeners.append(listener)
+
+    def start(self) -> None:
+        with self._lock:
+            if not self._started:
+                self.backend.start(self._deliver)
+                self._started = True
+
+    def stop(self) -> None:
+        self.backend.stop()
+
+    def publish(self, changes: ChangeSet) -> None:
+        """Change listener: gửi phần cần invalidate của một transaction vừa commit"""
+        if not (changes.board_ids or changes.scopes or changes.user_ids):
+            return
+        data = json.dumps({
+            "origin": self.worker_id,
+            "board_ids": sorted(changes.board_ids),
+            "scopes": sorted(changes.scopes),
+            "user_ids": sorted(changes.user_ids),
+        }, separators=(",", ":"))
+        # Channel id không dùng, mọi worker nhận toàn bộ message
+        self.backend.publish(0, BoardEvent("invalidate", data))
+        with self._lock:
+            self._published += 1
+
+    def _deliver(self, channel: int, event: BoardEvent) -> None:
+        message = json.loads(event.data)
+        if message["origin"] == self.worker_id:
+            return
+        changes = ChangeSet(
+            board_ids=set(message["board_ids"]),
+            scopes=set(message["scopes"]),
+            user_ids=set(message["user_ids"]),
+        )
+        with self._lock:
+            self._received += 1
+        for listener in self._listeners:
+            try:
+                listener(changes)
+            except Exception as e:
+                print(f"⚠️  Invalidation listener {listener!r} failed: {e}")
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            return {"worker_id": self.worker_id, "published": self._published, "received": self._received}
+
+
+invalidation_bus = InvalidationBus(
+    create_broadcast_backend(
+        settings.invalidation_backend,
+        settings.invalidation_sqlite_path,
+        table="invalidations",
+        poll_interval=settings.invalidation_poll_interval,
+    )
+)
+
+register_change_listener(invalidation_bus.publish)
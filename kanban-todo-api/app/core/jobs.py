@@ -0,0 +1,217 @@
+"""
+Background jobs cho các thao tác dài (xóa board lớn, export...) để không
+chạy trong request thread và bị proxy timeout.
+
+- Endpoint tạo job bằng enqueue() (một INSERT vào bảng jobs) rồi trả về
+  202 Accepted kèm job id; client poll GET /jobs/{id} để xem status/progress
+- Mỗi process chạy `job_workers` worker thread. Worker nhận job bằng một câu
+  UPDATE có điều kiện (status = 'queued') nên mỗi job chỉ được một worker
+  nhận, kể cả khi nhiều process dùng chung database
+- Job lỗi được retry tối đa `max_attempts` lần với backoff nhân đôi
+  (run_after); hết lượt thì status = failed và giữ lại error
+- Handler báo progress qua JobContext.progress(), đồng thời là heartbeat:
+  job "running" không heartbeat quá job_stale_after_seconds (worker chết
+  giữa chừng) được worker khác chạy lại, nên handler phải idempotent
+"""
+import json
+import threading
+import traceback
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import and_, insert, or_, select, update
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from .config import settings
+from app.database import engine, SessionLocal, Job, User
+
+QUEUED, RUNNING, SUCCEEDED, FAILED = "queued", "running", "succeeded", "failed"
+
+
+class JobFailed(Exception):
+    """Lỗi không nên retry (ví dụ dữ liệu không còn tồn tại): job failed ngay"""
+
+
+class JobContext:
+    """Thông tin job truyền cho handler"""
+
+    def __init__(self, runner: "JobRunner", job_id: str, payload: Dict[str, Any], owner_id: Optional[int], attempt: int):
+        self.runner = runner
+        self.id = job_id
+        self.payload = payload
+        self.owner_id = owner_id
+        self.attempt = attempt
+
+    def progress(self, done: int, total: int) -> None:
+        """Cập nhật progress (0..1) và heartbeat. Gọi sau commit, không gọi khi đang giữ transaction ghi"""
+        value = min(1.0, done / total) if total else 1.0
+        self.runner._update(self.id, progress=value, heartbeat_at=datetime.utcnow())
+
+
+JobHandler = Callable[[Session, JobContext], Optional[Dict[str, Any]]]
+
+
+class JobRunner:
+    """Worker pool trong process, đọc job từ bảng jobs"""
+
+    def __init__(
+        self,
+        engine: Engine,
+        session_factory: sessionmaker,
+        workers: int,
+        poll_interval: float,
+        max_attempts: int,
+        backoff_seconds: float,
+        stale_after_seconds: int,
+    ):
+        self.engine = engine
+        self.session_factory = session_factory
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.backoff_seconds = backoff_seconds
+        self.stale_after_seconds = stale_after_seconds
+        self._handlers: Dict[str, JobHandler] = {}
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._stats = {"succeeded": 0, "failed": 0, "retried": 0}
+
+    def handler(self, job_type: str) -> Callable[[JobHandler], JobHandler]:
+        """Decorator đăng ký handler cho một loại job"""
+        def register(func: JobHandler) -> JobHandler:
+            self._handlers[job_type] = func
+            return func
+        return register
+
+    def enqueue(self, job_type: str, payload: Dict[str, Any], owner: Optional[User] = None) -> str:
+        """Tạo job (commit ngay) và đánh thức worker, trả về job id"""
+        if job_type not in self._handlers:
+            raise ValueError(f"Unknown job type: {job_type}")
+        job_id = uuid.uuid4().hex
+        now = datetime.utcnow()
+        with self.engine.begin() as conn:
+            conn.execute(insert(Job).values(
+                id=job_id,
+                type=job_type,
+                status=QUEUED,
+                owner_id=owner.id if owner is not None else None,
+                payload=json.dumps(payload),
+                progress=0.0,
+                attempts=0,
+                max_attempts=self.max_attempts,
+                run_after=now,
+                created_at=now,
+            ))
+        self._wakeup.set()
+        return job_id
+
+    def start(self) -> None:
+        if self._threads or self.workers <= 0:
+            return
+        self._stop.clear()
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f"job-worker-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Dừng nhận job mới; job đang chạy dở sẽ được chạy lại sau khi stale"""
+        self._stop.set()
+        self._wakeup.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                job = self._claim()
+            except Exception as e:
+                print(f"⚠️  Job claim failed: {e}")
+                job = None
+            if job is None:
+                # Chờ enqueue trong process này hoặc poll job do process khác tạo
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+                continue
+            self._execute(job)
+
+    def _claim(self) -> Optional[Job]:
+        """Nhận một job đến hạn (hoặc job running đã stale) bằng UPDATE có điều kiện"""
+        now = datetime.utcnow()
+        claimable = or_(
+            and_(Job.status == QUEUED, Job.run_after <= now),
+            and_(Job.status == RUNNING, Job.heartbeat_at < now - timedelta(seconds=self.stale_after_seconds)),
+        )
+        with self.engine.connect() as conn:
+            candidates = conn.execute(
+                select(Job.id, Job.status, Job.attempts).where(claimable).order_by(Job.run_after).limit(self.workers)
+            ).all()
+        for candidate in candidates:
+            with self.engine.begin() as conn:
+                claimed = conn.execute(
+                    update(Job)
+                    .where(Job.id == candidate.id, Job.status == candidate.status, Job.attempts == candidate.attempts)
+                    .values(status=RUNNING, attempts=Job.attempts + 1, started_at=now, heartbeat_at=now)
+                ).rowcount
+            if claimed:
+                with self.engine.connect() as conn:
+                    return conn.execute(select(Job).where(Job.id == candidate.id)).first()
+        return None
+
+    def _execute(self, job) -> None:
+        handler = self._handlers.get(job.type)
+        context = JobContext(self, job.id, json.loads(job.payload or "{}"), job.owner_id, job.attempts)
+        try:
+            if handler is None:
+                raise RuntimeError(f"No handler for job type {job.type}")
+            with self.session_factory() as db:
+                result = handler(db, context)
+        except Exception as e:
+            error = str(e) if isinstance(e, JobFailed) else "".join(traceback.format_exception_only(type(e), e)).strip()
+            if job.attempts < job.max_attempts and handler is not None and not isinstance(e, JobFailed):
+                delay = self.backoff_seconds * 2 ** (job.attempts - 1)
+                print(f"🔁 Job {job.id} ({job.type}) failed, retry in {delay:.1f}s: {error}")
+                self._update(job.id, status=QUEUED, error=error, run_after=datetime.utcnow() + timedelta(seconds=delay))
+                self._count("retried")
+            else:
+                print(f"❌ Job {job.id} ({job.type}) failed after {job.attempts} attempts: {error}")
+                self._update(job.id, status=FAILED, error=error, finished_at=datetime.utcnow())
+                self._count("failed")
+            return
+        self._update(
+            job.id,
+            status=SUCCEEDED,
+            progress=1.0,
+            error=None,
+            result=json.dumps(result, default=str) if result is not None else None,
+            finished_at=datetime.utcnow(),
+        )
+        self._count("succeeded")
+
+    def _update(self, job_id: str, **values: Any) -> None:
+        with self.engine.begin() as conn:
+            conn.execute(update(Job).where(Job.id == job_id).values(**values))
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._stats[name] += 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"workers": len(self._threads), **self._stats}
+
+
+job_runner = JobRunner(
+    engine,
+    SessionLocal,
+    workers=settings.job_workers,
+    poll_interval=settings.job_poll_interval,
+    max_attempts=settings.job_max_attempts,
+    backoff_seconds=settings.job_retry_backoff_seconds,
+    stale_after_seconds=settings.job_stale_after_seconds,
+)
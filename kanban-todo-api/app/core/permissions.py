@@ -0,0 +1,102 @@
+from fastapi import Depends, HTTPException, status
+from sqlalchemy.orm import Session
+from typing import Dict, List, Optional
+
+from app.database import get_db
+from app.database.models import User, Board, Task
+from .deps import get_current_user, optional_current_user, stream_current_user
+
+class PermissionResolver:
+    """
+    Resolve quyền của user trên board, dùng chung trong một request.
+    Board đã load được nhớ lại nên mỗi board chỉ tốn một lookup theo primary key.
+    """
+
+    def __init__(self, db: Session, user: Optional[User]):
+        self.db = db
+        self.user = user
+        self._boards: Dict[int, Optional[Board]] = {}
+
+    @property
+    def is_admin(self) -> bool:
+        return self.user is not None and self.user.role == "admin"
+
+    def get_board(self, board_id: int) -> Optional[Board]:
+        """Load board (memoized trong request)"""
+        if board_id not in self._boards:
+            self._boards[board_id] = self.db.get(Board, board_id)
+        return self._boards[board_id]
+
+    def load_boards(self, board_ids: List[int]) -> None:
+        """Load nhiều board trong một query (thay vì một lookup cho mỗi board)"""
+        missing = [board_id for board_id in board_ids if board_id not in self._boards]
+        if not missing:
+            return
+        boards = {board.id: board for board in self.db.query(Board).filter(Board.id.in_(missing))}
+        for board_id in missing:
+            self._boards[board_id] = boards.get(board_id)
+
+    def can_access(self, board: Board, action: str = "read") -> bool:
+        """Admin/owner có full access, public board chỉ cho phép read"""
+        if self.user is not None and (self.is_admin or board.owner_id == self.user.id):
+            return True
+        return board.is_public and action == "read"
+
+    def require_board(
+        self,
+        board_id: int,
+        action: str = "read",
+        detail: str = "Không có quyền truy cập board này"
+    ) -> Board:
+        """Trả về board nếu user có quyền `action`, ngược lại raise 404/403"""
+        board = self.get_board(board_id)
+        if not board:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Board không tồn tại"
+            )
+
+        if not self.can_access(board, action):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail=detail
+            )
+        return board
+
+    def require_task(
+        self,
+        task_id: int,
+        action: str = "read",
+        detail: str = "Không có quyền truy cập task này"
+    ) -> Task:
+        """Trả về task nếu user có quyền `action` trên board chứa task"""
+        task = self.db.get(Task, task_id)
+        if not task:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Task không tồn tại"
+            )
+
+        self.require_board(task.board_id, action, detail)
+        return task
+
+def get_permission_resolver(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+) -> PermissionResolver:
+    """Dependency: permission resolver cho user đã đăng nhập"""
+    return PermissionResolver(db, current_user)
+
+def optional_permission_resolver(
+    db: Session = Depends(get_db),
+    current_user: Optional[User] = Depends(optional_current_user)
+) -> PermissionResolver:
+    """Dependency: permission resolver cho cả anonymous user"""
+    return PermissionResolver(db, current_user)
+
+def stream_permission_resolver(
+    db: Session = Depends(get_db),
+    current_user: Optional[User] = Depends(stream_current_user)
+) -> PermissionResolver:
+    """Dependency: permission resolver cho streaming endpoint (token qua query param)"""
+    return PermissionResolver(db, current_user)
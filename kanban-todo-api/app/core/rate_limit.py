@@ -0,0 +1,212 @@
+"""
+Admission control cho các endpoint login.
+
+- Token bucket theo username và theo IP client (429 khi hết token)
+- Giới hạn tổng số password verification chạy đồng thời (503 khi đầy)
+
+State của token bucket nằm trong một store có thể thay thế: MemoryRateLimitStore
+cho một process, SQLiteRateLimitStore dùng chung một file giữa nhiều worker trên
+cùng máy (stand-in cho một store dùng chung như Redis).
+"""
+import math
+import sqlite3
+from abc import ABC, abstractmethod
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Iterator, Optional, Tuple
+
+from .config import settings
+from .hashing import PasswordHasherBusy
+
+
+MAX_RETRY_AFTER_SECONDS = 3600.0  # Retry-After tối đa gửi cho client
+
+
+class RateLimitExceeded(Exception):
+    """Client đã vượt quá rate limit"""
+
+    def __init__(self, retry_after: float):
+        retry_after = min(retry_after, MAX_RETRY_AFTER_SECONDS)
+        super().__init__(f"Rate limit exceeded, retry after {retry_after:.1f}s")
+        self.retry_after = retry_after
+
+
+class LoginCapacityExceeded(PasswordHasherBusy):
+    """Đã đủ số password verification chạy đồng thời cho login"""
+
+
+def _refill(tokens: float, updated_at: float, now: float, capacity: float, refill_rate: float) -> float:
+    return min(capacity, tokens + (now - updated_at) * refill_rate)
+
+
+def _retry_after(tokens: float, cost: float, refill_rate: float) -> float:
+    if refill_rate <= 0:
+        return math.inf
+    return (cost - tokens) / refill_rate
+
+
+class RateLimitStore(ABC):
+    """Interface cho store lưu token bucket"""
+
+    @abstractmethod
+    def take(self, key: str, capacity: float, refill_rate: float, cost: float = 1.0) -> float:
+        """
+        Lấy `cost` token từ bucket `key`.
+        Trả về 0 nếu được phép, ngược lại là số giây cần chờ.
+        """
+
+
+class MemoryRateLimitStore(RateLimitStore):
+    """
+    Token bucket trong memory của process hiện tại.
+    Tối đa `max_keys` bucket: vượt quá thì bỏ bucket lâu nhất không được dùng (LRU),
+    bucket đó đã refill nhiều nhất nên bỏ đi gần như không nới limit
+    """
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()  # Cũ nhất ở đầu
+        self._lock = threading.Lock()
+
+    def take(self, key: str, capacity: float, refill_rate: float, cost: float = 1.0) -> float:
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.pop(key, (capacity, now))
+            tokens = _refill(tokens, updated_at, now, capacity, refill_rate)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+            return 0.0 if allowed else _retry_after(tokens, cost, refill_rate)
+
+
+class SQLiteRateLimitStore(RateLimitStore):
+    """
+    Token bucket lưu trong file SQLite, dùng chung giữa các worker.
+    Mỗi row có expires_at (lúc bucket refill đầy, tương đương bucket mới):
+    row đã hết hạn được xóa mỗi `prune_interval` giây
+    """
+
+    def __init__(self, path: str, prune_interval: float = 60.0):
+        self.path = path
+        self.prune_interval = prune_interval
+        self._next_prune = 0.0
+        self._local = threading.local()
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS rate_limit_buckets ("
+                "key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL, "
+                "expires_at REAL NOT NULL DEFAULT 0)"
+            )
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(rate_limit_buckets)")}
+            if "expires_at" not in columns:
+                # File tạo trước khi có expiry: row cũ (expires_at = 0) bị xóa ở lần prune đầu
+                conn.execute("ALTER TABLE rate_limit_buckets ADD COLUMN expires_at REAL NOT NULL DEFAULT 0")
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS ix_rate_limit_buckets_expires_at ON rate_limit_buckets (expires_at)"
+            )
+            self._local.conn = conn
+        return conn
+
+    def take(self, key: str, capacity: float, refill_rate: float, cost: float = 1.0) -> float:
+        # Wall clock vì các process không chia sẻ monotonic clock
+        now = time.time()
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT tokens, updated_at FROM rate_limit_buckets WHERE key = ?", (key,)
+            ).fetchone()
+            tokens = capacity if row is None else _refill(row[0], row[1], now, capacity, refill_rate)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            expires_at = now + (capacity - tokens) / refill_rate if refill_rate > 0 else math.inf
+            conn.execute(
+                "INSERT INTO rate_limit_buckets (key, tokens, updated_at, expires_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET tokens = excluded.tokens, updated_at = excluded.updated_at, "
+                "expires_at = excluded.expires_at",
+                (key, tokens, now, expires_at),
+            )
+            if now >= self._next_prune:
+                self._next_prune = now + self.prune_interval
+                conn.execute("DELETE FROM rate_limit_buckets WHERE expires_at <= ?", (now,))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return 0.0 if allowed else _retry_after(tokens, cost, refill_rate)
+
+
+def create_rate_limit_store(backend: str, sqlite_path: Optional[str] = None) -> RateLimitStore:
+    """Tạo store theo cấu hình ("memory" hoặc "sqlite")"""
+    if backend == "memory":
+        return MemoryRateLimitStore()
+    if backend == "sqlite":
+        return SQLiteRateLimitStore(sqlite_path or "rate_limit.db")
+    raise ValueError(f"Unknown rate limit backend: {backend}")
+
+
+class LoginRateLimiter:
+    """Token bucket theo username/IP và giới hạn verification đồng thời"""
+
+    def __init__(
+        self,
+        store: RateLimitStore,
+        user_burst: int,
+        user_per_minute: int,
+        ip_burst: int,
+        ip_per_minute: int,
+        max_concurrent_verifications: int,
+    ):
+        if user_per_minute <= 0 or ip_per_minute <= 0:
+            # Rate 0 nghĩa là bucket không bao giờ refill (Retry-After vô hạn)
+            raise ValueError("LOGIN_USER_PER_MINUTE và LOGIN_IP_PER_MINUTE phải lớn hơn 0")
+        self.store = store
+        self.user_burst = user_burst
+        self.user_rate = user_per_minute / 60
+        self.ip_burst = ip_burst
+        self.ip_rate = ip_per_minute / 60
+        self._verifications = threading.BoundedSemaphore(max_concurrent_verifications)
+
+    def check(self, username: str, client_ip: Optional[str]) -> None:
+        """Raise RateLimitExceeded nếu username hoặc IP đã hết token"""
+        if client_ip:
+            retry_after = self.store.take(f"login:ip:{client_ip}", self.ip_burst, self.ip_rate)
+            if retry_after:
+                raise RateLimitExceeded(retry_after)
+
+        retry_after = self.store.take(
+            f"login:user:{username.strip().lower()}", self.user_burst, self.user_rate
+        )
+        if retry_after:
+            raise RateLimitExceeded(retry_after)
+
+    @contextmanager
+    def verification_slot(self) -> Iterator[None]:
+        """Giữ một slot verification, raise LoginCapacityExceeded nếu hết slot"""
+        if not self._verifications.acquire(blocking=False):
+            raise LoginCapacityExceeded()
+        try:
+            yield
+        finally:
+            self._verifications.release()
+
+
+login_rate_limiter = LoginRateLimiter(
+    store=create_rate_limit_store(settings.login_rate_limit_backend, settings.login_rate_limit_sqlite_path),
+    user_burst=settings.login_user_burst,
+    user_per_minute=settings.login_user_per_minute,
+    ip_burst=settings.login_ip_burst,
+    ip_per_minute=settings.login_ip_per_minute,
+    max_concurrent_verifications=settings.login_max_concurrent_verifications,
+)
@@ -0,0 +1,52 @@
+"""
+JSON response nhanh.
+
+Mặc định FastAPI validate lại giá trị route trả về theo response_model rồi mới
+chạy jsonable_encoder + json.dumps. Route đã tự build response model (model_validate)
+thì có thể trả FastJSONResponse trực tiếp: FastAPI bỏ qua response_model
+(vẫn dùng cho OpenAPI docs) và pydantic model được serialize thẳng bằng
+serializer của pydantic-core, không qua dict trung gian.
+"""
+from typing import Any, Iterable, Mapping, Optional
+
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+from pydantic_core import to_json
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse serialize bằng pydantic-core (hỗ trợ model, datetime, enum)"""
+
+    def render(self, content: Any) -> bytes:
+        return to_json(content)
+
+
+def json_response(
+    content: Any,
+    status_code: int = 200,
+    headers: Optional[Mapping[str, str]] = None
+) -> FastJSONResponse:
+    """Trả data đã validate mà không qua response_model validation lần nữa"""
+    return FastJSONResponse(content=content, status_code=status_code, headers=headers)
+
+
+def dump_list(adapter: TypeAdapter, items: Iterable[Any]) -> bytes:
+    """
+    Validate list ORM objects hoặc row tuples (from_attributes) và dump JSON bằng
+    TypeAdapter đã compile sẵn: hai lần gọi vào pydantic-core cho cả list thay
+    vì một vòng model_validate trong Python cho từng row.
+    """
+    return adapter.dump_json(adapter.validate_python(items, from_attributes=True))
+
+
+def list_response(
+    adapter: TypeAdapter,
+    items: Iterable[Any],
+    status_code: int = 200,
+    headers: Optional[Mapping[str, str]] = None
+) -> Response:
+    """Response JSON cho list ORM objects/rows, xem dump_list"""
+    return Response(
+        content=dump_list(adapter, items), status_code=status_code, headers=headers, media_type="application/json"
+    )
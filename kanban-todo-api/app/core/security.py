@@ -1,8 +1,17 @@
+import hashlib
+import secrets
 from datetime import datetime, timedelta
 from typing import Optional, Union, Any
-from jose import jwt, JWTError
-import bcrypt
+from jose.exceptions import JWTError
 from .config import settings
+from .hashing import PasswordHasher
+
+# Pool riêng cho bcrypt, dùng chung cho toàn bộ app
+password_hasher = PasswordHasher(
+    rounds=settings.bcrypt_rounds,
+    max_workers=settings.password_hash_workers,
+    max_pending=settings.password_hash_max_pending,
+)
 
 def create_access_token(
     subject: Union[str, Any], 
@@ -23,6 +32,8 @@ def create_access_token(
         "user_id": subject
     }
     
+    from jose import jwt  # Import lúc dùng: jose kéo theo cryptography, làm chậm startup
+    
     encoded_jwt = jwt.encode(
         to_encode, 
         settings.secret_key, 
@@ -32,6 +43,8 @@ def create_access_token(
 
 def verify_token(token: str) -> Optional[dict]:
     """Verify và decode JWT token"""
+    from jose import jwt
+    
     try:
         payload = jwt.decode(
             token, 
@@ -42,13 +55,28 @@ def verify_token(token: str) -> Optional[dict]:
     except JWTError:
         return None
 
+def generate_refresh_token() -> str:
+    """Tạo refresh token ngẫu nhiên (opaque, không phải JWT)"""
+    return secrets.token_urlsafe(32)
+
+def hash_refresh_token(token: str) -> str:
+    """
+    Hash refresh token để lưu DB.
+    Token có 256 bit entropy nên SHA-256 là đủ, không cần bcrypt.
+    """
+    return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
 def get_password_hash(password: str) -> str:
-    """Hash password với bcrypt"""
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds=12)).decode('utf-8')
+    """Hash password với bcrypt (chạy trên password hasher pool)"""
+    return password_hasher.hash(password)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify password với hashed password"""
-    return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
+    """Verify password với hashed password (chạy trên password hasher pool)"""
+    return password_hasher.verify(plain_password, hashed_password)
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    """Kiểm tra hash có dùng cost factor khác cấu hình hiện tại không"""
+    return password_hasher.needs_rehash(hashed_password)
 
 def create_token_payload(user_id: int, username: str, role: str = "user") -> dict:
     """Tạo payload cho JWT token"""
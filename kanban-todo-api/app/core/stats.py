@@ -0,0 +1,113 @@
+"""
+Thống kê board cho dashboard (GET /boards/{id}/stats, GET /boards/stats).
+
+- Mọi board cần tính được gom vào một query GROUP BY (TaskRepository.stats_rows)
+- Kết quả được cache theo board_version (revision tăng mỗi khi board/task đổi)
+  nên không cần invalidate: ghi vào board tạo key mới, key cũ bị LRU loại dần.
+  Cache nằm trong memory của từng worker nhưng vẫn đúng khi chạy nhiều worker
+- "overdue" phụ thuộc thời gian nên key kèm time bucket
+  (board_stats_overdue_granularity_seconds)
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy.orm import Session
+
+from .config import settings
+from .etag import make_etag
+from app.database import board_version, task_repository
+from app.database.models import Board, StatusEnum, PriorityEnum
+from app.schemas.board import BoardStats
+
+StatsKey = Tuple[str, int]  # (board_version, time bucket)
+
+
+class BoardStatsCache:
+    """LRU cache BoardStats theo (board_version, time bucket)"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[StatsKey, BoardStats]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, key: StatsKey) -> Optional[BoardStats]:
+        with self._lock:
+            stats = self._entries.get(key)
+            if stats is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return stats
+
+    def set(self, key: StatsKey, stats: BoardStats) -> None:
+        with self._lock:
+            self._entries[key] = stats
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self._hits, "misses": self._misses}
+
+
+board_stats_cache = BoardStatsCache(settings.board_stats_cache_size)
+
+
+def _time_bucket() -> int:
+    return int(time.time() // max(1, settings.board_stats_overdue_granularity_seconds))
+
+
+def stats_etag(boards: Sequence[Board]) -> str:
+    """ETag theo version của các board và time bucket của "overdue\""""
+    versions = ",".join(board_version(board) for board in boards)
+    digest = hashlib.sha1(versions.encode()).hexdigest()[:16]
+    return make_etag("stats", _time_bucket(), digest)
+
+
+def _empty_stats(board_id: int) -> BoardStats:
+    return BoardStats(
+        board_id=board_id,
+        by_status={status.value: 0 for status in StatusEnum},
+        by_priority={priority.value: 0 for priority in PriorityEnum},
+    )
+
+
+def compute_board_stats(db: Session, boards: Sequence[Board]) -> List[BoardStats]:
+    """Stats của các board (theo thứ tự truyền vào), board chưa có trong cache tính bằng một query"""
+    bucket = _time_bucket()
+    results: Dict[int, BoardStats] = {}
+    missing: Dict[int, StatsKey] = {}
+    for board in boards:
+        key = (board_version(board), bucket)
+        cached = board_stats_cache.get(key)
+        if cached is not None:
+            results[board.id] = cached
+        else:
+            missing[board.id] = key
+
+    if missing:
+        computed = {board_id: _empty_stats(board_id) for board_id in missing}
+        for row in task_repository.stats_rows(db, list(missing), datetime.utcnow()):
+            stats = computed[row.board_id]
+            stats.total += row.count
+            stats.by_status[row.status.value] += row.count
+            stats.by_priority[row.priority.value] += row.count
+            if row.unassigned:
+                stats.unassigned += row.count
+            else:
+                stats.assigned += row.count
+            if row.overdue:
+                stats.overdue += row.count
+        for board_id, stats in computed.items():
+            board_stats_cache.set(missing[board_id], stats)
+        results.update(computed)
+
+    return [results[board.id] for board in boards]
@@ -0,0 +1,104 @@
+"""
+Delta sync cho board (GET /boards/{id}/changes?since=<token>).
+
+Sync token gồm thời điểm tạo board (phát hiện id bị dùng lại), board revision
+lúc sync, mốc updated_at/deleted_at lớn nhất client đã nhận và thời điểm sync.
+Khi revision không đổi thì trả về ngay không cần query tasks. Retention của
+tombstones được so với thời điểm sync (không phải mốc thay đổi cuối), nên
+board lâu không đổi vẫn delta sync được. Các lần sync sau đọc lùi lại
+`sync_overlap_seconds` để không sót transaction ghi updated_at sớm nhưng commit
+muộn; client upsert theo id nên nhận trùng không ảnh hưởng.
+"""
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from .config import settings
+from app.database import task_repository
+from app.database.models import Board
+from app.schemas.board import BoardChanges
+from app.schemas.task import task_list_adapter
+
+EPOCH = datetime(1970, 1, 1)
+MICROSECOND = timedelta(microseconds=1)
+
+
+def _to_us(value: datetime) -> int:
+    return (value - EPOCH) // MICROSECOND
+
+
+def _from_us(value: int) -> datetime:
+    return EPOCH + value * MICROSECOND
+
+
+@dataclass
+class SyncToken:
+    board_created: int  # Microseconds
+    revision: int
+    timestamp: int  # Microseconds, mốc thay đổi lớn nhất client đã nhận
+    synced_at: int  # Microseconds, thời điểm server trả token này
+
+    def encode(self) -> str:
+        return f"{self.board_created:x}.{self.revision:x}.{self.timestamp:x}.{self.synced_at:x}"
+
+
+def parse_sync_token(token: str) -> Optional[SyncToken]:
+    """Đọc sync token, None nếu token không hợp lệ"""
+    parts = token.split(".")
+    if len(parts) not in (3, 4):
+        return None
+    try:
+        values = [int(part, 16) for part in parts]
+    except ValueError:
+        return None
+    if len(values) == 3:
+        # Token cũ chưa có thời điểm sync: dùng mốc thay đổi cuối (sớm hơn, an toàn)
+        values.append(values[2])
+    return SyncToken(*values)
+
+
+def board_changes(db: Session, board: Board, since: Optional[SyncToken]) -> BoardChanges:
+    """Tasks đã tạo/sửa và task ids đã xóa kể từ `since` (None = full sync)"""
+    now = datetime.utcnow()
+    synced_at = _to_us(now)
+    board_created = _to_us(board.created_at)
+
+    if since is not None and since.board_created == board_created and since.revision == board.revision:
+        # Board không đổi kể từ lần sync trước: chỉ làm mới thời điểm sync
+        token = SyncToken(board_created, board.revision, since.timestamp, synced_at)
+        return BoardChanges(board_id=board.id, sync_token=token.encode(), full=False)
+
+    # Tombstones cũ hơn retention có thể đã bị xóa: client sync lần cuối trước đó phải full sync
+    retention_start = _to_us(now - timedelta(days=settings.sync_tombstone_retention_days))
+    full = (
+        since is None
+        or since.board_created != board_created
+        or since.synced_at < retention_start
+    )
+
+    if full:
+        rows = task_repository.list_rows(db, board_id=board.id)
+        tombstones = []
+        timestamp = board_created
+    else:
+        updated_since = _from_us(since.timestamp) - timedelta(seconds=settings.sync_overlap_seconds)
+        rows = task_repository.list_rows(db, board_id=board.id, updated_since=updated_since)
+        tombstones = task_repository.deleted_since(db, board.id, updated_since)
+        timestamp = since.timestamp
+
+    for row in rows:
+        timestamp = max(timestamp, _to_us(row.updated_at))
+    for tombstone in tombstones:
+        timestamp = max(timestamp, _to_us(tombstone.deleted_at))
+
+    # Task bị xóa rồi tạo lại trong cùng khoảng thời gian: chỉ giữ bản đang tồn tại
+    current_ids = {row.id for row in rows}
+    return BoardChanges(
+        board_id=board.id,
+        sync_token=SyncToken(board_created, board.revision, timestamp, synced_at).encode(),
+        full=full,
+        tasks=task_list_adapter.validate_python(rows, from_attributes=True),
+        deleted_task_ids=sorted({t.task_id for t in tombstones if t.task_id not in current_ids}),
+    )
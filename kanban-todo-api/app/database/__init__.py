@@ -1,11 +1,15 @@
-from .connection import Base, engine, get_db, create_tables, SessionLocal
-from .models import User, Board, Task, StatusEnum, PriorityEnum
-from .repository import user_repository, board_repository, task_repository
+from .connection import Base, engine, read_engine, get_db, create_tables, warm_up_pool, dispose_engines, SessionLocal
+from .models import User, Board, Task, TaskTombstone, TaskEvent, AuditLog, Job, RefreshToken, ListingVersion, StatusEnum, PriorityEnum
+from .sharding import shard_router
+from .repository import user_repository, board_repository, task_repository, refresh_token_repository, audit_log_repository, get_repositories
+from .versions import board_listing_version, board_version, register_change_listener, ChangeSet, is_public_scope
+from . import history  # noqa: F401  Đăng ký listener ghi task_events
 
 
 __all__ = [
-    "Base", "engine", "get_db", "create_tables", "SessionLocal"
-    "User", "Board", "Task", "StatusEnum", "PriorityEnum", 
-    "user_repository", "board_repository", "task_repository"
+    "Base", "engine", "read_engine", "get_db", "create_tables", "warm_up_pool", "dispose_engines", "SessionLocal", "shard_router",
+    "User", "Board", "Task", "TaskTombstone", "TaskEvent", "AuditLog", "Job", "RefreshToken", "ListingVersion", "StatusEnum", "PriorityEnum", 
+    "user_repository", "board_repository", "task_repository", "refresh_token_repository", "audit_log_repository", "get_repositories",
+    "board_listing_version", "board_version", "register_change_listener", "ChangeSet", "is_public_scope"
 ]
 
@@ -1,24 +1,209 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+from typing import Dict, Optional
+from fastapi import Request
+from sqlalchemy import MetaData, create_engine, event, inspect
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.horizontal_shard import ShardedSession
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
 from app.core.config import settings
 
-print(settings.database_url)
+# Sharding (app.database.sharding): database chính là shard "default" và là directory
+# (users, tokens, board -> shard...), các bảng dưới đây được chia theo board_id
+DEFAULT_SHARD = "default"
+SHARDED_TABLES = frozenset({"boards", "tasks", "task_tombstones", "task_events"})
 
-engine = create_engine(
-    settings.database_url,
-    echo=settings.database_echo,
-)
+def pool_size_per_worker(budget: int, workers: int) -> int:
+    """Chia connection budget cho các worker, mỗi worker ít nhất 1 kết nối"""
+    return max(1, budget // max(1, workers))
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+def _pool_options(database_url: str) -> dict:
+    # SQLite in-memory dùng SingletonThreadPool, không có pool_size/max_overflow
+    url = make_url(database_url)
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        return {}
+    # Không overflow: tổng kết nối của mọi worker không vượt quá budget
+    return {
+        "pool_size": pool_size_per_worker(settings.database_connection_budget, settings.web_concurrency),
+        "max_overflow": 0,
+    }
+
+def is_sqlite_file(database_url: str) -> bool:
+    url = make_url(database_url)
+    return url.get_backend_name() == "sqlite" and url.database not in (None, "", ":memory:")
+
+def _tune_sqlite(engine: Engine, begin: Optional[str] = None, query_only: bool = False) -> None:
+    """PRAGMA cho mỗi kết nối SQLite mới, `begin`: lệnh mở transaction thay cho pysqlite"""
+    pragmas = [
+        f"PRAGMA busy_timeout={settings.sqlite_busy_timeout_ms}",  # Chờ lock thay vì "database is locked" ngay
+        "PRAGMA journal_mode=WAL",  # Đọc không chặn ghi và ngược lại
+        f"PRAGMA synchronous={settings.sqlite_synchronous}",
+        f"PRAGMA cache_size=-{settings.sqlite_cache_size_kb}",
+        f"PRAGMA mmap_size={settings.sqlite_mmap_size_mb * 1024 * 1024}",
+        "PRAGMA foreign_keys=ON",
+    ]
+    if query_only:
+        # Kết nối đọc: journal_mode do kết nối ghi đặt (lưu trong file database)
+        pragmas.remove("PRAGMA journal_mode=WAL")
+        pragmas.append("PRAGMA query_only=ON")
+
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        if begin is not None:
+            # pysqlite mặc định chỉ BEGIN trước câu ghi đầu tiên, tắt để BEGIN trong event "begin"
+            dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas:
+            cursor.execute(pragma)
+        cursor.close()
+
+    if begin is not None:
+        @event.listens_for(engine, "begin")
+        def _begin(conn):
+            conn.exec_driver_sql(begin)
+
+def create_database_engine(database_url: str, pool_size: Optional[int] = None, role: Optional[str] = None) -> Engine:
+    """role "writer"/"reader": kết nối ghi duy nhất / pool đọc của SQLite (sqlite_tuned)"""
+    # create_engine không kết nối ngay, kết nối đầu tiên được mở khi warmup hoặc request đầu tiên
+    pool_options = _pool_options(database_url) if pool_size is None else {"pool_size": pool_size, "max_overflow": 0}
+    engine = create_engine(database_url, echo=settings.database_echo, **pool_options)
+    if settings.sqlite_tuned and is_sqlite_file(database_url):
+        # Writer lấy write lock ngay lúc BEGIN (chờ theo busy_timeout): transaction đọc rồi mới ghi
+        # không bị SQLITE_BUSY khi nâng lock. Reader đọc trên một snapshot cho cả transaction.
+        # Engine khác giữ cách pysqlite mở transaction (SELECT ngoài transaction, BEGIN trước câu ghi)
+        begin = {"writer": "BEGIN IMMEDIATE", "reader": "BEGIN"}.get(role)
+        _tune_sqlite(engine, begin=begin, query_only=role == "reader")
+    return engine
+
+# SQLite một node: một kết nối ghi (các transaction ghi xếp hàng trong pool, không tranh
+# lock trong SQLite) và pool kết nối đọc query_only. Khi shard thì mỗi database một engine.
+sqlite_split = settings.sqlite_tuned and is_sqlite_file(settings.database_url) and not settings.database_shards
+if sqlite_split:
+    engine = create_database_engine(settings.database_url, pool_size=1, role="writer")
+    read_engine = create_database_engine(settings.database_url, pool_size=settings.sqlite_reader_pool_size, role="reader")
+else:
+    engine = read_engine = create_database_engine(settings.database_url)
+
+# Shard "default" là database chính, các shard còn lại theo thứ tự trong DATABASE_SHARDS
+shard_engines: Dict[str, Engine] = {DEFAULT_SHARD: engine}
+for index, shard_url in enumerate(settings.database_shards, start=1):
+    shard_engines[f"shard{index}"] = create_database_engine(shard_url)
+
+class RoutingSession(ShardedSession):
+    """ShardedSession nhận cả Core statement không có mapper (shard_chooser quyết định theo clause)"""
+    
+    def get_bind(self, mapper=None, *, shard_id=None, instance=None, clause=None, **kw):
+        if mapper is not None:
+            # Như Session.get_bind: nhận cả mapped class
+            mapper = inspect(mapper)
+        elif shard_id is None and instance is None:
+            shard_id = self.shard_chooser(None, None, clause=clause)
+        return super().get_bind(mapper, shard_id=shard_id, instance=instance, clause=clause, **kw)
+
+class ReadWriteSession(Session):
+    """
+    Đọc qua `read_bind`; flush, DML và mọi câu sau lần ghi đầu tiên của transaction
+    dùng `bind` (writer) để đọc được dữ liệu vừa ghi
+    """
+    
+    def __init__(self, *args, read_bind: Optional[Engine] = None, **kw):
+        super().__init__(*args, **kw)
+        self.read_bind = read_bind
+    
+    def get_bind(self, mapper=None, *, clause=None, **kw):
+        if self.read_bind is None or self.info.get("writing") or getattr(clause, "is_dml", False):
+            self.info["writing"] = True
+            return self.bind
+        return self.read_bind
+
+@event.listens_for(ReadWriteSession, "before_flush", insert=True)
+def _start_writing(session, flush_context, instances):
+    # Chạy trước các before_flush listener khác: mọi câu trong flush (kể cả SELECT của listener) dùng writer
+    session.info["writing"] = True
+
+@event.listens_for(ReadWriteSession, "after_transaction_end")
+def _end_writing(session, transaction):
+    if transaction.parent is None:
+        session.info.pop("writing", None)
+
+if len(shard_engines) > 1:
+    # shards/choosers được cấu hình trong app.database.sharding (SessionLocal.configure)
+    SessionLocal = sessionmaker(class_=RoutingSession, autocommit=False, autoflush=False)
+elif sqlite_split:
+    SessionLocal = sessionmaker(class_=ReadWriteSession, autocommit=False, autoflush=False, bind=engine, read_bind=read_engine)
+else:
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+def session_for(bind: Engine) -> Session:
+    """Session của SessionLocal (giữ listeners của app) trên engine khác, ví dụ database benchmark"""
+    if "read_bind" in SessionLocal.kw:
+        # Không để đọc đi qua reader pool của database app
+        return SessionLocal(bind=bind, read_bind=bind)
+    return SessionLocal(bind=bind)
 
 Base = declarative_base()
 
-def get_db():
+def get_db(request: Request):
+    """
+    Session theo request (unit of work): repositories chỉ flush, UnitOfWorkRoute
+    commit một lần trước khi gửi response. Phần sau yield chạy sau khi response
+    đã gửi nên chỉ close (rollback những gì chưa commit, ví dụ khi route lỗi)
+    """
     db = SessionLocal()
+    request.state.db = db
     try:
         yield db
     finally:
         db.close()
 
-def create_tables():
-    Base.metadata.create_all(bind=engine)
+def sharded_metadata() -> MetaData:
+    """Các bảng đã shard, bỏ foreign key tới bảng chỉ có ở database chính (users...)"""
+    metadata = MetaData()
+    for name, table in Base.metadata.tables.items():
+        if name in SHARDED_TABLES:
+            copy = table.to_metadata(metadata)
+            for foreign_key in list(copy.foreign_keys):
+                if foreign_key.target_fullname.split(".")[0] not in SHARDED_TABLES:
+                    copy.foreign_keys.discard(foreign_key)
+                    copy.constraints.discard(foreign_key.constraint)
+                    foreign_key.parent.foreign_keys.discard(foreign_key)
+    return metadata
+
+def create_tables(attempts: int = 3):
+    for attempt in range(attempts):
+        try:
+            Base.metadata.create_all(bind=engine)
+            # Shard khác chỉ chứa boards/tasks và dữ liệu đi theo board
+            shard_metadata = sharded_metadata()
+            for shard_id, shard_engine in shard_engines.items():
+                if shard_id != DEFAULT_SHARD:
+                    shard_metadata.create_all(bind=shard_engine)
+            return
+        except OperationalError:
+            # Nhiều worker cùng startup: worker khác vừa tạo table, chạy lại (create_all bỏ qua table đã có)
+            if attempt == attempts - 1:
+                raise
+
+def warm_up_pool(connections: int) -> int:
+    """Mở sẵn tối đa `connections` kết nối rồi trả về pool, trả về số kết nối đã mở"""
+    # Không mở nhiều hơn pool của worker, nếu không sẽ chờ pool_timeout
+    if sqlite_split:
+        # Kết nối ghi đã mở trong create_tables, warmup pool đọc
+        connections = min(connections, settings.sqlite_reader_pool_size)
+    else:
+        connections = min(connections, pool_size_per_worker(settings.database_connection_budget, settings.web_concurrency))
+    opened = []
+    try:
+        for _ in range(connections):
+            conn = read_engine.connect()
+            opened.append(conn)
+            conn.exec_driver_sql("SELECT 1")
+    finally:
+        for conn in opened:
+            conn.close()
+    return len(opened)
+
+def dispose_engines():
+    """Đóng connection pool của database chính (ghi và đọc) và mọi shard"""
+    read_engine.dispose()
+    for shard_engine in shard_engines.values():
+        shard_engine.dispose()
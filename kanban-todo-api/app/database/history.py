@@ -0,0 +1,73 @@
+"""
+Lịch sử task append-only (task_events) cho lead time / cycle time.
+
+Event được gom trong after_flush (task mới đã có id, history của attribute
+vẫn còn) và ghi bằng một câu INSERT nhiều row trong cùng transaction: mỗi
+flush chỉ thêm một statement, event không bị mất khi request lỗi sau commit
+và không có event nào cho transaction bị rollback.
+
+- created: task mới (to_status, assigned_to)
+- moved: status hoặc board thay đổi (from_status -> to_status)
+- assigned: assigned_to thay đổi
+- deleted: task bị xóa
+
+Khi xóa board, toàn bộ event của board bị xóa theo.
+"""
+from datetime import datetime
+from typing import Any, Dict, List, Tuple
+
+from sqlalchemy import delete, event, insert, inspect
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from .connection import SessionLocal
+from .models import Board, Task, TaskEvent
+from .sharding import group_by_connection
+
+
+def _first_deleted(history) -> Any:
+    deleted = history.deleted or ()
+    return deleted[0] if deleted else None
+
+
+@event.listens_for(SessionLocal, "after_flush")
+def _record_task_events(session: Session, flush_context) -> None:
+    if not settings.task_events_enabled:
+        return
+
+    now = datetime.utcnow()
+    rows: List[Tuple[Task, Dict[str, Any]]] = []
+
+    def add(task: Task, event_type: str, **values) -> None:
+        rows.append((task, {
+            "task_id": task.id, "board_id": task.board_id, "type": event_type,
+            "from_status": None, "to_status": None, "assigned_to": task.assigned_to,
+            "created_at": now, **values,
+        }))
+
+    for obj in session.new:
+        if isinstance(obj, Task):
+            add(obj, "created", to_status=obj.status)
+
+    for obj in session.dirty:
+        if not isinstance(obj, Task) or not session.is_modified(obj):
+            continue
+        state = inspect(obj).attrs
+        if state.status.history.has_changes() or state.board_id.history.has_changes():
+            add(obj, "moved", from_status=_first_deleted(state.status.history) or obj.status, to_status=obj.status)
+        if state.assigned_to.history.has_changes():
+            add(obj, "assigned")
+
+    deleted = [obj for obj in session.deleted if isinstance(obj, Board)]
+    deleted_boards = {obj.id for obj in deleted}
+    for obj in session.deleted:
+        if isinstance(obj, Task) and obj.board_id not in deleted_boards:
+            add(obj, "deleted", from_status=obj.status)
+
+    # Một INSERT cho mỗi database (chỉ một khi không shard)
+    values = {id(task): row for task, row in rows}
+    for connection, tasks in group_by_connection(session, [task for task, _ in rows]):
+        connection.execute(insert(TaskEvent), [values[id(task)] for task in tasks])
+    for connection, boards in group_by_connection(session, deleted):
+        # Lịch sử đi cùng board; SQLite có thể dùng lại id của board đã xóa
+        connection.execute(delete(TaskEvent).where(TaskEvent.board_id.in_([board.id for board in boards])))
@@ -0,0 +1,686 @@
+"""
+Repository backend trong memory (get_repositories("memory")), cùng interface với
+UserRepository/BoardRepository/TaskRepository trong repository.py.
+
+Dùng cho test chạy nhanh và làm baseline không I/O trong benchmark; các router
+vẫn dùng SQLAlchemy Session (permissions, listeners, sharding...).
+
+- Dữ liệu là dict theo id, mọi thao tác chạy dưới một lock. Object trả về là
+  bản copy (SimpleNamespace cùng tên field với model), sửa object không đổi
+  dữ liệu cho tới khi gọi update()
+- Secondary index: username/email, boards theo owner, public boards, tasks theo
+  board, tasks theo (board, status) sắp xếp theo (position, id), tasks theo
+  (board, due_date), tasks theo assignee. Lookup theo board/status/due
+  date/assignee không scan mọi task
+- Snapshot (tùy chọn): ghi toàn bộ dữ liệu ra file JSON (ghi file tạm rồi
+  rename) khi stop() và định kỳ mỗi snapshot_interval giây nếu có thay đổi;
+  store đọc lại snapshot khi khởi tạo
+- Task thay đổi thì tăng revision của board, task bị xóa để lại tombstone
+  (deleted_since) như backend SQL
+"""
+import heapq
+import json
+import os
+import tempfile
+import threading
+from bisect import bisect_left, insort
+from collections import Counter
+from datetime import datetime
+from types import SimpleNamespace
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from app.core.config import settings
+from app.core.security import get_password_hash, password_needs_rehash, verify_password
+from .models import PriorityEnum, StatusEnum
+
+USER_DEFAULTS = {"email": None, "role": "user", "full_name": None, "is_active": True}
+BOARD_DEFAULTS = {"description": None, "is_public": False, "revision": 1, "version": 1}
+TASK_DEFAULTS = {
+    "description": None, "status": StatusEnum.todo, "priority": PriorityEnum.medium,
+    "position": 0, "assigned_to": None, "due_date": None, "version": 1,
+}
+DATETIME_FIELDS = ("created_at", "updated_at", "due_date", "deleted_at")
+
+
+def _fields(values: Any) -> Dict[str, Any]:
+    """Pydantic model hoặc dict -> dict (như BaseRepository.create/update)"""
+    if hasattr(values, "model_dump"):
+        return values.model_dump(exclude_unset=True)
+    return dict(values)
+
+
+def _encode(row: Dict[str, Any]) -> Dict[str, Any]:
+    return {key: value.isoformat() if isinstance(value, datetime) else value for key, value in row.items()}
+
+
+def _decode(row: Dict[str, Any]) -> Dict[str, Any]:
+    for key in DATETIME_FIELDS:
+        if row.get(key) is not None:
+            row[key] = datetime.fromisoformat(row[key])
+    if "status" in row:
+        row["status"] = StatusEnum(row["status"])
+    if "priority" in row:
+        row["priority"] = PriorityEnum(row["priority"])
+    return row
+
+
+class MemoryStore:
+    """Users/boards/tasks trong memory với secondary index và snapshot ra đĩa"""
+
+    def __init__(self, snapshot_path: Optional[str] = None, snapshot_interval: float = 0.0):
+        self.snapshot_path = snapshot_path
+        self.snapshot_interval = snapshot_interval
+        self._lock = threading.RLock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.clear()
+        if snapshot_path and os.path.exists(snapshot_path):
+            self.load(snapshot_path)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.users: Dict[int, Dict[str, Any]] = {}
+            self.boards: Dict[int, Dict[str, Any]] = {}
+            self.tasks: Dict[int, Dict[str, Any]] = {}
+            self.tombstones: Dict[int, List[Tuple[datetime, int]]] = {}  # board_id -> [(deleted_at, task_id)]
+            self._next_ids = {"users": 1, "boards": 1, "tasks": 1}
+            self._users_by_username: Dict[str, int] = {}
+            self._users_by_email: Dict[str, int] = {}
+            self._boards_by_owner: Dict[int, Set[int]] = {}
+            self._public_boards: Set[int] = set()
+            self._tasks_by_board: Dict[int, Set[int]] = {}
+            self._columns: Dict[Tuple[int, StatusEnum], List[Tuple[int, int]]] = {}  # (board, status) -> [(position, id)]
+            self._tasks_by_assignee: Dict[int, Set[int]] = {}
+            self._due_by_board: Dict[int, List[Tuple[datetime, int]]] = {}  # board -> [(due_date, id)]
+            self._changes = 0
+
+    # Index
+
+    def _index_user(self, row: Dict[str, Any], add: bool) -> None:
+        if add:
+            self._users_by_username[row["username"]] = row["id"]
+            if row["email"] is not None:
+                self._users_by_email[row["email"]] = row["id"]
+        else:
+            self._users_by_username.pop(row["username"], None)
+            if row["email"] is not None:
+                self._users_by_email.pop(row["email"], None)
+
+    def _index_board(self, row: Dict[str, Any], add: bool) -> None:
+        owned = self._boards_by_owner.setdefault(row["owner_id"], set())
+        if add:
+            owned.add(row["id"])
+            if row["is_public"]:
+                self._public_boards.add(row["id"])
+        else:
+            owned.discard(row["id"])
+            self._public_boards.discard(row["id"])
+
+    def _index_task(self, row: Dict[str, Any], add: bool) -> None:
+        column = self._columns.setdefault((row["board_id"], row["status"]), [])
+        entry = (row["position"], row["id"])
+        due = self._due_by_board.setdefault(row["board_id"], [])
+        due_entry = (row["due_date"], row["id"])
+        if add:
+            self._tasks_by_board.setdefault(row["board_id"], set()).add(row["id"])
+            insort(column, entry)
+            if row["due_date"] is not None:
+                insort(due, due_entry)
+            if row["assigned_to"] is not None:
+                self._tasks_by_assignee.setdefault(row["assigned_to"], set()).add(row["id"])
+        else:
+            self._tasks_by_board[row["board_id"]].discard(row["id"])
+            del column[bisect_left(column, entry)]
+            if row["due_date"] is not None:
+                del due[bisect_left(due, due_entry)]
+            if row["assigned_to"] is not None:
+                self._tasks_by_assignee[row["assigned_to"]].discard(row["id"])
+
+    # Ghi
+
+    def _new_id(self, table: str) -> int:
+        new_id = self._next_ids[table]
+        self._next_ids[table] = new_id + 1
+        return new_id
+
+    def _touch_board(self, board_id: int) -> None:
+        board = self.boards.get(board_id)
+        if board is not None:
+            board["revision"] += 1
+
+    def insert_user(self, values: Dict[str, Any]) -> SimpleNamespace:
+        with self._lock:
+            if values["username"] in self._users_by_username:
+                raise ValueError(f"Username đã tồn tại: {values['username']}")
+            now = datetime.utcnow()
+            row = {**USER_DEFAULTS, "created_at": now, "updated_at": now, **values}
+            row["id"] = row.get("id") or self._new_id("users")
+            self._next_ids["users"] = max(self._next_ids["users"], row["id"] + 1)
+            self.users[row["id"]] = row
+            self._index_user(row, True)
+            self._changes += 1
+            return SimpleNamespace(**row)
+
+    def insert_board(self, values: Dict[str, Any]) -> SimpleNamespace:
+        with self._lock:
+            now = datetime.utcnow()
+            row = {**BOARD_DEFAULTS, "created_at": now, "updated_at": now, **values}
+            row["id"] = row.get("id") or self._new_id("boards")
+            self._next_ids["boards"] = max(self._next_ids["boards"], row["id"] + 1)
+            self.boards[row["id"]] = row
+            self._index_board(row, True)
+            self._changes += 1
+            return SimpleNamespace(**row)
+
+    def insert_task(self, values: Dict[str, Any]) -> SimpleNamespace:
+        with self._lock:
+            if values["board_id"] not in self.boards:
+                raise ValueError(f"Board không tồn tại: {values['board_id']}")
+            now = datetime.utcnow()
+            row = {**TASK_DEFAULTS, "created_at": now, "updated_at": now, **values}
+            row["id"] = row.get("id") or self._new_id("tasks")
+            self._next_ids["tasks"] = max(self._next_ids["tasks"], row["id"] + 1)
+            self.tasks[row["id"]] = row
+            self._index_task(row, True)
+            self._touch_board(row["board_id"])
+            self._changes += 1
+            return SimpleNamespace(**row)
+
+    def update_row(self, table: str, row_id: int, values: Dict[str, Any]) -> Optional[SimpleNamespace]:
+        """Cập nhật row (tăng version nếu có, cập nhật index), None nếu không tồn tại"""
+        with self._lock:
+            rows = getattr(self, table)
+            row = rows.get(row_id)
+            if row is None:
+                return None
+            index = {"users": self._index_user, "boards": self._index_board, "tasks": self._index_task}[table]
+            index(row, False)
+            row.update(values)
+            row["updated_at"] = datetime.utcnow()
+            if "version" in row:
+                row["version"] += 1
+            index(row, True)
+            if table == "boards":
+                row["revision"] += 1
+            elif table == "tasks":
+                self._touch_board(row["board_id"])
+            self._changes += 1
+            return SimpleNamespace(**row)
+
+    def delete_task(self, task_id: int) -> Optional[SimpleNamespace]:
+        with self._lock:
+            row = self.tasks.pop(task_id, None)
+            if row is None:
+                return None
+            self._index_task(row, False)
+            self.tombstones.setdefault(row["board_id"], []).append((datetime.utcnow(), task_id))
+            self._touch_board(row["board_id"])
+            self._changes += 1
+            return SimpleNamespace(**row)
+
+    def delete_board(self, board_id: int) -> Optional[SimpleNamespace]:
+        """Xóa board cùng tasks và tombstones của board"""
+        with self._lock:
+            row = self.boards.pop(board_id, None)
+            if row is None:
+                return None
+            for task_id in list(self._tasks_by_board.get(board_id, ())):
+                self._index_task(self.tasks.pop(task_id), False)
+            self._tasks_by_board.pop(board_id, None)
+            self._due_by_board.pop(board_id, None)
+            for status in StatusEnum:
+                self._columns.pop((board_id, status), None)
+            self.tombstones.pop(board_id, None)
+            self._index_board(row, False)
+            self._changes += 1
+            return SimpleNamespace(**row)
+
+    def delete_user(self, user_id: int) -> Optional[SimpleNamespace]:
+        """Xóa user cùng boards của user (cascade như model User)"""
+        with self._lock:
+            row = self.users.get(user_id)
+            if row is None:
+                return None
+            for board_id in list(self._boards_by_owner.get(user_id, ())):
+                self.delete_board(board_id)
+            for task_id in self._tasks_by_assignee.pop(user_id, set()):
+                self.tasks[task_id]["assigned_to"] = None
+            del self.users[user_id]
+            self._index_user(row, False)
+            self._changes += 1
+            return SimpleNamespace(**row)
+
+    def prune_tombstones(self, older_than: datetime) -> int:
+        with self._lock:
+            count = 0
+            for board_id, entries in self.tombstones.items():
+                kept = [entry for entry in entries if entry[0] >= older_than]
+                count += len(entries) - len(kept)
+                self.tombstones[board_id] = kept
+            self._changes += count
+            return count
+
+    # Đọc (trả về bản copy)
+
+    def get(self, table: str, row_id: int) -> Optional[SimpleNamespace]:
+        with self._lock:
+            row = getattr(self, table).get(row_id)
+            return SimpleNamespace(**row) if row is not None else None
+
+    def user_by(self, field: str, value: Any) -> Optional[SimpleNamespace]:
+        with self._lock:
+            index = self._users_by_username if field == "username" else self._users_by_email
+            user_id = index.get(value)
+            return SimpleNamespace(**self.users[user_id]) if user_id is not None else None
+
+    def rows(self, table: str, ids: Iterable[int]) -> List[SimpleNamespace]:
+        with self._lock:
+            rows = getattr(self, table)
+            return [SimpleNamespace(**rows[row_id]) for row_id in ids if row_id in rows]
+
+    def board_ids(self, owner_id: Optional[int] = None, public: bool = False) -> List[int]:
+        """Boards của owner và/hoặc public boards (không truyền gì: tất cả), sắp xếp theo id"""
+        with self._lock:
+            if owner_id is None and not public:
+                return sorted(self.boards)
+            ids = set(self._boards_by_owner.get(owner_id, ())) if owner_id is not None else set()
+            if public:
+                ids |= self._public_boards
+            return sorted(ids)
+
+    def task_ids(self, board_id: int, status: Optional[StatusEnum] = None) -> List[int]:
+        """Tasks của board theo (position, id), chỉ một status nếu có"""
+        with self._lock:
+            statuses = [status] if status is not None else list(StatusEnum)
+            columns = [self._columns.get((board_id, value), ()) for value in statuses]
+            return [task_id for _, task_id in heapq.merge(*columns)]
+
+    def count_tasks(self, board_id: int, status: Optional[StatusEnum] = None) -> int:
+        with self._lock:
+            if status is None:
+                return len(self._tasks_by_board.get(board_id, ()))
+            return len(self._columns.get((board_id, status), ()))
+
+    def assigned_task_ids(self, user_id: int) -> List[int]:
+        with self._lock:
+            return sorted(self._tasks_by_assignee.get(user_id, ()))
+
+    def board_task_ids(self, board_ids: Iterable[int]) -> List[int]:
+        with self._lock:
+            return sorted(task_id for board_id in board_ids for task_id in self._tasks_by_board.get(board_id, ()))
+
+    def due_task_ids(
+        self, board_ids: Iterable[int], due_from: Optional[datetime], due_before: Optional[datetime]
+    ) -> Iterable[int]:
+        """
+        Tasks có due_date trong [due_from, due_before) của các board, theo (due_date, id).
+        Trả về iterator (merge lazy, dừng sớm khi đủ limit): dùng trong `with store._lock`
+        """
+        ranges = []
+        for board_id in board_ids:
+            due = self._due_by_board.get(board_id, ())
+            start = bisect_left(due, (due_from,)) if due_from is not None else 0
+            end = bisect_left(due, (due_before,)) if due_before is not None else len(due)
+            ranges.append(due[start:end])
+        return (task_id for _, task_id in heapq.merge(*ranges))
+
+    def deleted_since(self, board_id: int, since: datetime) -> List[SimpleNamespace]:
+        with self._lock:
+            return [
+                SimpleNamespace(task_id=task_id, deleted_at=deleted_at)
+                for deleted_at, task_id in self.tombstones.get(board_id, ())
+                if deleted_at > since
+            ]
+
+    # Snapshot
+
+    def snapshot(self, path: Optional[str] = None) -> bool:
+        """Ghi dữ liệu ra file JSON (atomic), bỏ qua nếu không có thay đổi kể từ lần trước"""
+        path = path or self.snapshot_path
+        if not path:
+            return False
+        with self._lock:
+            if not self._changes and os.path.exists(path):
+                return False
+            data = {
+                "next_ids": dict(self._next_ids),
+                "users": [_encode(row) for row in self.users.values()],
+                "boards": [_encode(row) for row in self.boards.values()],
+                "tasks": [_encode(row) for row in self.tasks.values()],
+                "tombstones": [
+                    {"board_id": board_id, "task_id": task_id, "deleted_at": deleted_at.isoformat()}
+                    for board_id, entries in self.tombstones.items()
+                    for deleted_at, task_id in entries
+                ],
+            }
+            self._changes = 0
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".snapshot-", suffix=".json")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except Exception:
+            os.unlink(tmp_path)
+            raise
+        return True
+
+    def load(self, path: Optional[str] = None) -> None:
+        """Thay dữ liệu hiện tại bằng snapshot và build lại index"""
+        with open(path or self.snapshot_path, encoding="utf-8") as f:
+            data = json.load(f)
+        with self._lock:
+            self.clear()
+            for row in data["users"]:
+                self.users[row["id"]] = _decode(row)
+                self._index_user(row, True)
+            for row in data["boards"]:
+                self.boards[row["id"]] = _decode(row)
+                self._index_board(row, True)
+            for row in data["tasks"]:
+                self.tasks[row["id"]] = _decode(row)
+                self._index_task(row, True)
+            for entry in data["tombstones"]:
+                self.tombstones.setdefault(entry["board_id"], []).append(
+                    (datetime.fromisoformat(entry["deleted_at"]), entry["task_id"])
+                )
+            self._next_ids.update(data["next_ids"])
+
+    def start(self) -> None:
+        """Snapshot định kỳ (snapshot_interval > 0) trong background thread"""
+        if self._thread is not None or not self.snapshot_path or self.snapshot_interval <= 0:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="memory-snapshot", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Dừng snapshot định kỳ và ghi snapshot cuối"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.snapshot()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.snapshot_interval):
+            try:
+                self.snapshot()
+            except Exception as e:
+                print(f"⚠️  Memory snapshot failed: {e}")
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"users": len(self.users), "boards": len(self.boards), "tasks": len(self.tasks)}
+
+
+class MemoryRepository:
+    """Như BaseRepository; tham số db được giữ để cùng signature và bị bỏ qua"""
+
+    table = ""
+
+    def __init__(self, store: MemoryStore):
+        self.store = store
+
+    def get(self, db: Any, id: int) -> Optional[SimpleNamespace]:
+        return self.store.get(self.table, id)
+
+    def get_multi(self, db: Any, *, skip: int = 0, limit: int = 100) -> List[SimpleNamespace]:
+        with self.store._lock:
+            ids = sorted(getattr(self.store, self.table))[skip:skip + limit]
+            return self.store.rows(self.table, ids)
+
+    def update(self, db: Any, *, db_obj: SimpleNamespace, obj_in: Any) -> SimpleNamespace:
+        updated = self.store.update_row(self.table, db_obj.id, _fields(obj_in))
+        if updated is None:
+            raise LookupError(f"{self.table} {db_obj.id} không tồn tại")
+        # Như db.refresh(db_obj)
+        db_obj.__dict__.update(vars(updated))
+        return db_obj
+
+    def delete(self, db: Any, *, id: int) -> Optional[SimpleNamespace]:
+        return getattr(self.store, f"delete_{self.table[:-1]}")(id)
+
+
+class MemoryUserRepository(MemoryRepository):
+    table = "users"
+
+    def create(self, db: Any, *, obj_in: Any) -> SimpleNamespace:
+        return self.store.insert_user(_fields(obj_in))
+
+    def get_by_username(self, db: Any, username: str) -> Optional[SimpleNamespace]:
+        return self.store.user_by("username", username)
+
+    def get_by_email(self, db: Any, email: str) -> Optional[SimpleNamespace]:
+        return self.store.user_by("email", email)
+
+    def create_user(self, db: Any, user_data: dict) -> SimpleNamespace:
+        user_data = dict(user_data)
+        if "password" in user_data:
+            user_data["password_hash"] = get_password_hash(user_data.pop("password"))
+        return self.store.insert_user(user_data)
+
+    def authenticate(self, db: Any, username: str, password: str) -> Optional[SimpleNamespace]:
+        user = self.get_by_username(db, username)
+        if not user or not verify_password(password, user.password_hash):
+            return None
+        if password_needs_rehash(user.password_hash):
+            self.set_password_hash(db, user, get_password_hash(password))
+        return user
+
+    def update_password(self, db: Any, user: SimpleNamespace, new_password: str) -> SimpleNamespace:
+        return self.set_password_hash(db, user, get_password_hash(new_password))
+
+    def set_password_hash(self, db: Any, user: SimpleNamespace, password_hash: str) -> SimpleNamespace:
+        return self.update(db, db_obj=user, obj_in={"password_hash": password_hash})
+
+    def list_rows(self, db: Any, *, skip: int = 0, limit: int = 100) -> List[SimpleNamespace]:
+        rows = self.get_multi(db, skip=skip, limit=limit)
+        for row in rows:
+            del row.password_hash
+        return rows
+
+
+class MemoryBoardRepository(MemoryRepository):
+    table = "boards"
+
+    def create(self, db: Any, *, obj_in: Any) -> SimpleNamespace:
+        return self.store.insert_board(_fields(obj_in))
+
+    def get_by_owner(self, db: Any, owner_id: int) -> List[SimpleNamespace]:
+        return self.store.rows("boards", self.store.board_ids(owner_id=owner_id))
+
+    def get_public_boards(self, db: Any) -> List[SimpleNamespace]:
+        return self.store.rows("boards", self.store.board_ids(public=True))
+
+    def get_accessible_boards(self, db: Any, user_id: int) -> List[SimpleNamespace]:
+        return self.store.rows("boards", self.store.board_ids(owner_id=user_id, public=True))
+
+    def get_all(self, db: Any) -> List[SimpleNamespace]:
+        return self.store.rows("boards", self.store.board_ids())
+
+    def list_rows(
+        self,
+        db: Any,
+        *,
+        user_id: Optional[int] = None,
+        public_only: bool = False,
+        skip: int = 0,
+        limit: int = 100
+    ) -> List[SimpleNamespace]:
+        """Như BoardRepository.list_rows: các field của BoardResponse + owner_name, tasks_count"""
+        store = self.store
+        with store._lock:
+            if public_only:
+                ids = store.board_ids(public=True)
+            elif user_id is not None:
+                ids = store.board_ids(owner_id=user_id, public=True)
+            else:
+                ids = store.board_ids()
+            rows = store.rows("boards", ids[skip:skip + limit])
+            for row in rows:
+                owner = store.users.get(row.owner_id)
+                row.owner_name = (owner["full_name"] or owner["username"]) if owner else None
+                row.tasks_count = store.count_tasks(row.id)
+            return rows
+
+
+class MemoryTaskRepository(MemoryRepository):
+    table = "tasks"
+
+    def create(self, db: Any, *, obj_in: Any) -> SimpleNamespace:
+        return self.store.insert_task(_fields(obj_in))
+
+    def get_by_board(self, db: Any, board_id: int) -> List[SimpleNamespace]:
+        return self.store.rows("tasks", self.store.task_ids(board_id))
+
+    def get_by_status(self, db: Any, board_id: int, status: StatusEnum) -> List[SimpleNamespace]:
+        return self.store.rows("tasks", self.store.task_ids(board_id, status))
+
+    def get_by_assigned_user(self, db: Any, user_id: int) -> List[SimpleNamespace]:
+        return self.store.rows("tasks", self.store.assigned_task_ids(user_id))
+
+    def count_by_board(self, db: Any, board_id: int, status: Optional[StatusEnum] = None) -> int:
+        return self.store.count_tasks(board_id, status)
+
+    def delete_batch(self, db: Any, board_id: int, limit: int) -> int:
+        with self.store._lock:
+            task_ids = sorted(self.store._tasks_by_board.get(board_id, ()))[:limit]
+            for task_id in task_ids:
+                self.store.delete_task(task_id)
+            return len(task_ids)
+
+    def list_rows(
+        self,
+        db: Any,
+        *,
+        board_id: Optional[int] = None,
+        status: Optional[StatusEnum] = None,
+        priority: Optional[PriorityEnum] = None,
+        assigned_to: Optional[int] = None,
+        updated_since: Optional[datetime] = None,
+        limit: Optional[int] = None
+    ) -> List[SimpleNamespace]:
+        store = self.store
+        with store._lock:
+            if board_id is not None:
+                # (board, status) index đã sắp xếp theo (position, id)
+                ids = store.task_ids(board_id, status)
+            elif assigned_to is not None:
+                ids = store.assigned_task_ids(assigned_to)
+            else:
+                ids = sorted(store.tasks)
+            rows = []
+            for task_id in ids:
+                row = store.tasks[task_id]
+                if status is not None and row["status"] != status:
+                    continue
+                if priority is not None and row["priority"] != priority:
+                    continue
+                if assigned_to is not None and row["assigned_to"] != assigned_to:
+                    continue
+                if updated_since is not None and row["updated_at"] <= updated_since:
+                    continue
+                rows.append(SimpleNamespace(**row))
+                if limit is not None and len(rows) >= limit:
+                    break
+            return rows
+
+    def due_rows(
+        self,
+        db: Any,
+        *,
+        due_from: Optional[datetime] = None,
+        due_before: Optional[datetime] = None,
+        user_id: Optional[int] = None,
+        board_id: Optional[int] = None,
+        assigned_to: Optional[int] = None,
+        include_done: bool = False,
+        limit: int = 500
+    ) -> List[SimpleNamespace]:
+        store = self.store
+        with store._lock:
+            if assigned_to is not None:
+                # Ít task mỗi assignee: lọc rồi sắp xếp
+                candidates = [store.tasks[task_id] for task_id in store.assigned_task_ids(assigned_to)]
+                candidates.sort(key=lambda row: (row["due_date"] is None, row["due_date"] or datetime.min, row["id"]))
+            else:
+                # Range trên index (board, due_date) của từng board rồi merge
+                if board_id is not None:
+                    board_ids = [board_id]
+                elif user_id is not None:
+                    board_ids = store.board_ids(owner_id=user_id, public=True)
+                else:
+                    board_ids = store.board_ids()
+                candidates = (store.tasks[task_id] for task_id in store.due_task_ids(board_ids, due_from, due_before))
+            accessible = set(store.board_ids(owner_id=user_id, public=True)) if user_id is not None else None
+            rows = []
+            for row in candidates:
+                due_date = row["due_date"]
+                if due_date is None:
+                    continue
+                if (due_from is not None and due_date < due_from) or (due_before is not None and due_date >= due_before):
+                    continue
+                if not include_done and row["status"] == StatusEnum.done:
+                    continue
+                if (board_id is not None and row["board_id"] != board_id) or (
+                    accessible is not None and row["board_id"] not in accessible
+                ):
+                    continue
+                rows.append(SimpleNamespace(**row))
+                if len(rows) >= limit:
+                    break
+            return rows
+
+    def stats_rows(self, db: Any, board_ids: List[int], now: datetime) -> List[SimpleNamespace]:
+        store = self.store
+        counts: Counter = Counter()
+        with store._lock:
+            for task_id in store.board_task_ids(board_ids):
+                row = store.tasks[task_id]
+                overdue = row["due_date"] is not None and row["due_date"] < now and row["status"] != StatusEnum.done
+                counts[(row["board_id"], row["status"], row["priority"], row["assigned_to"] is None, overdue)] += 1
+        return [
+            SimpleNamespace(board_id=board_id, status=status, priority=priority, unassigned=unassigned, overdue=overdue, count=count)
+            for (board_id, status, priority, unassigned, overdue), count in counts.items()
+        ]
+
+    def deleted_since(self, db: Any, board_id: int, since: datetime) -> List[SimpleNamespace]:
+        return self.store.deleted_since(board_id, since)
+
+    def prune_tombstones(self, db: Any, older_than: datetime) -> int:
+        return self.store.prune_tombstones(older_than)
+
+    def search_tasks(self, db: Any, query: str, board_id: Optional[int] = None) -> List[SimpleNamespace]:
+        """Substring không dùng được index: scan tasks của board (hoặc mọi task)"""
+        store = self.store
+        query = query.lower()
+        with store._lock:
+            ids = store.task_ids(board_id) if board_id else sorted(store.tasks)
+            return [
+                SimpleNamespace(**row)
+                for row in (store.tasks[task_id] for task_id in ids)
+                if query in row["title"].lower() or (row["description"] and query in row["description"].lower())
+            ]
+
+    def move_task(self, db: Any, task_id: int, new_status: StatusEnum, new_position: Optional[int] = None) -> Optional[SimpleNamespace]:
+        store = self.store
+        with store._lock:
+            task = store.tasks.get(task_id)
+            if task is None:
+                return None
+            values: Dict[str, Any] = {"status": new_status}
+            if new_status != task["status"] and new_position is None:
+                new_position = store.count_tasks(task["board_id"], new_status)
+            if new_position is not None:
+                values["position"] = new_position
+            return store.update_row("tasks", task_id, values)
+
+
+memory_store = MemoryStore(
+    snapshot_path=settings.memory_snapshot_path,
+    snapshot_interval=settings.memory_snapshot_interval_seconds,
+)
+memory_user_repository = MemoryUserRepository(memory_store)
+memory_board_repository = MemoryBoardRepository(memory_store)
+memory_task_repository = MemoryTaskRepository(memory_store)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Boolean, Enum as SQLEnum
+from sqlalchemy import Column, Integer, Float, String, Text, DateTime, ForeignKey, Boolean, Index, FetchedValue, Enum as SQLEnum
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from enum import Enum
@@ -32,6 +32,7 @@ class User(Base):
 # Relationships
     boards = relationship("Board", back_populates="owner", cascade="all, delete-orphan")
     assigned_tasks = relationship("Task", back_populates="assigned_user")
+    refresh_tokens = relationship("RefreshToken", back_populates="user", cascade="all, delete-orphan")
 
 #Class Board theo phân tích buổi 3
 class Board(Base):
@@ -42,9 +43,16 @@ class Board(Base):
     description = Column(String(500), nullable=True)
     is_public = Column(Boolean, default=False, nullable=False)
     owner_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    # Tăng mỗi khi board hoặc task trong board thay đổi (ETag), giá trị do database tính (revision + 1)
+    revision = Column(Integer, default=1, server_onupdate=FetchedValue(), nullable=False)
+    version = Column(Integer, default=1, nullable=False)  # Chỉ tăng khi chính board được sửa (If-Match)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
     
+    # Optimistic locking: UPDATE ... WHERE version = :v, không khớp -> StaleDataError
+    # eager_defaults: revision mới lấy bằng UPDATE ... RETURNING thay vì SELECT sau flush
+    __mapper_args__ = {"version_id_col": version, "eager_defaults": True}
+    
     # Relationships
     owner = relationship("User", back_populates="boards")
     tasks = relationship("Task", back_populates="board", cascade="all, delete-orphan")
@@ -62,12 +70,132 @@ class Task(Base):
     board_id = Column(Integer, ForeignKey("boards.id"), nullable=False)
     assigned_to = Column(Integer, ForeignKey("users.id"), nullable=True)
     due_date = Column(DateTime, nullable=True)
+    version = Column(Integer, default=1, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
     
+    # Delta sync: tasks thay đổi trong board sau một thời điểm
+    # Overdue/upcoming/calendar: range scan theo due_date trong từng board hoặc của một assignee
+    __table_args__ = (
+        Index("ix_tasks_board_id_updated_at", "board_id", "updated_at"),
+        Index("ix_tasks_board_id_due_date", "board_id", "due_date"),
+        Index("ix_tasks_assigned_to_due_date", "assigned_to", "due_date"),
+    )
+    
+    # Optimistic locking: hai request kéo cùng một card, request commit sau nhận 409/412
+    __mapper_args__ = {"version_id_col": version}
+    
     # Relationships
     board = relationship("Board", back_populates="tasks")
     assigned_user = relationship("User", back_populates="assigned_tasks")
     
     def __repr__(self):
         return f"<Task(id={self.id}, title='{self.title}', status='{self.status}')>"
+
+# Task đã bị xóa (hoặc chuyển sang board khác), dùng cho delta sync
+class TaskTombstone(Base):
+    __tablename__ = "task_tombstones"
+    
+    id = Column(Integer, primary_key=True)
+    board_id = Column(Integer, nullable=False)  # Không FK: tombstone được xóa cùng board trong before_flush
+    task_id = Column(Integer, nullable=False)
+    deleted_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    
+    __table_args__ = (
+        Index("ix_task_tombstones_board_id_deleted_at", "board_id", "deleted_at"),
+    )
+
+# Lịch sử task append-only (created/moved/assigned/deleted), dùng cho lead time/cycle time
+class TaskEvent(Base):
+    __tablename__ = "task_events"
+    
+    id = Column(Integer, primary_key=True)
+    task_id = Column(Integer, nullable=False)  # Không FK: giữ lịch sử sau khi task bị xóa
+    board_id = Column(Integer, nullable=False)
+    type = Column(String(20), nullable=False)
+    from_status = Column(SQLEnum(StatusEnum), nullable=True)
+    to_status = Column(SQLEnum(StatusEnum), nullable=True)
+    assigned_to = Column(Integer, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    
+    __table_args__ = (
+        Index("ix_task_events_board_id_task_id", "board_id", "task_id"),
+    )
+
+# Audit trail cho các thao tác quản trị (ghi theo batch bởi app.core.audit)
+class AuditLog(Base):
+    __tablename__ = "audit_log"
+    
+    id = Column(Integer, primary_key=True)
+    actor_id = Column(Integer, nullable=True)  # Không FK: giữ log sau khi user bị xóa
+    action = Column(String(50), nullable=False)
+    target_type = Column(String(20), nullable=False)
+    target_id = Column(Integer, nullable=True)
+    details = Column(Text, nullable=True)  # JSON
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    
+    __table_args__ = (
+        Index("ix_audit_log_actor_id", "actor_id"),
+        Index("ix_audit_log_target", "target_type", "target_id"),
+    )
+
+# Background job (app.core.jobs): xóa board lớn, export...
+class Job(Base):
+    __tablename__ = "jobs"
+    
+    id = Column(String(32), primary_key=True)  # uuid4 hex, không đoán được
+    type = Column(String(50), nullable=False)
+    status = Column(String(20), default="queued", nullable=False)  # queued, running, succeeded, failed
+    owner_id = Column(Integer, nullable=True)  # Không FK: job vẫn xem được sau khi user bị xóa
+    payload = Column(Text, nullable=True)  # JSON
+    result = Column(Text, nullable=True)  # JSON
+    error = Column(Text, nullable=True)
+    progress = Column(Float, default=0.0, nullable=False)  # 0..1
+    attempts = Column(Integer, default=0, nullable=False)
+    max_attempts = Column(Integer, default=3, nullable=False)
+    run_after = Column(DateTime, default=datetime.utcnow, nullable=False)  # Backoff giữa các lần retry
+    heartbeat_at = Column(DateTime, nullable=True)  # Job "running" không heartbeat quá lâu được chạy lại
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    
+    __table_args__ = (
+        Index("ix_jobs_status_run_after", "status", "run_after"),
+    )
+
+# Sharding (app.database.sharding): board nằm ở shard nào, lưu trong database chính
+class BoardShard(Base):
+    __tablename__ = "board_shards"
+    
+    board_id = Column(Integer, primary_key=True, autoincrement=False)
+    shard = Column(String(50), nullable=False)
+
+# Id toàn cục cho boards/tasks khi sharding, mỗi process nhận một block id
+class IdAllocation(Base):
+    __tablename__ = "id_allocations"
+    
+    name = Column(String(50), primary_key=True)  # Tên bảng
+    next_id = Column(Integer, nullable=False)
+
+# Version của danh sách boards theo scope ("user:<id>", "public:<owner_id>"), dùng cho ETag
+class ListingVersion(Base):
+    __tablename__ = "listing_versions"
+    
+    scope = Column(String(50), primary_key=True)
+    version = Column(Integer, default=0, nullable=False)
+
+# Refresh token (lưu SHA-256 của token, không lưu token gốc)
+class RefreshToken(Base):
+    __tablename__ = "refresh_tokens"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    token_hash = Column(String(64), unique=True, nullable=False, index=True)
+    family_id = Column(String(32), nullable=False, index=True)  # Chuỗi token sinh ra từ cùng một lần login
+    expires_at = Column(DateTime, nullable=False)
+    revoked_at = Column(DateTime, nullable=True)
+    replaced_by_id = Column(Integer, ForeignKey("refresh_tokens.id"), nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    
+    # Relationships
+    user = relationship("User", back_populates="refresh_tokens")
@@ -1,6 +1,17 @@
-from sqlalchemy.orm import Session
-from typing import List, Optional, Generic, TypeVar, Type
-from .models import User, Board, Task, StatusEnum, PriorityEnum
+import uuid
+from types import SimpleNamespace
+from datetime import datetime, timedelta
+from sqlalchemy import and_, delete, func, select, update
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session, joinedload
+from typing import List, Optional, Generic, TypeVar, Type, Tuple
+from .models import User, Board, Task, TaskTombstone, RefreshToken, AuditLog, StatusEnum, PriorityEnum
+from .sharding import shard_router
+from app.core.config import settings
+from app.core.security import (
+    get_password_hash, verify_password, password_needs_rehash,
+    generate_refresh_token, hash_refresh_token
+)
 
 # Generic types
 ModelType = TypeVar("ModelType")
@@ -12,31 +23,32 @@ class BaseRepository(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         self.model = model
     
     def get(self, db: Session, id: int) -> Optional[ModelType]:
-        return db.query(self.model).filter(self.model.id == id).first()
+        # Session.get dùng identity map, không query lại object đã load trong session
+        return db.get(self.model, id)
     
     def get_multi(self, db: Session, *, skip: int = 0, limit: int = 100) -> List[ModelType]:
         return db.query(self.model).offset(skip).limit(limit).all()
     
     def create(self, db: Session, *, obj_in: CreateSchemaType) -> ModelType:
-        obj_data = obj_in.dict() if hasattr(obj_in, 'dict') else obj_in
+        obj_data = obj_in.model_dump() if hasattr(obj_in, 'model_dump') else obj_in
         db_obj = self.model(**obj_data)
         db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
+        # Unit of work: chỉ flush, request commit một lần ở cuối.
+        # id lấy bằng INSERT ... RETURNING, defaults tính ở Python nên không cần refresh
+        db.flush()
         return db_obj
     
     def update(self, db: Session, *, db_obj: ModelType, obj_in: UpdateSchemaType) -> ModelType:
-        obj_data = obj_in.dict(exclude_unset=True) if hasattr(obj_in, 'dict') else obj_in
+        obj_data = obj_in.model_dump(exclude_unset=True) if hasattr(obj_in, 'model_dump') else obj_in
         for field, value in obj_data.items():
             setattr(db_obj, field, value)
-        db.commit()
-        db.refresh(db_obj)
+        db.flush()
         return db_obj
     
     def delete(self, db: Session, *, id: int) -> ModelType:
-        obj = db.query(self.model).get(id)
+        obj = db.get(self.model, id)
         db.delete(obj)
-        db.commit()
+        db.flush()
         return obj
 
 ## Tạo User repository
@@ -57,8 +69,7 @@ class UserRepository(BaseRepository[User, dict, dict]):
         
         db_user = User(**user_data)
         db.add(db_user)
-        db.commit()
-        db.refresh(db_user)
+        db.flush()
         return db_user
 
     def authenticate(self, db: Session, username: str, password: str) -> Optional[User]:
@@ -70,14 +81,32 @@ class UserRepository(BaseRepository[User, dict, dict]):
         if not verify_password(password, user.password_hash):
             return None
         
+        # Rehash khi cost factor đã thay đổi
+        if password_needs_rehash(user.password_hash):
+            self.set_password_hash(db, user, get_password_hash(password))
+        
         return user
     
     def update_password(self, db: Session, user: User, new_password: str) -> User:
         """Cập nhật password cho user"""
-        user.password_hash = get_password_hash(new_password)
-        db.commit()
-        db.refresh(user)
+        return self.set_password_hash(db, user, get_password_hash(new_password))
+    
+    def set_password_hash(self, db: Session, user: User, password_hash: str) -> User:
+        """Lưu password hash đã tính sẵn (ví dụ hash từ password hasher pool)"""
+        user.password_hash = password_hash
+        db.flush()
         return user
+    
+    def list_rows(self, db: Session, *, skip: int = 0, limit: int = 100) -> List[Row]:
+        """
+        Projection cho danh sách users (assignee dropdown): chỉ các cột của
+        UserResponse, không load password_hash và không tạo ORM object
+        """
+        stmt = select(
+            User.id, User.username, User.email, User.full_name,
+            User.role, User.is_active, User.created_at, User.updated_at
+        ).order_by(User.id).offset(skip).limit(limit)
+        return db.execute(stmt).all()
         
 # Tạo Board repository
 class BoardRepository(BaseRepository[Board, dict, dict]):
@@ -99,6 +128,57 @@ class BoardRepository(BaseRepository[Board, dict, dict]):
     def get_all(self, db: Session) -> List[Board]:
         """Get all boards without any filtering"""
         return db.query(Board).all()
+    
+    def list_rows(
+        self,
+        db: Session,
+        *,
+        user_id: Optional[int] = None,
+        public_only: bool = False,
+        skip: int = 0,
+        limit: int = 100
+    ) -> List[Row]:
+        """
+        Projection cho board listing: các cột của BoardResponse, owner_name và
+        tasks_count được tính trong một query (join users + đếm tasks theo board)
+        thay vì load owner và toàn bộ tasks của từng board.
+        
+        user_id: chỉ boards user sở hữu + public boards; public_only: chỉ public boards;
+        không truyền gì: tất cả boards (admin).
+        """
+        tasks_count = (
+            select(Task.board_id, func.count(Task.id).label("tasks_count"))
+            .group_by(Task.board_id)
+            .subquery()
+        )
+        owner_name = func.coalesce(func.nullif(User.full_name, ""), User.username).label("owner_name")
+        columns = (
+            Board.id, Board.name, Board.description, Board.is_public, Board.owner_id,
+            Board.version, Board.created_at, Board.updated_at,
+            func.coalesce(tasks_count.c.tasks_count, 0).label("tasks_count"),
+        )
+        
+        def scoped(stmt):
+            if public_only:
+                return stmt.where(Board.is_public == True)
+            if user_id is not None:
+                return stmt.where((Board.owner_id == user_id) | (Board.is_public == True))
+            return stmt
+        
+        if shard_router.enabled:
+            # users nằm ở database chính: lấy boards từ mọi shard rồi điền owner_name bằng một query
+            stmt = scoped(select(*columns).outerjoin(tasks_count, tasks_count.c.board_id == Board.id)).order_by(Board.id)
+            rows = shard_router.fan_out(db, stmt, key=lambda row: row.id, offset=skip, limit=limit)
+            owner_ids = {row.owner_id for row in rows}
+            names = dict(db.execute(select(User.id, owner_name).where(User.id.in_(owner_ids))).all()) if owner_ids else {}
+            return [SimpleNamespace(**row._mapping, owner_name=names.get(row.owner_id)) for row in rows]
+        
+        stmt = (
+            select(*columns, owner_name)
+            .outerjoin(User, User.id == Board.owner_id)
+            .outerjoin(tasks_count, tasks_count.c.board_id == Board.id)
+        )
+        return db.execute(scoped(stmt).order_by(Board.id).offset(skip).limit(limit)).all()
 
 # Tạo Task repository
 class TaskRepository(BaseRepository[Task, dict, dict]):
@@ -117,6 +197,143 @@ class TaskRepository(BaseRepository[Task, dict, dict]):
     def get_by_assigned_user(self, db: Session, user_id: int) -> List[Task]:
         return db.query(Task).filter(Task.assigned_to == user_id).all()
     
+    def count_by_board(self, db: Session, board_id: int, status: Optional[StatusEnum] = None) -> int:
+        """Đếm tasks trong board (theo status nếu có) mà không load task nào"""
+        stmt = select(func.count(Task.id)).where(Task.board_id == board_id)
+        if status is not None:
+            stmt = stmt.where(Task.status == status)
+        return db.execute(stmt).scalar_one()
+    
+    def delete_batch(self, db: Session, board_id: int, limit: int) -> int:
+        """Xóa tối đa `limit` tasks của board (flush, caller commit mỗi batch), trả về số task đã xóa"""
+        # Xóa qua Session để tombstones, task_events và invalidation vẫn chạy như xóa từng task
+        tasks = db.scalars(select(Task).where(Task.board_id == board_id).order_by(Task.id).limit(limit)).all()
+        for task in tasks:
+            db.delete(task)
+        db.flush()
+        return len(tasks)
+    
+    def list_rows(
+        self,
+        db: Session,
+        *,
+        board_id: Optional[int] = None,
+        status: Optional[StatusEnum] = None,
+        priority: Optional[PriorityEnum] = None,
+        assigned_to: Optional[int] = None,
+        updated_since: Optional[datetime] = None,
+        limit: Optional[int] = None
+    ) -> List[Row]:
+        """
+        Projection cho task list: row tuples với các cột của TaskResponse,
+        filter trong SQL, không tạo ORM object/identity map cho từng task
+        """
+        stmt = select(
+            Task.id, Task.board_id, Task.title, Task.description, Task.status, Task.priority,
+            Task.position, Task.assigned_to, Task.due_date, Task.version, Task.created_at, Task.updated_at
+        )
+        if board_id is not None:
+            stmt = stmt.where(Task.board_id == board_id).order_by(Task.position, Task.id)
+        else:
+            stmt = stmt.order_by(Task.id)
+        
+        if status is not None:
+            stmt = stmt.where(Task.status == status)
+        if priority is not None:
+            stmt = stmt.where(Task.priority == priority)
+        if assigned_to is not None:
+            stmt = stmt.where(Task.assigned_to == assigned_to)
+        if updated_since is not None:
+            # Dùng index (board_id, updated_at)
+            stmt = stmt.where(Task.updated_at > updated_since)
+        
+        if board_id is None:
+            # Nhiều board: merge kết quả của các shard theo id
+            return shard_router.fan_out(db, stmt, key=lambda row: row.id, limit=limit)
+        if limit is not None:
+            stmt = stmt.limit(limit)
+        return db.execute(stmt).all()
+    
+    def due_rows(
+        self,
+        db: Session,
+        *,
+        due_from: Optional[datetime] = None,
+        due_before: Optional[datetime] = None,
+        user_id: Optional[int] = None,
+        board_id: Optional[int] = None,
+        assigned_to: Optional[int] = None,
+        include_done: bool = False,
+        limit: int = 500
+    ) -> List[Row]:
+        """
+        Tasks có due_date trong [due_from, due_before), sắp xếp theo due_date.
+        
+        user_id: chỉ boards user sở hữu + public boards; không truyền: tất cả boards (admin).
+        Điều kiện due_date là range trên index (board_id, due_date) cho từng board
+        hoặc (assigned_to, due_date) khi lọc theo assignee, không scan mọi task.
+        """
+        stmt = select(
+            Task.id, Task.board_id, Task.title, Task.description, Task.status, Task.priority,
+            Task.position, Task.assigned_to, Task.due_date, Task.version, Task.created_at, Task.updated_at
+        ).where(Task.due_date.is_not(None))
+        
+        if due_from is not None:
+            stmt = stmt.where(Task.due_date >= due_from)
+        if due_before is not None:
+            stmt = stmt.where(Task.due_date < due_before)
+        if not include_done:
+            stmt = stmt.where(Task.status != StatusEnum.done)
+        
+        if assigned_to is not None:
+            stmt = stmt.where(Task.assigned_to == assigned_to)
+        if board_id is not None:
+            stmt = stmt.where(Task.board_id == board_id)
+        if user_id is not None:
+            accessible = select(Board.id).where((Board.owner_id == user_id) | (Board.is_public == True))
+            stmt = stmt.where(Task.board_id.in_(accessible))
+        
+        stmt = stmt.order_by(Task.due_date, Task.id)
+        if board_id is not None:
+            return db.execute(stmt.limit(limit)).all()
+        # Boards nằm trên nhiều shard: merge theo (due_date, id)
+        return shard_router.fan_out(db, stmt, key=lambda row: (row.due_date, row.id), limit=limit)
+    
+    def stats_rows(self, db: Session, board_ids: List[int], now: datetime) -> List[Row]:
+        """
+        Số tasks theo (board_id, status, priority, unassigned, overdue) cho nhiều board
+        trong một query GROUP BY, không load task nào
+        """
+        unassigned = Task.assigned_to.is_(None)
+        overdue = and_(Task.due_date.is_not(None), Task.due_date < now, Task.status != StatusEnum.done)
+        stmt = (
+            select(
+                Task.board_id, Task.status, Task.priority,
+                unassigned.label("unassigned"), overdue.label("overdue"),
+                func.count(Task.id).label("count"),
+            )
+            .where(Task.board_id.in_(board_ids))
+            .group_by(Task.board_id, Task.status, Task.priority, unassigned, overdue)
+        )
+        return db.execute(stmt).all()
+    
+    def deleted_since(self, db: Session, board_id: int, since: datetime) -> List[Row]:
+        """Tombstones (task_id, deleted_at) của board sau thời điểm `since`"""
+        stmt = select(TaskTombstone.task_id, TaskTombstone.deleted_at).where(
+            TaskTombstone.board_id == board_id,
+            TaskTombstone.deleted_at > since
+        ).order_by(TaskTombstone.deleted_at)
+        return db.execute(stmt).all()
+    
+    def prune_tombstones(self, db: Session, older_than: datetime) -> int:
+        """Xóa tombstones cũ (client có sync token cũ hơn sẽ full sync), caller commit"""
+        count = shard_router.execute_each(
+            db,
+            delete(TaskTombstone).where(TaskTombstone.deleted_at < older_than)
+            .execution_options(synchronize_session=False)
+        )
+        return count
+    
     def search_tasks(self, db: Session, query: str, board_id: Optional[int] = None) -> List[Task]:
         search_query = db.query(Task).filter(
             Task.title.contains(query) | Task.description.contains(query)
@@ -137,17 +354,126 @@ class TaskRepository(BaseRepository[Task, dict, dict]):
         
 # Tính position mới nếu không được specify
         if new_status != old_status and new_position is None:
-            tasks_in_new_status = self.get_by_status(db, task.board_id, new_status)
-            new_position = len(tasks_in_new_status)
+            new_position = self.count_by_board(db, task.board_id, new_status)
         
         if new_position is not None:
             task.position = new_position
         
-        db.commit()
-        db.refresh(task)
+        db.flush()
         return task
 
+# Tạo RefreshToken repository
+class RefreshTokenRepository(BaseRepository[RefreshToken, dict, dict]):
+    def __init__(self):
+        super().__init__(RefreshToken)
+    
+    def _new_token(self, user_id: int, family_id: str) -> Tuple[str, RefreshToken]:
+        raw_token = generate_refresh_token()
+        db_token = RefreshToken(
+            user_id=user_id,
+            token_hash=hash_refresh_token(raw_token),
+            family_id=family_id,
+            expires_at=datetime.utcnow() + timedelta(days=settings.refresh_token_expire_days)
+        )
+        return raw_token, db_token
+    
+    def issue(self, db: Session, user_id: int) -> str:
+        """Tạo refresh token mới (family mới) khi user login, trả về token gốc"""
+        raw_token, db_token = self._new_token(user_id, uuid.uuid4().hex)
+        db.add(db_token)
+        db.flush()
+        return raw_token
+    
+    def get_by_token(self, db: Session, token: str) -> Optional[RefreshToken]:
+        """Tìm refresh token theo token gốc (một lookup trên unique index), kèm user"""
+        return db.query(RefreshToken).options(joinedload(RefreshToken.user)).filter(
+            RefreshToken.token_hash == hash_refresh_token(token)
+        ).first()
+    
+    def rotate(self, db: Session, db_token: RefreshToken) -> Optional[str]:
+        """
+        Thu hồi token hiện tại và cấp token mới trong cùng family.
+        None nếu token đã bị thu hồi trước đó (request khác vừa rotate cùng token)
+        """
+        raw_token, new_token = self._new_token(db_token.user_id, db_token.family_id)
+        db.add(new_token)
+        db.flush()
+        # Thu hồi có điều kiện: hai request refresh đồng thời chỉ một request thắng
+        revoked = db.execute(
+            update(RefreshToken)
+            .where(RefreshToken.id == db_token.id, RefreshToken.revoked_at.is_(None))
+            .values(revoked_at=datetime.utcnow(), replaced_by_id=new_token.id)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        if revoked == 0:
+            db.delete(new_token)
+            db.flush()
+            return None
+        db.expire(db_token, ["revoked_at", "replaced_by_id"])
+        return raw_token
+    
+    def revoke_family(self, db: Session, family_id: str) -> int:
+        """Thu hồi toàn bộ token trong family (logout hoặc phát hiện token bị dùng lại)"""
+        count = db.query(RefreshToken).filter(
+            RefreshToken.family_id == family_id,
+            RefreshToken.revoked_at.is_(None)
+        ).update({RefreshToken.revoked_at: datetime.utcnow()}, synchronize_session=False)
+        return count
+    
+    def revoke_all_for_user(self, db: Session, user_id: int) -> int:
+        """Thu hồi mọi refresh token của user (ví dụ khi đổi mật khẩu)"""
+        count = db.query(RefreshToken).filter(
+            RefreshToken.user_id == user_id,
+            RefreshToken.revoked_at.is_(None)
+        ).update({RefreshToken.revoked_at: datetime.utcnow()}, synchronize_session=False)
+        return count
+
+# Tạo AuditLog repository (chỉ đọc, ghi qua app.core.audit)
+class AuditLogRepository(BaseRepository[AuditLog, dict, dict]):
+    def __init__(self):
+        super().__init__(AuditLog)
+    
+    def list_rows(
+        self,
+        db: Session,
+        *,
+        action: Optional[str] = None,
+        actor_id: Optional[int] = None,
+        target_type: Optional[str] = None,
+        target_id: Optional[int] = None,
+        skip: int = 0,
+        limit: int = 100
+    ) -> List[Row]:
+        """Audit entries mới nhất trước, filter và pagination trong SQL"""
+        stmt = select(
+            AuditLog.id, AuditLog.actor_id, AuditLog.action, AuditLog.target_type,
+            AuditLog.target_id, AuditLog.details, AuditLog.created_at
+        ).order_by(AuditLog.id.desc())
+        if action is not None:
+            stmt = stmt.where(AuditLog.action == action)
+        if actor_id is not None:
+            stmt = stmt.where(AuditLog.actor_id == actor_id)
+        if target_type is not None:
+            stmt = stmt.where(AuditLog.target_type == target_type)
+        if target_id is not None:
+            stmt = stmt.where(AuditLog.target_id == target_id)
+        return db.execute(stmt.offset(skip).limit(limit)).all()
+
 # Global instances
 user_repository = UserRepository()
 board_repository = BoardRepository()
 task_repository = TaskRepository()
+refresh_token_repository = RefreshTokenRepository()
+audit_log_repository = AuditLogRepository()
+
+def get_repositories(backend: str) -> SimpleNamespace:
+    """
+    User/board/task repositories theo backend ("sql" hoặc "memory") cho test/benchmark.
+    Routers luôn dùng SQLAlchemy Session (permissions, listeners, sharding)
+    """
+    if backend == "memory":
+        from .memory import memory_user_repository, memory_board_repository, memory_task_repository
+        return SimpleNamespace(users=memory_user_repository, boards=memory_board_repository, tasks=memory_task_repository)
+    if backend != "sql":
+        raise ValueError(f"Unknown repository backend: {backend}")
+    return SimpleNamespace(users=user_repository, boards=board_repository, tasks=task_repository)
@@ -0,0 +1,387 @@
+"""
+Hash sharding boards/tasks ra nhiều database (DATABASE_SHARDS).
+
+- Database chính (DATABASE_URL) là shard "default" đồng thời là directory:
+  users, refresh tokens, listing versions, audit log, jobs và bảng
+  board_shards (board -> shard) chỉ nằm ở đây
+- Board và mọi thứ đi theo board (tasks, task_tombstones, task_events) nằm
+  trên shard của board. Board mới được đặt theo hash(board_id), board có từ
+  trước khi bật sharding (không có trong board_shards) nằm ở "default";
+  scripts/rebalance_shards.py chuyển board về shard theo hash
+- Id của boards/tasks được cấp toàn cục từ bảng id_allocations theo block
+  (shard_id_block_size) nên không trùng giữa các shard
+- SessionLocal là ShardedSession: flush ghi object vào shard của nó, query
+  có điều kiện board_id / Board.id (== hoặc IN) chỉ chạy trên shard của các
+  board đó, query khác chạy trên mọi shard và nối kết quả. View nhiều board
+  cần thứ tự/limit (ví dụ /tasks/my/assigned) dùng fan_out() để merge
+
+Transaction ghi nhiều shard được commit lần lượt từng database (không có
+two-phase commit). Migration (alembic) chỉ áp dụng cho database chính, các
+shard khác được tạo bằng create_tables().
+"""
+import heapq
+import threading
+import time
+import zlib
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import delete, event, func, insert, select, update
+from sqlalchemy.engine import Connection, Engine, Row
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Mapper, Session
+from sqlalchemy.sql import operators, visitors
+from sqlalchemy.sql.elements import BinaryExpression, BindParameter, ColumnClause
+from sqlalchemy.sql.util import find_tables
+
+from app.core.config import settings
+from .connection import Base, DEFAULT_SHARD, SHARDED_TABLES, SessionLocal, engine, shard_engines
+from .models import Board, BoardShard, IdAllocation, Task
+
+BOARD_CHILD_TABLES = ("tasks", "task_tombstones", "task_events")
+
+
+def _board_key(column: ColumnClause) -> bool:
+    """Cột xác định board của row: boards.id hoặc <bảng theo board>.board_id"""
+    table = getattr(column, "table", None)
+    if table is None:
+        return False
+    return (table.name == "boards" and column.name == "id") or (
+        table.name in BOARD_CHILD_TABLES and column.name == "board_id"
+    )
+
+
+def board_ids_in(statement: Any, parameters: Optional[Dict[str, Any]] = None) -> Optional[Set[int]]:
+    """
+    Board ids trong điều kiện WHERE dạng `board_id == x` / `board_id IN (...)`,
+    None nếu statement không giới hạn theo board. Bind không có value (ví dụ
+    Session.get truyền primary key qua execute parameters) lấy từ `parameters`
+    """
+    whereclause = getattr(statement, "whereclause", None)
+    if whereclause is None:
+        return None
+    found = False
+    board_ids: Set[int] = set()
+    for element in visitors.iterate(whereclause):
+        if not (
+            isinstance(element, BinaryExpression)
+            and isinstance(element.left, ColumnClause)
+            and isinstance(element.right, BindParameter)
+            and _board_key(element.left)
+        ):
+            continue
+        bind = element.right
+        value = bind.effective_value
+        if value is None and parameters and bind.key in parameters:
+            value = parameters[bind.key]
+        if value is None:
+            continue
+        if element.operator is operators.eq:
+            board_ids.add(value)
+            found = True
+        elif element.operator is operators.in_op:
+            board_ids.update(value)
+            found = True
+    return board_ids if found else None
+
+
+class ShardRouter:
+    """Board -> shard (qua directory), cấp id toàn cục và các chooser cho ShardedSession"""
+
+    def __init__(self, directory: Engine, shards: Dict[str, Engine], cache_seconds: float, id_block_size: int):
+        self.directory = directory
+        self.shards = shards
+        self.shard_ids = list(shards)
+        self.cache_seconds = cache_seconds
+        self.id_block_size = id_block_size
+        self._locations: Dict[int, Tuple[str, float]] = {}
+        self._lock = threading.Lock()
+        self._id_blocks: Dict[str, Tuple[int, int]] = {}  # name -> (id tiếp theo, hết block)
+        self._id_lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return len(self.shards) > 1
+
+    def hash_shard(self, board_id: int) -> str:
+        """Shard theo hash của board_id (ổn định giữa các process)"""
+        return self.shard_ids[zlib.crc32(str(board_id).encode()) % len(self.shard_ids)]
+
+    # Directory
+
+    def shard_for_board(self, board_id: int) -> str:
+        now = time.monotonic()
+        with self._lock:
+            cached = self._locations.get(board_id)
+            if cached is not None and cached[1] > now:
+                return cached[0]
+        with self.directory.connect() as conn:
+            shard = conn.execute(select(BoardShard.shard).where(BoardShard.board_id == board_id)).scalar()
+        # Board có từ trước khi bật sharding nằm ở database chính
+        shard = shard if shard in self.shards else DEFAULT_SHARD
+        self.remember(board_id, shard)
+        return shard
+
+    def remember(self, board_id: int, shard: str) -> None:
+        with self._lock:
+            self._locations[board_id] = (shard, time.monotonic() + self.cache_seconds)
+
+    def forget(self, board_id: int) -> None:
+        with self._lock:
+            self._locations.pop(board_id, None)
+
+    def set_board_shard(self, conn, board_id: int, shard: str) -> None:
+        """Ghi board -> shard vào directory (conn của database chính)"""
+        updated = conn.execute(
+            update(BoardShard).where(BoardShard.board_id == board_id).values(shard=shard)
+        ).rowcount
+        if not updated:
+            conn.execute(insert(BoardShard).values(board_id=board_id, shard=shard))
+
+    # Id toàn cục
+
+    def next_id(self, table_name: str) -> int:
+        with self._id_lock:
+            next_id, end = self._id_blocks.get(table_name, (0, 0))
+            if next_id >= end:
+                next_id, end = self._allocate_block(table_name)
+            self._id_blocks[table_name] = (next_id + 1, end)
+            return next_id
+
+    def _allocate_block(self, table_name: str) -> Tuple[int, int]:
+        """Nhận block id mới bằng transaction riêng (commit ngay, id không bị cấp lại kể cả khi rollback)"""
+        size = self.id_block_size
+        for attempt in range(3):
+            try:
+                with self.directory.begin() as conn:
+                    updated = conn.execute(
+                        update(IdAllocation).where(IdAllocation.name == table_name)
+                        .values(next_id=IdAllocation.next_id + size)
+                    ).rowcount
+                    if updated:
+                        end = conn.execute(
+                            select(IdAllocation.next_id).where(IdAllocation.name == table_name)
+                        ).scalar_one()
+                        return end - size, end
+                    # Lần đầu: bắt đầu sau id lớn nhất đang có trên mọi shard
+                    start = self._max_id(table_name) + 1
+                    conn.execute(insert(IdAllocation).values(name=table_name, next_id=start + size))
+                    return start, start + size
+            except IntegrityError:
+                # Process khác vừa tạo row, thử lại bằng UPDATE
+                if attempt == 2:
+                    raise
+        raise RuntimeError("unreachable")
+
+    def _max_id(self, table_name: str) -> int:
+        table = Base.metadata.tables[table_name]
+        highest = 0
+        for shard_engine in self.shards.values():
+            with shard_engine.connect() as conn:
+                highest = max(highest, conn.execute(select(func.coalesce(func.max(table.c.id), 0))).scalar_one())
+        return highest
+
+    # Choosers cho ShardedSession
+
+    def _shards_for_statement(self, statement: Any, parameters: Optional[Dict[str, Any]] = None) -> List[str]:
+        board_ids = board_ids_in(statement, parameters)
+        if board_ids is None:
+            return self.shard_ids
+        # IN () rỗng: chạy trên một shard bất kỳ (không có kết quả)
+        return sorted({self.shard_for_board(board_id) for board_id in board_ids}) or [DEFAULT_SHARD]
+
+    def shard_chooser(self, mapper: Optional[Mapper], instance: Any, clause: Any = None, **kw: Any) -> str:
+        """Shard để ghi một object (hoặc chạy Core statement khi mapper là None)"""
+        if mapper is None:
+            tables = find_tables(clause, include_crud=True) if clause is not None else []
+            if not any(table.name in SHARDED_TABLES for table in tables):
+                return DEFAULT_SHARD
+            shards = self._shards_for_statement(clause)
+            if len(shards) != 1:
+                raise ValueError("Core statement trên bảng đã shard phải lọc theo đúng một board")
+            return shards[0]
+        if mapper.local_table.name not in SHARDED_TABLES:
+            return DEFAULT_SHARD
+        if instance is not None:
+            board_id = instance.id if isinstance(instance, Board) else instance.board_id
+            if board_id is None and isinstance(instance, Task) and instance.board is not None:
+                board_id = instance.board.id
+            return self.shard_for_board(board_id)
+        shards = self._shards_for_statement(clause) if clause is not None else []
+        if len(shards) != 1:
+            raise ValueError(f"Không xác định được shard cho {mapper.class_.__name__}")
+        return shards[0]
+
+    def identity_chooser(self, mapper: Mapper, primary_key: Any, *, lazy_loaded_from=None, **kw: Any) -> List[str]:
+        """Các shard có thể chứa object theo primary key"""
+        name = mapper.local_table.name
+        if name not in SHARDED_TABLES:
+            return [DEFAULT_SHARD]
+        if name == "boards":
+            return [self.shard_for_board(primary_key[0])]
+        if lazy_loaded_from is not None and lazy_loaded_from.mapper.local_table.name in SHARDED_TABLES:
+            return [lazy_loaded_from.identity_token]
+        return self.shard_ids
+
+    def execute_chooser(self, orm_context) -> List[str]:
+        """Các shard chạy một ORM statement"""
+        mapper = orm_context.bind_mapper
+        if mapper is not None and mapper.local_table.name not in SHARDED_TABLES:
+            return [DEFAULT_SHARD]
+        if mapper is None and not any(
+            table.name in SHARDED_TABLES for table in find_tables(orm_context.statement, include_crud=True)
+        ):
+            # Core statement trên bảng của database chính (listing_versions...)
+            return [DEFAULT_SHARD]
+        loaded_from = orm_context.lazy_loaded_from
+        if loaded_from is not None and loaded_from.mapper.local_table.name in SHARDED_TABLES:
+            # Lazy load (board.tasks, task.board): cùng shard với object cha
+            return [loaded_from.identity_token]
+        parameters = orm_context.parameters if isinstance(orm_context.parameters, dict) else None
+        return self._shards_for_statement(orm_context.statement, parameters)
+
+    # Query nhiều shard
+
+    def fan_out(
+        self,
+        db: Session,
+        stmt,
+        key: Callable[[Row], Any],
+        limit: Optional[int] = None,
+        offset: int = 0,
+    ) -> List[Row]:
+        """
+        Chạy `stmt` (đã ORDER BY theo `key`) trên từng shard rồi merge theo `key`,
+        offset/limit áp dụng cho kết quả đã merge
+        """
+        if not self.enabled:
+            if offset:
+                stmt = stmt.offset(offset)
+            if limit is not None:
+                stmt = stmt.limit(limit)
+            return db.execute(stmt).all()
+        if limit is not None:
+            stmt = stmt.limit(offset + limit)
+        results = [db.execute(stmt, bind_arguments={"shard_id": shard_id}).all() for shard_id in self.shard_ids]
+        merged = heapq.merge(*results, key=key)
+        return list(islice(merged, offset, offset + limit if limit is not None else None))
+
+    def execute_each(self, db: Session, stmt) -> int:
+        """Chạy DML trên mọi shard, trả về tổng rowcount"""
+        if not self.enabled:
+            return db.execute(stmt).rowcount
+        return sum(db.execute(stmt, bind_arguments={"shard_id": shard_id}).rowcount for shard_id in self.shard_ids)
+
+    # Rebalancing
+
+    def board_locations(self) -> Iterable[Tuple[int, str]]:
+        """(board_id, shard đang chứa board) đọc trực tiếp từ các shard"""
+        boards = Base.metadata.tables["boards"]
+        for shard_id, shard_engine in self.shards.items():
+            with shard_engine.connect() as conn:
+                for board_id in conn.execute(select(boards.c.id).order_by(boards.c.id)).scalars():
+                    yield board_id, shard_id
+
+    def move_board(self, board_id: int, source: str, target: str, grace_seconds: float = 0.0) -> Dict[str, int]:
+        """
+        Chuyển board và dữ liệu đi theo board từ shard `source` sang `target`.
+        Nên chạy khi không có ghi vào board: board bị ghi trong lúc copy thì bản
+        copy bị hủy (kiểm tra revision); process khác có thể còn cache shard cũ
+        tới shard_directory_cache_seconds nên bản cũ được giữ thêm `grace_seconds`.
+        """
+        boards = Base.metadata.tables["boards"]
+        children = [Base.metadata.tables[name] for name in BOARD_CHILD_TABLES]
+        src, dst = self.shards[source], self.shards[target]
+
+        with src.connect() as conn:
+            board = conn.execute(select(boards).where(boards.c.id == board_id)).mappings().first()
+            if board is None:
+                raise ValueError(f"Board {board_id} không có trên shard {source}")
+            rows = {
+                table.name: [dict(row) for row in conn.execute(
+                    select(table).where(table.c.board_id == board_id).order_by(table.c.id)
+                ).mappings()]
+                for table in children
+            }
+
+        with dst.begin() as conn:
+            conn.execute(insert(boards), [dict(board)])
+            for table in children:
+                if not rows[table.name]:
+                    continue
+                if table.name != "tasks":
+                    # Tombstones/events: id do shard đích cấp, giữ thứ tự theo id cũ
+                    for row in rows[table.name]:
+                        row.pop("id")
+                conn.execute(insert(table), rows[table.name])
+
+        with src.connect() as conn:
+            revision = conn.execute(select(boards.c.revision).where(boards.c.id == board_id)).scalar()
+        if revision != board["revision"]:
+            self._delete_board_rows(dst, board_id)
+            raise RuntimeError(f"Board {board_id} thay đổi trong lúc copy, chạy lại sau")
+
+        with self.directory.begin() as conn:
+            self.set_board_shard(conn, board_id, target)
+        self.remember(board_id, target)
+
+        if grace_seconds > 0:
+            time.sleep(grace_seconds)
+        self._delete_board_rows(src, board_id)
+        return {table: len(table_rows) for table, table_rows in rows.items()}
+
+    def _delete_board_rows(self, shard_engine: Engine, board_id: int) -> None:
+        boards = Base.metadata.tables["boards"]
+        with shard_engine.begin() as conn:
+            for name in BOARD_CHILD_TABLES:
+                table = Base.metadata.tables[name]
+                conn.execute(delete(table).where(table.c.board_id == board_id))
+            conn.execute(delete(boards).where(boards.c.id == board_id))
+
+
+shard_router = ShardRouter(
+    engine,
+    shard_engines,
+    cache_seconds=settings.shard_directory_cache_seconds,
+    id_block_size=settings.shard_id_block_size,
+)
+
+
+def connection_for(session: Session, instance: Any) -> Connection:
+    """Connection tới database chứa `instance` (shard của board/task hoặc database chính)"""
+    return session.connection(bind_arguments={"mapper": type(instance), "instance": instance})
+
+
+def group_by_connection(session: Session, instances: Iterable[Any]) -> List[Tuple[Connection, List[Any]]]:
+    """Nhóm instances theo database chứa chúng (chỉ một nhóm khi không shard)"""
+    groups: Dict[Connection, List[Any]] = {}
+    for instance in instances:
+        groups.setdefault(connection_for(session, instance), []).append(instance)
+    return list(groups.items())
+
+
+if shard_router.enabled:
+    SessionLocal.configure(
+        shards=shard_engines,
+        shard_chooser=shard_router.shard_chooser,
+        identity_chooser=shard_router.identity_chooser,
+        execute_chooser=shard_router.execute_chooser,
+    )
+
+    @event.listens_for(SessionLocal, "before_flush", insert=True)
+    def _assign_ids(session: Session, flush_context, instances) -> None:
+        """Cấp id toàn cục và shard cho board/task mới, chạy trước các listener khác"""
+        for obj in session.new:
+            if isinstance(obj, Board) and obj.id is None:
+                obj.id = shard_router.next_id("boards")
+                shard = shard_router.hash_shard(obj.id)
+                shard_router.set_board_shard(session.connection(bind_arguments={"mapper": BoardShard}), obj.id, shard)
+                shard_router.remember(obj.id, shard)
+            elif isinstance(obj, Task) and obj.id is None:
+                obj.id = shard_router.next_id("tasks")
+
+        deleted_boards = [obj.id for obj in session.deleted if isinstance(obj, Board)]
+        if deleted_boards:
+            session.connection(bind_arguments={"mapper": BoardShard}).execute(
+                delete(BoardShard).where(BoardShard.board_id.in_(deleted_boards))
+            )
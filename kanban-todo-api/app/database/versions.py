@@ -0,0 +1,335 @@
+"""
+Version counters cho conditional GET (ETag).
+
+- Board.revision tăng khi board hoặc bất kỳ task nào trong board thay đổi
+- listing_versions giữ version của danh sách boards theo scope:
+  "user:<id>" (boards của user) và "public:<owner_id>" (public boards của
+  owner). Version của danh sách public boards là tổng các scope "public:*":
+  ghi vào public board của các owner khác nhau không tranh nhau một row
+
+Các counter được tăng tự động trong before_flush nên mọi write path đi qua
+Session (repository, scripts) đều được tính, và tăng bằng SQL
+(revision = revision + 1) để không bị mất update khi ghi đồng thời. Khi chỉ
+task thay đổi, revision được tăng bằng Core UPDATE nên Board.version
+(optimistic locking, xem models) không đổi. Revision mới được đọc lại bằng
+UPDATE ... RETURNING (Postgres, SQLite >= 3.35) thay vì SELECT sau khi ghi.
+
+Task bị xóa hoặc chuyển sang board khác được ghi vào task_tombstones (cho
+delta sync) trong cùng flush.
+
+Các thay đổi được gom lại thành ChangeSet và gửi tới các listener (ví dụ
+response cache, board event feed) sau khi transaction commit thành công.
+"""
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import case, delete, event, func, insert, inspect, select, update
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+
+from .connection import SessionLocal
+from .models import Board, Task, TaskTombstone, User, ListingVersion
+from .sharding import connection_for, group_by_connection
+
+PUBLIC_SCOPE_PREFIX = "public:"
+
+
+def user_scope(user_id: int) -> str:
+    return f"user:{user_id}"
+
+
+def public_scope(owner_id: int) -> str:
+    return f"{PUBLIC_SCOPE_PREFIX}{owner_id}"
+
+
+def is_public_scope(scope: str) -> bool:
+    return scope.startswith(PUBLIC_SCOPE_PREFIX)
+
+
+@dataclass
+class ChangeSet:
+    """Những gì một transaction đã thay đổi"""
+    board_ids: Set[int] = field(default_factory=set)  # Board (hoặc task trong board) bị ghi/xóa
+    scopes: Set[str] = field(default_factory=set)  # Listing scope bị tăng version
+    user_ids: Set[int] = field(default_factory=set)  # User bị sửa/xóa
+    events: List[Tuple[int, Dict[str, Any]]] = field(default_factory=list)  # (board_id, event) cho event feed
+
+
+ChangeListener = Callable[[ChangeSet], None]
+_change_listeners: List[ChangeListener] = []
+
+
+def register_change_listener(listener: ChangeListener) -> None:
+    """Đăng ký callback được gọi sau mỗi commit có thay đổi board/task"""
+    _change_listeners.append(listener)
+
+
+def _pending_changes(session: Session) -> ChangeSet:
+    return session.info.setdefault("pending_changes", ChangeSet())
+
+
+def _was_public(board: Board) -> bool:
+    history = inspect(board).attrs.is_public.history
+    return bool(board.is_public) or any(history.deleted or ())
+
+
+def _upsert_statement(dialect_name: str, scope: str):
+    if dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect_name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        return None
+
+    stmt = dialect_insert(ListingVersion.__table__).values(scope=scope, version=1)
+    return stmt.on_conflict_do_update(
+        index_elements=[ListingVersion.__table__.c.scope],
+        set_={"version": ListingVersion.__table__.c.version + 1},
+    )
+
+
+def bump_listing_versions(session: Session, scopes: Iterable[str]) -> None:
+    """Tăng version của các listing scope (tạo row nếu chưa có)"""
+    # listing_versions nằm ở database chính (kể cả khi shard boards/tasks)
+    connection = session.connection(bind_arguments={"mapper": ListingVersion})
+    table = ListingVersion.__table__
+    # Sort để các transaction lock row theo cùng thứ tự
+    for scope in sorted(set(scopes)):
+        stmt = _upsert_statement(connection.dialect.name, scope)
+        if stmt is not None:
+            connection.execute(stmt)
+            continue
+
+        result = connection.execute(
+            update(table).where(table.c.scope == scope).values(version=table.c.version + 1)
+        )
+        if result.rowcount == 0:
+            connection.execute(insert(table).values(scope=scope, version=1))
+
+
+@event.listens_for(SessionLocal, "before_flush")
+def _bump_versions(session: Session, flush_context, instances) -> None:
+    touched_boards: Set[int] = set()  # Board cần tăng revision
+    deleted_boards: Set[int] = set()
+    scopes: Set[str] = set()
+    user_ids: Set[int] = set()
+
+    for obj in session.new:
+        if isinstance(obj, Board):
+            scopes.add(user_scope(obj.owner_id))
+            if obj.is_public:
+                scopes.add(public_scope(obj.owner_id))
+        elif isinstance(obj, Task):
+            # tasks_count trong listing thay đổi
+            touched_boards.add(obj.board_id)
+
+    for obj in session.deleted:
+        if isinstance(obj, Board):
+            deleted_boards.add(obj.id)
+            scopes.add(user_scope(obj.owner_id))
+            if _was_public(obj):
+                scopes.add(public_scope(obj.owner_id))
+        elif isinstance(obj, Task):
+            touched_boards.add(obj.board_id)
+        elif isinstance(obj, User):
+            user_ids.add(obj.id)
+
+    listing_boards = set(touched_boards)  # Board có tasks_count thay đổi
+
+    for obj in session.dirty:
+        if not session.is_modified(obj):
+            continue
+        if isinstance(obj, Board):
+            touched_boards.add(obj.id)
+            listing_boards.add(obj.id)
+            if _was_public(obj):
+                scopes.add(public_scope(obj.owner_id))
+        elif isinstance(obj, Task):
+            touched_boards.add(obj.board_id)
+            # Task chuyển sang board khác
+            old_board_ids = inspect(obj).attrs.board_id.history.deleted or ()
+            touched_boards.update(board_id for board_id in old_board_ids if board_id is not None)
+            listing_boards.update(board_id for board_id in old_board_ids if board_id is not None)
+            if old_board_ids:
+                listing_boards.add(obj.board_id)
+        elif isinstance(obj, User):
+            user_ids.add(obj.id)
+            # owner_name trong listing lấy từ full_name/username
+            state = inspect(obj).attrs
+            if state.full_name.history.has_changes() or state.username.history.has_changes():
+                scopes.update((user_scope(obj.id), public_scope(obj.id)))
+
+    for board_id in touched_boards - deleted_boards:
+        if board_id is None:
+            continue
+        board = session.get(Board, board_id)
+        if board is None:
+            continue
+        if session.is_modified(board):
+            # Board tự thay đổi: tăng revision trong cùng UPDATE (kèm kiểm tra version)
+            board.revision = Board.revision + 1
+        else:
+            # Chỉ task trong board thay đổi: UPDATE bằng Core để không tăng Board.version,
+            # nếu không sửa board sẽ bị 412 mỗi khi có người kéo task
+            connection = connection_for(session, board)
+            stmt = update(Board).where(Board.id == board_id).values(revision=Board.revision + 1)
+            if connection.dialect.update_returning:
+                # Đọc giá trị mới ngay trong câu UPDATE, không cần SELECT lại khi tính ETag
+                row = connection.execute(stmt.returning(Board.revision, Board.updated_at)).first()
+                if row is not None:
+                    set_committed_value(board, "revision", row.revision)
+                    set_committed_value(board, "updated_at", row.updated_at)
+            else:
+                connection.execute(stmt)
+                session.expire(board, ["revision", "updated_at"])
+        if board_id in listing_boards:
+            scopes.add(user_scope(board.owner_id))
+            if _was_public(board):
+                scopes.add(public_scope(board.owner_id))
+
+    if scopes:
+        bump_listing_versions(session, scopes)
+
+    changes = _pending_changes(session)
+    changes.board_ids.update(board_id for board_id in touched_boards | deleted_boards if board_id is not None)
+    changes.scopes.update(scopes)
+    changes.user_ids.update(user_ids)
+
+
+TASK_EVENT_FIELDS = ("id", "board_id", "title", "status", "priority", "position", "assigned_to", "version", "updated_at")
+TASK_MOVE_FIELDS = ("status", "position", "board_id")
+
+
+@event.listens_for(SessionLocal, "before_flush")
+def _record_tombstones(session: Session, flush_context, instances) -> None:
+    now = datetime.utcnow()
+    deleted = [obj for obj in session.deleted if isinstance(obj, Board)]
+    deleted_boards = {obj.id for obj in deleted}
+
+    for obj in session.deleted:
+        if isinstance(obj, Task) and obj.board_id not in deleted_boards:
+            session.add(TaskTombstone(board_id=obj.board_id, task_id=obj.id, deleted_at=now))
+
+    for obj in session.dirty:
+        if isinstance(obj, Task):
+            # Task chuyển board: với board cũ coi như đã bị xóa
+            for old_board_id in inspect(obj).attrs.board_id.history.deleted or ():
+                if old_board_id is not None and old_board_id != obj.board_id:
+                    session.add(TaskTombstone(board_id=old_board_id, task_id=obj.id, deleted_at=now))
+
+    for connection, boards in group_by_connection(session, deleted):
+        connection.execute(
+            delete(TaskTombstone).where(TaskTombstone.board_id.in_([board.id for board in boards]))
+        )
+
+
+def _value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return getattr(value, "value", value)  # Enum -> value
+
+
+def _task_payload(task: Task) -> Dict[str, Any]:
+    """Bản rút gọn của task cho event (không kèm description)"""
+    # Đọc từ state đã load, không trigger lazy load trong lúc flush
+    values = inspect(task).dict
+    return {name: _value(values.get(name)) for name in TASK_EVENT_FIELDS}
+
+
+@event.listens_for(SessionLocal, "after_flush")
+def _collect_events(session: Session, flush_context) -> None:
+    # Sau flush task mới đã có id, history của attribute vẫn còn
+    events = _pending_changes(session).events
+    deleted_boards = {obj.id for obj in session.deleted if isinstance(obj, Board)}
+
+    for obj in session.new:
+        if isinstance(obj, Task):
+            events.append((obj.board_id, {"type": "task.created", "task": _task_payload(obj)}))
+
+    for obj in session.dirty:
+        if isinstance(obj, Task) and session.is_modified(obj):
+            state = inspect(obj).attrs
+            payload = _task_payload(obj)
+            if not any(state[name].history.has_changes() for name in TASK_MOVE_FIELDS):
+                events.append((obj.board_id, {"type": "task.updated", "task": payload}))
+                continue
+            old_board_ids = [board_id for board_id in state.board_id.history.deleted or () if board_id is not None]
+            moved = {"type": "task.moved", "task": payload}
+            if old_board_ids:
+                moved["from_board_id"] = old_board_ids[0]
+                events.append((old_board_ids[0], moved))
+            events.append((obj.board_id, moved))
+        elif isinstance(obj, Board) and session.is_modified(obj):
+            events.append((obj.id, {
+                "type": "board.updated",
+                "board": {"id": obj.id, "name": obj.name, "is_public": obj.is_public, "owner_id": obj.owner_id,
+                          "version": obj.version},
+            }))
+
+    for obj in session.deleted:
+        if isinstance(obj, Board):
+            events.append((obj.id, {"type": "board.deleted", "board": {"id": obj.id}}))
+        elif isinstance(obj, Task) and obj.board_id not in deleted_boards:
+            events.append((obj.board_id, {"type": "task.deleted", "task": {"id": obj.id, "board_id": obj.board_id}}))
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _notify_changes(session: Session) -> None:
+    changes = session.info.pop("pending_changes", None)
+    if changes is None or not (changes.board_ids or changes.scopes or changes.user_ids or changes.events):
+        return
+    for listener in _change_listeners:
+        try:
+            listener(changes)
+        except Exception as e:
+            # Data đã commit, listener lỗi không được làm hỏng request
+            print(f"⚠️  Change listener {listener!r} failed: {e}")
+
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _discard_changes(session: Session) -> None:
+    session.info.pop("pending_changes", None)
+
+
+def board_version(board: Board) -> str:
+    """
+    Version của một board cho ETag.
+    Kèm thời điểm tạo board vì SQLite có thể dùng lại id của board đã xóa.
+    """
+    created = int(board.created_at.timestamp() * 1_000_000)
+    return f"{board.id}.{created:x}.{board.revision}"
+
+
+def _public_scopes(table):
+    # Range trên primary key thay cho LIKE 'public:%' (dùng được index trên mọi database), ';' là ký tự ngay sau ':'
+    return (table.c.scope >= PUBLIC_SCOPE_PREFIX) & (table.c.scope < PUBLIC_SCOPE_PREFIX[:-1] + ";")
+
+
+def board_listing_version(db: Session, user: Optional[User]) -> str:
+    """
+    Version của danh sách boards mà user nhìn thấy (None = anonymous/public).
+    Public boards và admin (thấy mọi board) dùng tổng version của các scope:
+    mỗi thay đổi đều tăng version của một scope nên tổng luôn tăng.
+    """
+    table = ListingVersion.__table__
+    if user is None:
+        total = db.execute(
+            select(func.coalesce(func.sum(table.c.version), 0)).where(_public_scopes(table))
+        ).scalar_one()
+        return f"ps{total}"
+
+    if user.role == "admin":
+        total = db.execute(
+            select(func.coalesce(func.sum(table.c.version), 0)).where(table.c.scope.like("user:%"))
+        ).scalar_one()
+        return f"a{total}"
+
+    own_scope = user_scope(user.id)
+    own, public = db.execute(
+        select(
+            func.coalesce(func.sum(case((table.c.scope == own_scope, table.c.version), else_=0)), 0),
+            func.coalesce(func.sum(case((table.c.scope != own_scope, table.c.version), else_=0)), 0),
+        ).where((table.c.scope == own_scope) | _public_scopes(table))
+    ).one()
+    return f"u{user.id}.{own}.ps{public}"
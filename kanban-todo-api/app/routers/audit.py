@@ -0,0 +1,34 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from typing import List, Optional
+
+from app.schemas.audit import AuditLogResponse, audit_log_list_adapter
+from app.database import get_db, audit_log_repository
+from app.database.models import User
+from app.core.deps import UnitOfWorkRoute, get_current_admin_user
+from app.core.responses import list_response
+
+router = APIRouter(prefix="/audit", tags=["audit"], route_class=UnitOfWorkRoute)
+
+@router.get("/", response_model=List[AuditLogResponse])
+def get_audit_log(
+    action: Optional[str] = Query(None, description="Ví dụ: user.updated, user.role_changed, board.deleted"),
+    actor_id: Optional[int] = None,
+    target_type: Optional[str] = Query(None, description="user hoặc board"),
+    target_id: Optional[int] = None,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    admin_user: User = Depends(get_current_admin_user),
+    db: Session = Depends(get_db)
+):
+    """Audit log, mới nhất trước (Admin only)"""
+    entries = audit_log_repository.list_rows(
+        db,
+        action=action,
+        actor_id=actor_id,
+        target_type=target_type,
+        target_id=target_id,
+        skip=skip,
+        limit=limit
+    )
+    return list_response(audit_log_list_adapter, entries)
@@ -1,23 +1,78 @@
-from datetime import timedelta
-from fastapi import APIRouter, Depends, HTTPException, status
+from datetime import datetime, timedelta
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
-from app.core.security import create_access_token, get_password_hash, verify_password
+from typing import Optional
+from app.core.security import create_access_token, get_password_hash, password_hasher
 from app.core.config import settings
-from app.core.deps import get_db
-from app.schemas.user import UserCreate, UserResponse, UserLogin
-from app.database import user_repository
+from app.core.deps import UnitOfWorkRoute, get_db
+from app.core.rate_limit import login_rate_limiter
+from app.core.responses import json_response
+from app.schemas.user import UserCreate, UserResponse, UserLogin, RefreshTokenRequest, TokenResponse, LoginResponse
+from app.database import user_repository, refresh_token_repository
+from app.database.models import User, RefreshToken
 
-router = APIRouter(prefix="/auth", tags=["authentication"])
+router = APIRouter(prefix="/auth", tags=["authentication"], route_class=UnitOfWorkRoute)
 
-@router.post("/login", response_model=dict)
-def login(
+def get_client_ip(request: Request) -> Optional[str]:
+    """IP client dùng cho rate limit"""
+    if settings.login_rate_limit_trust_proxy:
+        forwarded_for = request.headers.get("x-forwarded-for")
+        if forwarded_for:
+            # Entry cuối cùng do proxy của mình thêm vào, không giả mạo được
+            return forwarded_for.split(",")[-1].strip()
+    return request.client.host if request.client else None
+
+async def authenticate_user(request: Request, db: Session, username: str, password: str) -> Optional[User]:
+    """
+    Xác thực username/password.
+    Query DB chạy trên threadpool, bcrypt chạy trên password hasher pool,
+    nên request login không giữ thread nào trong lúc chờ bcrypt.
+    """
+    # Admission control: rate limit theo username/IP trước khi tốn CPU cho bcrypt
+    await run_in_threadpool(login_rate_limiter.check, username, get_client_ip(request))
+    
+    user = await run_in_threadpool(user_repository.get_by_username, db, username)
+    if not user:
+        return None
+    
+    with login_rate_limiter.verification_slot():
+        if not await password_hasher.averify(password, user.password_hash):
+            return None
+    
+    # Transparent rehash khi cost factor đã thay đổi
+    if password_hasher.needs_rehash(user.password_hash):
+        new_hash = await password_hasher.ahash(password)
+        await run_in_threadpool(user_repository.set_password_hash, db, user, new_hash)
+    
+    return user
+
+def issue_tokens(db: Session, user: User) -> LoginResponse:
+    """Tạo access token + refresh token (family mới) cho user vừa login"""
+    # Build response trước khi commit để không phải load lại user
+    user_response = UserResponse.model_validate(user)
+    access_token_expires = timedelta(minutes=settings.access_token_expire_minutes)
+    access_token = create_access_token(
+        subject=user.id, expires_delta=access_token_expires
+    )
+    refresh_token = refresh_token_repository.issue(db, user.id)
+    
+    return LoginResponse(
+        access_token=access_token,
+        refresh_token=refresh_token,
+        user=user_response
+    )
+
+@router.post("/login", response_model=LoginResponse)
+async def login(
+    request: Request,
     form_data: OAuth2PasswordRequestForm = Depends(),
     db: Session = Depends(get_db)
 ):
     """Login user and return access token"""
-    user = user_repository.get_by_username(db, form_data.username)
-    if not user or not verify_password(form_data.password, user.password_hash):
+    user = await authenticate_user(request, db, form_data.username, form_data.password)
+    if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -32,25 +87,17 @@ def login(
             detail="Tài khoản của bạn đã bị khóa. Vui lòng liên hệ quản trị viên.",
         )
 
-    access_token_expires = timedelta(minutes=settings.access_token_expire_minutes)
-    access_token = create_access_token(
-        subject=user.id, expires_delta=access_token_expires
-    )
+    return json_response(await run_in_threadpool(issue_tokens, db, user))
 
-    return {
-        "access_token": access_token,
-        "token_type": "bearer",
-        "user": UserResponse.from_orm(user)
-    }
-
-@router.post("/login-json", response_model=dict)
-def login_json(
+@router.post("/login-json", response_model=LoginResponse)
+async def login_json(
+    request: Request,
     user_data: UserLogin,
     db: Session = Depends(get_db)
 ):
     """Login user with JSON payload and return access token"""
-    user = user_repository.get_by_username(db, user_data.username)
-    if not user or not verify_password(user_data.password, user.password_hash):
+    user = await authenticate_user(request, db, user_data.username, user_data.password)
+    if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -65,16 +112,64 @@ def login_json(
             detail="Tài khoản của bạn đã bị khóa. Vui lòng liên hệ quản trị viên.",
         )
 
-    access_token_expires = timedelta(minutes=settings.access_token_expire_minutes)
+    return json_response(await run_in_threadpool(issue_tokens, db, user))
+
+def revoke_reused_family(db: Session, db_token: RefreshToken) -> None:
+    """Thu hồi cả family của token bị dùng lại và commit ngay (request sẽ trả 401, bị rollback)"""
+    print(f"🚨 Refresh token reuse detected for user ID {db_token.user_id}, revoking family")
+    refresh_token_repository.revoke_family(db, db_token.family_id)
+    db.commit()
+
+@router.post("/refresh", response_model=TokenResponse)
+def refresh_access_token(
+    token_data: RefreshTokenRequest,
+    db: Session = Depends(get_db)
+):
+    """Đổi refresh token lấy access token mới (refresh token được rotate)"""
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Refresh token không hợp lệ hoặc đã hết hạn",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    
+    db_token = refresh_token_repository.get_by_token(db, token_data.refresh_token)
+    if not db_token or db_token.expires_at < datetime.utcnow():
+        raise credentials_exception
+    
+    # Token đã bị rotate mà vẫn được gửi lại -> có thể đã bị lộ, thu hồi cả family
+    if db_token.revoked_at is not None:
+        revoke_reused_family(db, db_token)
+        raise credentials_exception
+    
+    user = db_token.user
+    if not user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Tài khoản của bạn đã bị khóa. Vui lòng liên hệ quản trị viên.",
+        )
+    
+    refresh_token = refresh_token_repository.rotate(db, db_token)
+    if refresh_token is None:
+        # Request khác đã rotate token này giữa lúc đọc và lúc ghi: xử lý như reuse
+        revoke_reused_family(db, db_token)
+        raise credentials_exception
     access_token = create_access_token(
-        subject=user.id, expires_delta=access_token_expires
+        subject=user.id,
+        expires_delta=timedelta(minutes=settings.access_token_expire_minutes)
     )
+    
+    return json_response(TokenResponse(access_token=access_token, refresh_token=refresh_token))
 
-    return {
-        "access_token": access_token,
-        "token_type": "bearer",
-        "user": UserResponse.from_orm(user)
-    }
+@router.post("/logout")
+def logout(
+    token_data: RefreshTokenRequest,
+    db: Session = Depends(get_db)
+):
+    """Thu hồi refresh token (và các token cùng family)"""
+    db_token = refresh_token_repository.get_by_token(db, token_data.refresh_token)
+    if db_token:
+        refresh_token_repository.revoke_family(db, db_token.family_id)
+    return {"message": "Đăng xuất thành công"}
 
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
 def register(user_data: UserCreate, db: Session = Depends(get_db)):
@@ -96,7 +191,7 @@ def register(user_data: UserCreate, db: Session = Depends(get_db)):
         )
     
     # Hash password and create user
-    user_dict = user_data.dict()
+    user_dict = user_data.model_dump()
     user_dict["password_hash"] = get_password_hash(user_data.password)
     user_dict.pop("password", None)  # Remove password field
     
@@ -104,4 +199,4 @@ def register(user_data: UserCreate, db: Session = Depends(get_db)):
     
     user = user_repository.create_user(db, user_dict)
     print(f"✅ User created with ID: {user.id}, is_active: {user.is_active}")
-    return UserResponse.from_orm(user)
+    return json_response(UserResponse.model_validate(user), status_code=status.HTTP_201_CREATED)
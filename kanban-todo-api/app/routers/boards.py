@@ -1,73 +1,79 @@
-from fastapi import APIRouter, HTTPException, status, Query, Depends
+from fastapi import APIRouter, HTTPException, status, Query, Depends, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from typing import List, Optional
 
-from app.schemas.board import BoardCreate, BoardResponse, BoardUpdate, BoardWithTasks
-from app.schemas.task import TaskResponse
-from app.database import get_db, board_repository, task_repository
-from app.database.models import User
-from app.core.deps import get_current_user, optional_current_user
+from app.schemas.board import BoardCreate, BoardResponse, BoardUpdate, BoardWithTasks, BoardChanges, BoardStats, BoardAnalytics, board_list_adapter, board_stats_list_adapter
+from app.schemas.job import JobAccepted
+from app.schemas.task import task_list_adapter
+from app.database import get_db, board_repository, task_repository, board_listing_version, board_version
+from app.database.models import Board, User
+from app.core.audit import audit_log
+from app.core.broadcast import board_event_stream
+from app.core.cache import CacheEntry, PUBLIC_BOARDS_TAG, board_tag, cache_key, cached_response, response_cache
+from app.core.deps import UnitOfWorkRoute, get_current_user
+from app.core.jobs import JobContext, JobFailed, job_runner
+from app.core.etag import make_etag, strong_etag, etag_matches, set_etag, not_modified, item_etag, check_if_match
+from app.core.config import settings
+from app.core.permissions import PermissionResolver, get_permission_resolver, optional_permission_resolver, stream_permission_resolver
+from app.core.responses import dump_list, json_response, list_response
+from app.core.stats import compute_board_stats, stats_etag
+from app.core.sync import board_changes, parse_sync_token
 
-router = APIRouter(prefix="/boards", tags=["boards"])
+router = APIRouter(prefix="/boards", tags=["boards"], route_class=UnitOfWorkRoute)
+
+MAX_STATS_BOARDS = 100
+
+def build_board_detail(db: Session, board: Board) -> BoardWithTasks:
+    """Board kèm toàn bộ tasks"""
+    # Tasks lấy qua projection; không validate trực tiếp từ board để tránh lazy load board.tasks
+    tasks = task_list_adapter.validate_python(task_repository.list_rows(db, board_id=board.id), from_attributes=True)
+    
+    board_response = BoardResponse.model_validate(board)
+    return BoardWithTasks(**board_response.model_dump(), tasks=tasks)
 
 @router.get("/", response_model=List[BoardResponse])
 def get_boards(
+    request: Request,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Lấy danh sách boards của user hiện tại + public boards (admin xem tất cả)"""
+    # Conditional GET: listing không đổi thì trả 304, không load boards
+    etag = make_etag("boards", board_listing_version(db, current_user))
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    
+    # Projection: tasks_count và owner_name tính trong SQL, pagination trong SQL
     if current_user.role == "admin":
-        boards = board_repository.get_multi(db)
+        boards = board_repository.list_rows(db, skip=skip, limit=limit)
     else:
         # Get owned boards + public boards for regular users
-        boards = board_repository.get_accessible_boards(db, current_user.id)
-    
-    # Pagination
-    paginated_boards = boards[skip:skip+limit]
+        boards = board_repository.list_rows(db, user_id=current_user.id, skip=skip, limit=limit)
     
-    # Thêm tasks_count và owner_name
-    response_boards = []
-    for board in paginated_boards:
-        board_tasks = task_repository.get_by_board(db, board.id)
-        board_response = BoardResponse.from_orm(board)
-        board_response.tasks_count = len(board_tasks)
-        
-        # Add owner name
-        if board.owner:
-            board_response.owner_name = board.owner.full_name or board.owner.username
-        
-        response_boards.append(board_response)
-    
-    return response_boards
+    response = list_response(board_list_adapter, boards)
+    set_etag(response, etag)
+    return response
 
 @router.get("/public", response_model=List[BoardResponse])
 def get_public_boards(
+    request: Request,
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=100),
-    current_user: Optional[User] = Depends(optional_current_user),
     db: Session = Depends(get_db)
 ):
     """Lấy danh sách public boards (không cần authentication)"""
-    public_boards = board_repository.get_public_boards(db)
-    
-    # Pagination
-    paginated_boards = public_boards[skip:skip+limit]
+    def build() -> CacheEntry:
+        etag = make_etag("public-boards", board_listing_version(db, None))
+        public_boards = board_repository.list_rows(db, public_only=True, skip=skip, limit=limit)
+        return CacheEntry(body=dump_list(board_list_adapter, public_boards), etag=etag)
     
-    response_boards = []
-    for board in paginated_boards:
-        board_tasks = task_repository.get_by_board(db, board.id)
-        board_response = BoardResponse.from_orm(board)
-        board_response.tasks_count = len(board_tasks)
-        
-        # Add owner name
-        if board.owner:
-            board_response.owner_name = board.owner.full_name or board.owner.username
-        
-        response_boards.append(board_response)
-    
-    return response_boards
+    # Response giống nhau với mọi user nên dùng chung một cache entry
+    entry, hit = response_cache.get_or_build(cache_key(request), [PUBLIC_BOARDS_TAG], build)
+    return cached_response(request, entry, hit)
 
 @router.post("/", response_model=BoardResponse, status_code=status.HTTP_201_CREATED)
 def create_board(
@@ -76,7 +82,7 @@ def create_board(
     db: Session = Depends(get_db)
 ):
     """Tạo board mới"""
-    board_dict = board_data.dict()
+    board_dict = board_data.model_dump()
     board_dict["owner_id"] = current_user.id
     
     print(f"📝 Creating board with data: {board_dict}")
@@ -86,111 +92,253 @@ def create_board(
     
     print(f"✅ Board created with ID: {board.id}, description: '{board.description}'")
     
-    board_response = BoardResponse.from_orm(board)
+    board_response = BoardResponse.model_validate(board)
     board_response.tasks_count = 0
     board_response.owner_name = current_user.full_name or current_user.username
-    return board_response
+    return json_response(board_response, status_code=status.HTTP_201_CREATED, headers={"ETag": item_etag("board", board.id, board.version)})
+
+@router.get("/stats", response_model=List[BoardStats])
+def get_boards_stats(
+    request: Request,
+    board_ids: List[int] = Query([], alias="board_id", description="Lặp lại tham số cho nhiều board: ?board_id=1&board_id=2"),
+    permissions: PermissionResolver = Depends(optional_permission_resolver),
+    db: Session = Depends(get_db)
+):
+    """Thống kê nhiều board cho dashboard (một query cho mọi board)"""
+    board_ids = list(dict.fromkeys(board_ids))
+    if not board_ids or len(board_ids) > MAX_STATS_BOARDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Cần từ 1 đến {MAX_STATS_BOARDS} board_id mỗi request"
+        )
+    
+    permissions.load_boards(board_ids)
+    boards = [permissions.require_board(board_id, "read") for board_id in board_ids]
+    
+    etag = stats_etag(boards)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    
+    response = list_response(board_stats_list_adapter, compute_board_stats(db, boards))
+    set_etag(response, etag)
+    return response
 
 @router.get("/{board_id}", response_model=BoardWithTasks)
 def get_board_detail(
     board_id: int,
-    current_user: Optional[User] = Depends(optional_current_user),
+    request: Request,
+    permissions: PermissionResolver = Depends(optional_permission_resolver),
     db: Session = Depends(get_db)
 ):
     """Lấy chi tiết board kèm tasks"""
-    board = board_repository.get(db, board_id)
-    if not board:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Board không tồn tại"
-        )
+    # Kiểm tra board tồn tại và quyền truy cập (public, owner hoặc admin)
+    board = permissions.require_board(board_id, "read")
     
-    # Kiểm tra quyền truy cập
-    can_access = (
-        board.is_public or  # Public board
-        (current_user and (
-            board.owner_id == current_user.id or  # Owner
-            current_user.role == "admin"  # Admin
-        ))
-    )
+    # Board không đổi từ lần tải trước -> 304, không load tasks và không đụng tới cache.
+    # Strong ETag (body chỉ đổi khi revision đổi) để client gửi lại qua If-Match khi PUT
+    etag = strong_etag("board", board_version(board))
+    if etag_matches(request, etag):
+        return not_modified(etag)
     
-    if not can_access:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Không có quyền truy cập board này"
-        )
+    # Anonymous chỉ đọc được public board, response dùng chung qua cache
+    if permissions.user is None:
+        def build() -> CacheEntry:
+            body = build_board_detail(db, board).model_dump_json().encode("utf-8")
+            return CacheEntry(body=body, etag=etag)
+        
+        entry, hit = response_cache.get_or_build(cache_key(request), [board_tag(board_id)], build)
+        return cached_response(request, entry, hit)
     
-    tasks = task_repository.get_by_board(db, board_id)
-    task_responses = [TaskResponse.from_orm(task) for task in tasks]
+    response = json_response(build_board_detail(db, board))
+    set_etag(response, etag)
+    return response
+
+@router.get("/{board_id}/stats", response_model=BoardStats)
+def get_board_stats(
+    board_id: int,
+    request: Request,
+    permissions: PermissionResolver = Depends(optional_permission_resolver),
+    db: Session = Depends(get_db)
+):
+    """Số tasks theo status/priority, assigned/unassigned và overdue của board"""
+    board = permissions.require_board(board_id, "read")
     
-    board_response = BoardWithTasks.from_orm(board)
-    board_response.tasks = task_responses
-    return board_response
+    etag = stats_etag([board])
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    
+    response = json_response(compute_board_stats(db, [board])[0])
+    set_etag(response, etag)
+    return response
+
+@router.get("/{board_id}/analytics", response_model=BoardAnalytics)
+def get_board_analytics(
+    board_id: int,
+    days: int = Query(settings.analytics_default_days, ge=1, le=365),
+    permissions: PermissionResolver = Depends(optional_permission_resolver),
+    db: Session = Depends(get_db)
+):
+    """Lead time/cycle time (percentiles) và throughput theo ngày của board"""
+    # Import lúc dùng: numpy chỉ cần cho analytics, không làm chậm startup
+    from app.core.analytics import board_analytics
+    
+    permissions.require_board(board_id, "read")
+    return json_response(board_analytics(db, board_id, days))
+
+@router.get("/{board_id}/changes", response_model=BoardChanges)
+def get_board_changes(
+    board_id: int,
+    since: Optional[str] = Query(None, description="Sync token từ lần sync trước, bỏ trống để full sync"),
+    permissions: PermissionResolver = Depends(optional_permission_resolver),
+    db: Session = Depends(get_db)
+):
+    """Delta sync: tasks tạo/sửa và tasks đã xóa kể từ sync token"""
+    board = permissions.require_board(board_id, "read")
+    
+    token = None
+    if since:
+        token = parse_sync_token(since)
+        if token is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Sync token không hợp lệ"
+            )
+    
+    return json_response(board_changes(db, board, token))
+
+@router.get("/{board_id}/events")
+async def stream_board_events(
+    board_id: int,
+    permissions: PermissionResolver = Depends(stream_permission_resolver)
+):
+    """
+    Server-Sent Events: task created/updated/moved/deleted và board updated/deleted.
+    Token gửi qua header Authorization hoặc ?access_token= (EventSource).
+    """
+    board = await run_in_threadpool(permissions.require_board, board_id, "read")
+    # Owner/admin luôn đọc được, user khác chỉ khi board còn public
+    full_access = permissions.user is not None and permissions.can_access(board, "write")
+    
+    # Stream có thể mở rất lâu, trả connection về pool ngay
+    await run_in_threadpool(permissions.db.close)
+    
+    def can_read(board_data: dict) -> bool:
+        return full_access or bool(board_data.get("is_public"))
+    
+    return StreamingResponse(
+        board_event_stream(board_id, can_read, settings.board_events_heartbeat_seconds),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 @router.put("/{board_id}", response_model=BoardResponse)
 def update_board(
     board_id: int,
     board_update: BoardUpdate,
-    current_user: User = Depends(get_current_user),
+    request: Request,
+    permissions: PermissionResolver = Depends(get_permission_resolver),
     db: Session = Depends(get_db)
 ):
     """Cập nhật board (chỉ owner hoặc admin)"""
-    board = board_repository.get(db, board_id)
-    if not board:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Board không tồn tại"
-        )
-    
     # Kiểm tra ownership
-    if board.owner_id != current_user.id and current_user.role != "admin":
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Không có quyền chỉnh sửa board này"
-        )
+    board = permissions.require_board(board_id, "write", detail="Không có quyền chỉnh sửa board này")
+    # If-Match: ETag của board (POST/PUT) hoặc của GET chi tiết (khớp revision: chặt hơn version
+    # vì revision đổi với mọi thay đổi của board và tasks)
+    check_if_match(request, item_etag("board", board.id, board.version), strong_etag("board", board_version(board)))
     
-    print(f"📝 Updating board {board_id} with data: {board_update.dict(exclude_unset=True)}")
+    print(f"📝 Updating board {board_id} with data: {board_update.model_dump(exclude_unset=True)}")
     print(f"📝 Description value: '{board_update.description}' (type: {type(board_update.description)})")
     
     updated_board = board_repository.update(db, db_obj=board, obj_in=board_update)
     
     print(f"✅ Board updated, new description: '{updated_board.description}'")
     
-    tasks = task_repository.get_by_board(db, board_id)
-    board_response = BoardResponse.from_orm(updated_board)
-    board_response.tasks_count = len(tasks)
+    board_response = BoardResponse.model_validate(updated_board)
+    board_response.tasks_count = task_repository.count_by_board(db, board_id)
     
     # Add owner name
     if updated_board.owner:
         board_response.owner_name = updated_board.owner.full_name or updated_board.owner.username
     
-    return board_response
+    return json_response(board_response, headers={"ETag": item_etag("board", updated_board.id, updated_board.version)})
+
+def _job_accepted(job_id: str):
+    """202 Accepted, client poll Location để biết kết quả"""
+    status_url = f"/jobs/{job_id}"
+    return json_response(
+        JobAccepted(job_id=job_id, status="queued", status_url=status_url),
+        status_code=status.HTTP_202_ACCEPTED,
+        headers={"Location": status_url}
+    )
+
+@job_runner.handler("board.delete")
+def delete_board_job(db: Session, job: JobContext):
+    """Xóa tasks theo từng batch (mỗi batch một transaction) rồi xóa board"""
+    board_id = job.payload["board_id"]
+    board = board_repository.get(db, board_id)
+    if not board:
+        # Lần chạy trước đã xóa xong
+        return {"board_id": board_id, "deleted_tasks_count": 0}
+    name, owner_id = board.name, board.owner_id
+    
+    total = task_repository.count_by_board(db, board_id)
+    deleted = 0
+    while True:
+        count = task_repository.delete_batch(db, board_id, settings.board_delete_chunk_size)
+        if count == 0:
+            break
+        # Job không chạy qua UnitOfWorkRoute: commit mỗi batch
+        db.commit()
+        deleted += count
+        job.progress(deleted, total + 1)
+    
+    board_repository.delete(db, id=board_id)
+    db.commit()
+    actor = db.get(User, job.owner_id) if job.owner_id else None
+    audit_log.record(
+        "board.deleted", "board", board_id, actor=actor,
+        name=name, owner_id=owner_id, deleted_tasks_count=deleted, background=True
+    )
+    return {"board_id": board_id, "deleted_tasks_count": deleted}
+
+@job_runner.handler("board.export")
+def export_board_job(db: Session, job: JobContext):
+    """Board kèm toàn bộ tasks, kết quả lưu trong job"""
+    board = board_repository.get(db, job.payload["board_id"])
+    if not board:
+        raise JobFailed("Board không tồn tại")
+    return build_board_detail(db, board).model_dump(mode="json")
+
+@router.post("/{board_id}/export", response_model=JobAccepted, status_code=status.HTTP_202_ACCEPTED)
+def export_board(
+    board_id: int,
+    permissions: PermissionResolver = Depends(get_permission_resolver),
+):
+    """Export board kèm tasks bằng background job, kết quả ở GET /jobs/{job_id}"""
+    permissions.require_board(board_id, "read")
+    return _job_accepted(job_runner.enqueue("board.export", {"board_id": board_id}, owner=permissions.user))
 
 @router.delete("/{board_id}")
 def delete_board(
     board_id: int,
-    current_user: User = Depends(get_current_user),
+    background: bool = Query(False, description="Xóa bằng background job, trả về 202 kèm job id"),
+    permissions: PermissionResolver = Depends(get_permission_resolver),
     db: Session = Depends(get_db)
 ):
-    """Xóa board (chỉ owner hoặc admin)"""
-    board = board_repository.get(db, board_id)
-    if not board:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Board không tồn tại"
-        )
-    
+    """Xóa board (chỉ owner hoặc admin). Board lớn được xóa bằng background job (202)"""
     # Kiểm tra ownership
-    if board.owner_id != current_user.id and current_user.role != "admin":
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Không có quyền xóa board này"
-        )
+    board = permissions.require_board(board_id, "write", detail="Không có quyền xóa board này")
     
-    tasks = task_repository.get_by_board(db, board_id)
-    deleted_tasks_count = len(tasks)
+    deleted_tasks_count = task_repository.count_by_board(db, board_id)
+    
+    if background or deleted_tasks_count > settings.board_delete_background_threshold:
+        return _job_accepted(job_runner.enqueue("board.delete", {"board_id": board_id}, owner=permissions.user))
     
     board_repository.delete(db, id=board_id)
+    audit_log.record(
+        "board.deleted", "board", board_id, actor=permissions.user, db=db,
+        name=board.name, owner_id=board.owner_id, deleted_tasks_count=deleted_tasks_count
+    )
     
     return {
         "message": f"Đã xóa board '{board.name}'",
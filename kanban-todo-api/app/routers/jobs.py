@@ -0,0 +1,26 @@
+from fastapi import APIRouter, HTTPException, status, Depends
+from sqlalchemy.orm import Session
+
+from app.schemas.job import JobResponse
+from app.database import get_db, Job
+from app.database.models import User
+from app.core.deps import UnitOfWorkRoute, get_current_user
+from app.core.responses import json_response
+
+router = APIRouter(prefix="/jobs", tags=["jobs"], route_class=UnitOfWorkRoute)
+
+@router.get("/{job_id}", response_model=JobResponse)
+def get_job(
+    job_id: str,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Status, progress và kết quả của background job (người tạo job hoặc admin)"""
+    job = db.get(Job, job_id)
+    # Job của người khác trả 404 như job không tồn tại
+    if not job or (job.owner_id != current_user.id and current_user.role != "admin"):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job không tồn tại"
+        )
+    return json_response(JobResponse.model_validate(job))
@@ -1,203 +1,219 @@
-from fastapi import APIRouter, HTTPException, status, Query, Depends
+from fastapi import APIRouter, HTTPException, status, Query, Depends, Request
 from starlette import status as starlette_status
 from sqlalchemy.orm import Session
+from datetime import datetime, timedelta
 from typing import List, Optional
 
-from app.schemas.task import TaskCreate, TaskResponse, TaskUpdate, TaskMove, TaskAssign
-from app.database import get_db, task_repository, board_repository, user_repository
-from app.database.models import StatusEnum, User
-from app.core.deps import get_current_user
+from app.schemas.task import TaskCreate, TaskResponse, TaskUpdate, TaskMove, TaskAssign, naive_utc, task_list_adapter
+from app.database import get_db, task_repository, user_repository, board_version
+from app.database.models import StatusEnum, PriorityEnum, User
+from app.core.deps import UnitOfWorkRoute, get_current_user
+from app.core.etag import make_etag, etag_matches, set_etag, not_modified, item_etag, check_if_match
+from app.core.permissions import PermissionResolver, get_permission_resolver
+from app.core.responses import json_response, list_response
 
-router = APIRouter(prefix="/tasks", tags=["tasks"])
+router = APIRouter(prefix="/tasks", tags=["tasks"], route_class=UnitOfWorkRoute)
 
-def check_board_access(
-    db: Session, 
-    board_id: int, 
-    user: User, 
-    action: str = "read"
-) -> bool:
-    """Helper function để kiểm tra quyền truy cập board"""
-    board = board_repository.get(db, board_id)
-    if not board:
-        return False
-    
-    # Admin có full access
-    if user.role == "admin":
-        return True
-    
-    # Owner có full access
-    if board.owner_id == user.id:
-        return True
-    
-    # Public board chỉ cho phép read
-    if board.is_public and action == "read":
-        return True
-    
-    return False
+MAX_DUE_TASKS = 1000
+MAX_CALENDAR_DAYS = 366
+
+def _task_etag(task) -> str:
+    return item_etag("task", task.id, task.version)
+
+def _task_response(task, status_code: int = status.HTTP_200_OK):
+    """TaskResponse kèm ETag theo version để client gửi lại qua If-Match"""
+    return json_response(TaskResponse.model_validate(task), status_code=status_code, headers={"ETag": _task_etag(task)})
 
 @router.get("/", response_model=List[TaskResponse])
 def get_tasks(
+    request: Request,
     board_id: int = Query(..., description="ID của board"),
     status: Optional[str] = Query(None, description="Filter theo status"),
     priority: Optional[str] = Query(None, description="Filter theo priority"),
     assigned_to: Optional[int] = Query(None, description="Filter theo assigned user"),
-    current_user: User = Depends(get_current_user),
+    permissions: PermissionResolver = Depends(get_permission_resolver),
     db: Session = Depends(get_db)
 ):
     """Lấy tasks với filters"""
-    # Kiểm tra board tồn tại
-    board = board_repository.get(db, board_id)
-    if not board:
-        raise HTTPException(
-            status_code=starlette_status.HTTP_404_NOT_FOUND,
-            detail="Board không tồn tại"
-        )
-
-    # Kiểm tra quyền truy cập board
-    if not check_board_access(db, board_id, current_user, "read"):
-        raise HTTPException(
-            status_code=starlette_status.HTTP_403_FORBIDDEN,
-            detail="Không có quyền truy cập board này"
-        )
+    # Kiểm tra board tồn tại và quyền truy cập board
+    board = permissions.require_board(board_id, "read")
     
-    # Get tasks với filters
+    # Mọi thay đổi task đều tăng revision của board
+    etag = make_etag("tasks", board_version(board))
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    
+    status_enum = None
     if status:
         try:
             status_enum = StatusEnum(status)
-            tasks = task_repository.get_by_status(db, board_id, status_enum)
         except ValueError:
             raise HTTPException(
                 status_code=starlette_status.HTTP_400_BAD_REQUEST,
                 detail=f"Status không hợp lệ: {status}"
             )
-    else:
-        tasks = task_repository.get_by_board(db, board_id)
     
-    # Apply additional filters
-    if priority:
-        tasks = [task for task in tasks if task.priority.value == priority]
-    
-    if assigned_to is not None:
-        tasks = [task for task in tasks if task.assigned_to == assigned_to]
+    # Get tasks với filters (filter trong SQL, chỉ load các cột trả về)
+    if priority and priority not in PriorityEnum.__members__:
+        tasks = []  # Priority không hợp lệ thì không task nào khớp
+    else:
+        tasks = task_repository.list_rows(
+            db,
+            board_id=board_id,
+            status=status_enum,
+            priority=PriorityEnum(priority) if priority else None,
+            assigned_to=assigned_to
+        )
     
-    return [TaskResponse.from_orm(task) for task in tasks]
+    response = list_response(task_list_adapter, tasks)
+    set_etag(response, etag)
+    return response
 
 @router.post("/", response_model=TaskResponse, status_code=status.HTTP_201_CREATED)
 def create_task(
     task_data: TaskCreate,
-    current_user: User = Depends(get_current_user),
+    permissions: PermissionResolver = Depends(get_permission_resolver),
     db: Session = Depends(get_db)
 ):
     """Tạo task mới"""
     # Kiểm tra quyền tạo task trong board
-    if not check_board_access(db, task_data.board_id, current_user, "write"):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Không có quyền tạo task trong board này"
-        )
+    permissions.require_board(
+        task_data.board_id, "write", detail="Không có quyền tạo task trong board này"
+    )
     
     # Tính position cho task mới
-    existing_tasks = task_repository.get_by_status(db, task_data.board_id, task_data.status)
-    task_dict = task_data.dict()
-    task_dict["position"] = len(existing_tasks)
+    task_dict = task_data.model_dump()
+    task_dict["position"] = task_repository.count_by_board(db, task_data.board_id, task_data.status)
     
     task = task_repository.create(db, obj_in=task_dict)
-    return TaskResponse.from_orm(task)
+    return _task_response(task, status_code=status.HTTP_201_CREATED)
+
+def _due_rows(
+    db: Session,
+    current_user: User,
+    board_id: Optional[int],
+    assigned_to_me: bool,
+    limit: int,
+    **filters
+):
+    """Tasks theo due_date trên mọi board user truy cập được (admin: mọi board)"""
+    return task_repository.due_rows(
+        db,
+        user_id=None if current_user.role == "admin" else current_user.id,
+        board_id=board_id,
+        assigned_to=current_user.id if assigned_to_me else None,
+        limit=limit,
+        **filters
+    )
+
+@router.get("/overdue", response_model=List[TaskResponse])
+def get_overdue_tasks(
+    board_id: Optional[int] = Query(None, description="Chỉ một board"),
+    assigned_to_me: bool = Query(False, description="Chỉ tasks được assign cho user hiện tại"),
+    limit: int = Query(500, ge=1, le=MAX_DUE_TASKS),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Tasks chưa done đã quá due date, quá hạn lâu nhất trước"""
+    tasks = _due_rows(db, current_user, board_id, assigned_to_me, limit, due_before=datetime.utcnow())
+    return list_response(task_list_adapter, tasks)
+
+@router.get("/upcoming", response_model=List[TaskResponse])
+def get_upcoming_tasks(
+    days: int = Query(7, ge=1, le=MAX_CALENDAR_DAYS, description="Due trong N ngày tới"),
+    board_id: Optional[int] = Query(None, description="Chỉ một board"),
+    assigned_to_me: bool = Query(False, description="Chỉ tasks được assign cho user hiện tại"),
+    limit: int = Query(500, ge=1, le=MAX_DUE_TASKS),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Tasks chưa done có due date từ bây giờ tới N ngày tới"""
+    now = datetime.utcnow()
+    tasks = _due_rows(
+        db, current_user, board_id, assigned_to_me, limit,
+        due_from=now, due_before=now + timedelta(days=days)
+    )
+    return list_response(task_list_adapter, tasks)
+
+@router.get("/calendar", response_model=List[TaskResponse])
+def get_calendar_tasks(
+    start: datetime = Query(..., description="Từ thời điểm (UTC nếu không có timezone)"),
+    end: datetime = Query(..., description="Tới trước thời điểm"),
+    board_id: Optional[int] = Query(None, description="Chỉ một board"),
+    assigned_to_me: bool = Query(False, description="Chỉ tasks được assign cho user hiện tại"),
+    limit: int = Query(500, ge=1, le=MAX_DUE_TASKS),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Mọi tasks (kể cả done) có due date trong [start, end)"""
+    start, end = naive_utc(start), naive_utc(end)
+    if end <= start or end - start > timedelta(days=MAX_CALENDAR_DAYS):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Khoảng thời gian không hợp lệ (end phải sau start, tối đa {MAX_CALENDAR_DAYS} ngày)"
+        )
+    tasks = _due_rows(
+        db, current_user, board_id, assigned_to_me, limit,
+        due_from=start, due_before=end, include_done=True
+    )
+    return list_response(task_list_adapter, tasks)
 
 @router.get("/{task_id}", response_model=TaskResponse)
 def get_task(
     task_id: int,
-    current_user: User = Depends(get_current_user),
+    permissions: PermissionResolver = Depends(get_permission_resolver),
     db: Session = Depends(get_db)
 ):
     """Lấy task theo ID"""
-    task = task_repository.get(db, task_id)
-    if not task:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Task không tồn tại"
-        )
-    
     # Kiểm tra quyền truy cập
-    if not check_board_access(db, task.board_id, current_user, "read"):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Không có quyền truy cập task này"
-        )
+    task = permissions.require_task(task_id, "read")
     
-    return TaskResponse.from_orm(task)
+    return _task_response(task)
 
 @router.put("/{task_id}", response_model=TaskResponse)
 def update_task(
     task_id: int,
     task_update: TaskUpdate,
-    current_user: User = Depends(get_current_user),
+    request: Request,
+    permissions: PermissionResolver = Depends(get_permission_resolver),
     db: Session = Depends(get_db)
 ):
     """Cập nhật task"""
-    task = task_repository.get(db, task_id)
-    if not task:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Task không tồn tại"
-        )
-    
     # Kiểm tra quyền chỉnh sửa
-    if not check_board_access(db, task.board_id, current_user, "write"):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Không có quyền chỉnh sửa task này"
-        )
+    task = permissions.require_task(task_id, "write", detail="Không có quyền chỉnh sửa task này")
+    check_if_match(request, _task_etag(task))
     
     updated_task = task_repository.update(db, db_obj=task, obj_in=task_update)
-    return TaskResponse.from_orm(updated_task)
+    return _task_response(updated_task)
 
 @router.patch("/{task_id}/move", response_model=TaskResponse)
 def move_task(
     task_id: int,
     task_move: TaskMove,
-    current_user: User = Depends(get_current_user),
+    request: Request,
+    permissions: PermissionResolver = Depends(get_permission_resolver),
     db: Session = Depends(get_db)
 ):
     """Di chuyển task"""
-    task = task_repository.get(db, task_id)
-    if not task:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Task không tồn tại"
-        )
-    
     # Kiểm tra quyền di chuyển
-    if not check_board_access(db, task.board_id, current_user, "write"):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Không có quyền di chuyển task này"
-        )
+    task = permissions.require_task(task_id, "write", detail="Không có quyền di chuyển task này")
+    check_if_match(request, _task_etag(task))
     
     moved_task = task_repository.move_task(db, task_id, task_move.status, task_move.position)
-    return TaskResponse.from_orm(moved_task)
+    return _task_response(moved_task)
 
 @router.patch("/{task_id}/assign", response_model=TaskResponse)
 def assign_task(
     task_id: int,
     task_assign: TaskAssign,
-    current_user: User = Depends(get_current_user),
+    request: Request,
+    permissions: PermissionResolver = Depends(get_permission_resolver),
     db: Session = Depends(get_db)
 ):
     """Gán task cho user"""
-    task = task_repository.get(db, task_id)
-    if not task:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Task không tồn tại"
-        )
-    
     # Kiểm tra quyền assign
-    if not check_board_access(db, task.board_id, current_user, "write"):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Không có quyền assign task này"
-        )
+    task = permissions.require_task(task_id, "write", detail="Không có quyền assign task này")
+    check_if_match(request, _task_etag(task))
     
     # Kiểm tra user được assign có tồn tại
     if task_assign.assigned_to:
@@ -219,28 +235,17 @@ def assign_task(
         db_obj=task, 
         obj_in={"assigned_to": task_assign.assigned_to}
     )
-    return TaskResponse.from_orm(updated_task)
+    return _task_response(updated_task)
 
 @router.delete("/{task_id}")
 def delete_task(
     task_id: int,
-    current_user: User = Depends(get_current_user),
+    permissions: PermissionResolver = Depends(get_permission_resolver),
     db: Session = Depends(get_db)
 ):
     """Xóa task"""
-    task = task_repository.get(db, task_id)
-    if not task:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Task không tồn tại"
-        )
-    
     # Kiểm tra quyền xóa
-    if not check_board_access(db, task.board_id, current_user, "write"):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Không có quyền xóa task này"
-        )
+    task = permissions.require_task(task_id, "write", detail="Không có quyền xóa task này")
     
     task_repository.delete(db, id=task_id)
     return {
@@ -255,7 +260,7 @@ def get_my_assigned_tasks(
 ):
     """Lấy tất cả tasks được assign cho user hiện tại (admin xem tất cả)"""
     if current_user.role == "admin":
-        tasks = task_repository.get_multi(db)  # Admin xem tất cả tasks
+        tasks = task_repository.list_rows(db, limit=100)  # Admin xem tất cả tasks
     else:
-        tasks = task_repository.get_by_assigned_user(db, current_user.id)
-    return [TaskResponse.from_orm(task) for task in tasks]
+        tasks = task_repository.list_rows(db, assigned_to=current_user.id)
+    return list_response(task_list_adapter, tasks)
@@ -1,18 +1,35 @@
 from fastapi import APIRouter, HTTPException, status, Depends
 from sqlalchemy.orm import Session
-from typing import List
+from typing import Any, Dict, List
 
-from app.schemas.user import UserResponse, UserUpdate, PasswordChange
-from app.database import get_db, user_repository
+from app.schemas.user import UserResponse, UserUpdate, PasswordChange, user_list_adapter
+from app.database import get_db, user_repository, refresh_token_repository
 from app.database.models import User
-from app.core.deps import get_current_user, get_current_admin_user
+from app.core.audit import audit_log
+from app.core.deps import UnitOfWorkRoute, get_current_user, get_current_admin_user
+from app.core.responses import json_response, list_response
 
-router = APIRouter(prefix="/users", tags=["users"])
+router = APIRouter(prefix="/users", tags=["users"], route_class=UnitOfWorkRoute)
+
+def _user_changes(user: User, update_data: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """Các field thực sự thay đổi: {field: {"from": cũ, "to": mới}}"""
+    return {
+        field: {"from": getattr(user, field), "to": value}
+        for field, value in update_data.items()
+        if getattr(user, field) != value
+    }
+
+def _audit_user_update(db: Session, admin_user: User, user_id: int, changes: Dict[str, Dict[str, Any]]) -> None:
+    if not changes:
+        return
+    audit_log.record("user.updated", "user", user_id, actor=admin_user, db=db, changes=changes)
+    if "role" in changes:
+        audit_log.record("user.role_changed", "user", user_id, actor=admin_user, db=db, **changes["role"])
 
 @router.get("/me", response_model=UserResponse)
 def read_current_user(current_user: User = Depends(get_current_user)):
     """Lấy thông tin user hiện tại"""
-    return UserResponse.from_orm(current_user)
+    return json_response(UserResponse.model_validate(current_user))
 
 @router.put("/me", response_model=UserResponse)
 def update_current_user(
@@ -22,7 +39,7 @@ def update_current_user(
 ):
     """Cập nhật thông tin user hiện tại"""
     # User thường không được update role của mình
-    update_data = user_update.dict(exclude_unset=True)
+    update_data = user_update.model_dump(exclude_unset=True)
     if "role" in update_data and current_user.role != "admin":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -38,8 +55,12 @@ def update_current_user(
                 detail="Email đã được sử dụng"
             )
     
+    changes = _user_changes(current_user, update_data)
     updated_user = user_repository.update(db, db_obj=current_user, obj_in=update_data)
-    return UserResponse.from_orm(updated_user)
+    if "role" in changes:
+        # Admin tự đổi role của mình
+        _audit_user_update(db, current_user, current_user.id, changes)
+    return json_response(UserResponse.model_validate(updated_user))
 
 @router.patch("/me/password")
 def change_current_user_password(
@@ -60,6 +81,9 @@ def change_current_user_password(
     # Cập nhật mật khẩu mới
     user_repository.update_password(db, current_user, password_change.new_password)
     
+    # Đăng xuất mọi phiên đang dùng refresh token cũ
+    refresh_token_repository.revoke_all_for_user(db, current_user.id)
+    
     return {"message": "Đổi mật khẩu thành công"}
 
 # User list endpoint (accessible by all authenticated users for assignee dropdown)
@@ -71,8 +95,9 @@ def read_all_users(
     db: Session = Depends(get_db)
 ):
     """Lấy danh sách tất cả users (for assignee dropdown)"""
-    users = user_repository.get_multi(db, skip=skip, limit=limit)
-    return [UserResponse.from_orm(user) for user in users]
+    # Projection: chỉ các cột trả về, không load password_hash
+    users = user_repository.list_rows(db, skip=skip, limit=limit)
+    return list_response(user_list_adapter, users)
 
 # Admin-only endpoints
 
@@ -89,7 +114,7 @@ def read_user(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User không tồn tại"
         )
-    return UserResponse.from_orm(user)
+    return json_response(UserResponse.model_validate(user))
 
 @router.put("/{user_id}", response_model=UserResponse)
 def update_user(
@@ -99,7 +124,7 @@ def update_user(
     db: Session = Depends(get_db)
 ):
     """Cập nhật user bất kỳ (Admin only)"""
-    print(f"👤 Updating user {user_id} with data: {user_update.dict(exclude_unset=True)}")
+    print(f"👤 Updating user {user_id} with data: {user_update.model_dump(exclude_unset=True)}")
     
     user = user_repository.get(db, user_id)
     if not user:
@@ -119,9 +144,11 @@ def update_user(
                 detail="Email đã được sử dụng"
             )
     
+    changes = _user_changes(user, user_update.model_dump(exclude_unset=True))
     updated_user = user_repository.update(db, db_obj=user, obj_in=user_update)
+    _audit_user_update(db, admin_user, user_id, changes)
     print(f"✅ User updated - is_active: {updated_user.is_active}, role: {updated_user.role}")
-    return UserResponse.from_orm(updated_user)
+    return json_response(UserResponse.model_validate(updated_user))
 
 @router.delete("/{user_id}")
 def delete_user(
@@ -145,4 +172,5 @@ def delete_user(
         )
     
     user_repository.delete(db, id=user_id)
+    audit_log.record("user.deleted", "user", user_id, actor=admin_user, db=db, username=user.username)
     return {"message": f"Đã xóa user {user.username}"}
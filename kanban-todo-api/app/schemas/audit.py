@@ -0,0 +1,25 @@
+import json
+from pydantic import BaseModel, ConfigDict, TypeAdapter, field_validator
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+class AuditLogResponse(BaseModel):
+    id: int
+    actor_id: Optional[int] = None
+    action: str
+    target_type: str
+    target_id: Optional[int] = None
+    details: Optional[Dict[str, Any]] = None
+    created_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+    @field_validator('details', mode='before')
+    @classmethod
+    def details_from_json(cls, v):
+        # Cột details lưu JSON dạng text
+        if isinstance(v, str):
+            return json.loads(v)
+        return v
+
+audit_log_list_adapter = TypeAdapter(List[AuditLogResponse])
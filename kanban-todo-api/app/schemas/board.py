@@ -1,13 +1,14 @@
-from pydantic import BaseModel, validator
-from datetime import datetime
-from typing import Optional, List
+from pydantic import BaseModel, ConfigDict, TypeAdapter, field_validator
+from datetime import date, datetime
+from typing import Dict, Optional, List
 
 class BoardBase(BaseModel):
     name: str
     description: Optional[str] = None
     is_public: bool = False
 
-    @validator('name')
+    @field_validator('name')
+    @classmethod
     def name_must_not_be_empty(cls, v):
         if not v or len(v.strip()) == 0:
             raise ValueError('Tên board không được để trống')
@@ -15,7 +16,8 @@ class BoardBase(BaseModel):
             raise ValueError('Tên board không được quá 100 ký tự')
         return v.strip()
     
-    @validator('description')
+    @field_validator('description')
+    @classmethod
     def description_validator(cls, v):
         # Allow empty string and None for description
         if v is not None and v != '':
@@ -30,13 +32,15 @@ class BoardUpdate(BaseModel):
     description: Optional[str] = None
     is_public: Optional[bool] = None
 
-    @validator('name')
+    @field_validator('name')
+    @classmethod
     def name_validator(cls, v):
         if v is not None and (not v or len(v.strip()) == 0):
             raise ValueError('Tên board không được để trống')
         return v.strip() if v else v
     
-    @validator('description')
+    @field_validator('description')
+    @classmethod
     def description_validator(cls, v):
         # Allow empty string and None for description
         if v is not None and v != '':
@@ -47,16 +51,24 @@ class BoardResponse(BoardBase):
     id: int
     owner_id: int
     owner_name: Optional[str] = None  # Owner's full name or username
+    version: int  # Gửi lại qua If-Match khi cập nhật
     created_at: datetime
     updated_at: datetime
     tasks_count: Optional[int] = 0
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 class BoardWithTasks(BoardResponse):
     tasks: List['TaskResponse'] = []
 
+class BoardChanges(BaseModel):
+    """Delta sync: client xóa deleted_task_ids trước rồi upsert tasks theo id"""
+    board_id: int
+    sync_token: str  # Gửi lại qua ?since= ở lần sync sau
+    full: bool  # True: tasks là toàn bộ board, client thay thế dữ liệu cũ
+    tasks: List['TaskResponse'] = []
+    deleted_task_ids: List[int] = []
+
 
 # Try to resolve forward references (TaskResponse is defined in app.schemas.task)
 try:
@@ -64,7 +76,42 @@ try:
     from app.schemas.task import TaskResponse  # noqa: F401
     # Rebuild model to let Pydantic resolve the forward ref
     BoardWithTasks.model_rebuild()
+    BoardChanges.model_rebuild()
 except Exception:
     # If rebuild fails during import time, FastAPI/Pydantic will attempt resolution later.
     pass
 
+board_list_adapter = TypeAdapter(List[BoardResponse])
+
+class BoardStats(BaseModel):
+    """Thống kê tasks của một board cho dashboard"""
+    board_id: int
+    total: int = 0
+    by_status: Dict[str, int] = {}
+    by_priority: Dict[str, int] = {}
+    assigned: int = 0
+    unassigned: int = 0
+    overdue: int = 0  # due_date đã qua và chưa done
+
+board_stats_list_adapter = TypeAdapter(List[BoardStats])
+
+class DurationStats(BaseModel):
+    count: int
+    mean_hours: Optional[float] = None
+    p50_hours: Optional[float] = None
+    p85_hours: Optional[float] = None
+    p95_hours: Optional[float] = None
+
+class ThroughputPoint(BaseModel):
+    date: date
+    completed: int
+
+class BoardAnalytics(BaseModel):
+    """Lead time, cycle time và throughput của board (tính từ task_events)"""
+    board_id: int
+    days: int
+    completed: int
+    throughput_per_week: float
+    lead_time: DurationStats
+    cycle_time: DurationStats
+    throughput: List[ThroughputPoint]
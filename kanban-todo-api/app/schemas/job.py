@@ -0,0 +1,33 @@
+import json
+from pydantic import BaseModel, ConfigDict, field_validator
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+class JobAccepted(BaseModel):
+    """Response 202 của endpoint chạy bằng background job"""
+    job_id: str
+    status: str
+    status_url: str
+
+class JobResponse(BaseModel):
+    id: str
+    type: str
+    status: str  # queued, running, succeeded, failed
+    progress: float
+    attempts: int
+    max_attempts: int
+    error: Optional[str] = None
+    result: Optional[Dict[str, Any]] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+    @field_validator('result', mode='before')
+    @classmethod
+    def result_from_json(cls, v):
+        # Cột result lưu JSON dạng text
+        if isinstance(v, str):
+            return json.loads(v)
+        return v
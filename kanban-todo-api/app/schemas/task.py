@@ -1,6 +1,6 @@
-from pydantic import BaseModel, validator
-from datetime import datetime
-from typing import Optional
+from pydantic import BaseModel, ConfigDict, TypeAdapter, field_validator
+from datetime import datetime, timezone
+from typing import List, Optional
 from enum import Enum
 
 class StatusEnum(str, Enum):
@@ -13,13 +13,20 @@ class PriorityEnum(str, Enum):
     medium = "medium"
     high = "high"
 
+def naive_utc(v: Optional[datetime]) -> Optional[datetime]:
+    """Database lưu thời gian UTC không timezone (datetime.utcnow)"""
+    if v is not None and v.tzinfo is not None:
+        return v.astimezone(timezone.utc).replace(tzinfo=None)
+    return v
+
 class TaskBase(BaseModel):
     title: str
     description: Optional[str] = None
     priority: PriorityEnum = PriorityEnum.medium
     status: StatusEnum = StatusEnum.todo
 
-    @validator('title')
+    @field_validator('title')
+    @classmethod
     def title_must_not_be_empty(cls, v):
         if not v or len(v.strip()) == 0:
             raise ValueError('Tiêu đề task không được để trống')
@@ -30,6 +37,9 @@ class TaskBase(BaseModel):
 class TaskCreate(TaskBase):
     board_id: int
     assigned_to: Optional[int] = None
+    due_date: Optional[datetime] = None
+
+    _due_date_utc = field_validator('due_date')(naive_utc)
 
 class TaskUpdate(BaseModel):
     title: Optional[str] = None
@@ -37,8 +47,12 @@ class TaskUpdate(BaseModel):
     priority: Optional[PriorityEnum] = None
     status: Optional[StatusEnum] = None
     assigned_to: Optional[int] = None
+    due_date: Optional[datetime] = None  # Gửi null để xóa due date
+
+    _due_date_utc = field_validator('due_date')(naive_utc)
 
-    @validator('title')
+    @field_validator('title')
+    @classmethod
     def title_validator(cls, v):
         if v is not None and (not v or len(v.strip()) == 0):
             raise ValueError('Tiêu đề task không được để trống')
@@ -57,9 +71,11 @@ class TaskResponse(TaskBase):
     position: int
     assigned_to: Optional[int] = None
     due_date: Optional[datetime] = None
+    version: int  # Gửi lại qua If-Match khi cập nhật/di chuyển
     created_at: datetime
     updated_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
+# Validate/serialize cả list tasks trong một lần gọi vào pydantic-core
+task_list_adapter = TypeAdapter(List[TaskResponse])
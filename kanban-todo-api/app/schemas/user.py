@@ -1,13 +1,14 @@
-from pydantic import BaseModel, validator
+from pydantic import BaseModel, ConfigDict, TypeAdapter, field_validator
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
 class UserBase(BaseModel):
     username: str
     email: Optional[str] = None
     full_name: Optional[str] = None
 
-    @validator('username')
+    @field_validator('username')
+    @classmethod
     def username_validator(cls, v):
         if not v or len(v.strip()) < 3:
             raise ValueError('Username phải có ít nhất 3 ký tự')
@@ -21,13 +22,15 @@ class UserCreate(UserBase):
     role: Optional[str] = "user"  # Thêm role với default "user"
     is_active: Optional[bool] = True  # Mặc định user được tạo là active
 
-    @validator('password')
+    @field_validator('password')
+    @classmethod
     def password_validator(cls, v):
         if len(v) < 6:
             raise ValueError('Mật khẩu phải có ít nhất 6 ký tự')
         return v
     
-    @validator('role')
+    @field_validator('role')
+    @classmethod
     def role_validator(cls, v):
         if v not in ["user", "admin"]:
             raise ValueError('Role phải là "user" hoặc "admin"')
@@ -37,6 +40,9 @@ class UserLogin(BaseModel):
     username: str
     password: str
 
+class RefreshTokenRequest(BaseModel):
+    refresh_token: str
+
 class UserResponse(UserBase):
     id: int
     role: str  # Thêm role vào response
@@ -44,8 +50,9 @@ class UserResponse(UserBase):
     created_at: datetime
     updated_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
+
+user_list_adapter = TypeAdapter(List[UserResponse])
 
 class UserUpdate(BaseModel):
     email: Optional[str] = None
@@ -53,7 +60,8 @@ class UserUpdate(BaseModel):
     role: Optional[str] = None  # Chỉ admin mới được update role
     is_active: Optional[bool] = None  # Admin có thể activate/deactivate user
 
-    @validator('role')
+    @field_validator('role')
+    @classmethod
     def role_validator(cls, v):
         if v is not None and v not in ["user", "admin"]:
             raise ValueError('Role phải là "user" hoặc "admin"')
@@ -63,7 +71,8 @@ class PasswordChange(BaseModel):
     current_password: str
     new_password: str
 
-    @validator('new_password')
+    @field_validator('new_password')
+    @classmethod
     def new_password_validator(cls, v):
         if len(v) < 6:
             raise ValueError('Mật khẩu mới phải có ít nhất 6 ký tự')
@@ -75,6 +84,14 @@ class Token(BaseModel):
     expires_in: int
     user: UserResponse
 
+class TokenResponse(BaseModel):
+    access_token: str
+    refresh_token: str
+    token_type: str = "bearer"
+
+class LoginResponse(TokenResponse):
+    user: UserResponse
+
 class TokenPayload(BaseModel):
     user_id: Optional[int] = None
     username: Optional[str] = None
@@ -1,12 +1,61 @@
-from fastapi import FastAPI
+import math
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+from sqlalchemy.orm.exc import StaleDataError
 
-from app.routers import auth, users, boards, tasks  # Thêm auth router
-from app.database import create_tables
+from app.routers import auth, users, boards, tasks, audit, jobs  # Thêm auth router
+from app.database import create_tables, dispose_engines, engine, read_engine, shard_router, warm_up_pool
 from app.core.config import settings
+from app.core.hashing import PasswordHasherBusy
+from app.core.rate_limit import RateLimitExceeded
+from app.core.security import password_hasher
+from app.core.cache import response_cache
+from app.core.broadcast import board_events
+from app.core.invalidation import invalidation_bus
+from app.core.stats import board_stats_cache
+from app.core.audit import audit_log
+from app.core.jobs import job_runner
+from app.core.responses import FastJSONResponse
+from app.core.compression import CompressionMiddleware
 
-# Tạo tables khi khởi động (development only)
-create_tables()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Startup/shutdown. Import main không chạm database, mọi việc I/O nằm ở đây"""
+    # Tạo tables khi khởi động (development only), production chạy alembic trong build.sh
+    if settings.environment == "development":
+        await run_in_threadpool(create_tables)
+    
+    # Mở sẵn kết nối để request đầu tiên không phải chờ connect
+    if settings.database_pool_warmup > 0:
+        opened = await run_in_threadpool(warm_up_pool, settings.database_pool_warmup)
+        print(f"🔌 Database pool warmed up with {opened} connections")
+    
+    if settings.web_concurrency > 1:
+        # Backend "memory" chỉ thấy được worker hiện tại
+        per_worker = [
+            name for name, backend in (
+                ("INVALIDATION_BACKEND", settings.invalidation_backend),
+                ("BOARD_EVENTS_BACKEND", settings.board_events_backend),
+                ("LOGIN_RATE_LIMIT_BACKEND", settings.login_rate_limit_backend),
+            ) if backend == "memory"
+        ]
+        if per_worker:
+            print(f"⚠️  {settings.web_concurrency} workers nhưng {', '.join(per_worker)} đang là memory (không chia sẻ giữa các worker)")
+    invalidation_bus.start()
+    audit_log.start()
+    job_runner.start()
+    
+    yield
+    
+    job_runner.stop()
+    audit_log.stop()
+    invalidation_bus.stop()
+    board_events.backend.stop()
+    dispose_engines()
 
 # Tạo FastAPI app
 app = FastAPI(
@@ -14,7 +63,9 @@ app = FastAPI(
     version="1.0.0",
     description="Kanban TODO API với JWT Authentication",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=FastJSONResponse,
+    lifespan=lifespan
 )
 
 # CORS middleware
@@ -29,11 +80,50 @@ app.add_middleware(
 
 )
 
+# Nén response lớn (board detail nhiều tasks) theo Accept-Encoding
+if settings.compression_enabled:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.compression_minimum_size,
+        gzip_level=settings.compression_gzip_level,
+        brotli_quality=settings.compression_brotli_quality,
+        offload_size=settings.compression_offload_size,
+    )
+
+# Pool hash password đầy -> từ chối ngay thay vì xếp hàng
+@app.exception_handler(PasswordHasherBusy)
+async def password_hasher_busy_handler(request: Request, exc: PasswordHasherBusy):
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Hệ thống đang bận, vui lòng thử lại sau"},
+        headers={"Retry-After": "1"},
+    )
+
+# Login vượt rate limit
+@app.exception_handler(RateLimitExceeded)
+async def rate_limit_exceeded_handler(request: Request, exc: RateLimitExceeded):
+    return JSONResponse(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        content={"detail": "Quá nhiều lần đăng nhập, vui lòng thử lại sau"},
+        headers={"Retry-After": str(max(1, math.ceil(exc.retry_after)))},
+    )
+
+# Optimistic locking: row đã bị request khác cập nhật giữa lúc đọc và lúc ghi
+@app.exception_handler(StaleDataError)
+async def stale_data_handler(request: Request, exc: StaleDataError):
+    status_code = status.HTTP_412_PRECONDITION_FAILED if request.headers.get("if-match") else status.HTTP_409_CONFLICT
+    return JSONResponse(
+        status_code=status_code,
+        content={"detail": "Dữ liệu đã bị thay đổi bởi người khác, vui lòng tải lại"},
+    )
+
 # Include routers
 app.include_router(auth.router)  # Authentication routes
 app.include_router(users.router)
 app.include_router(boards.router)
 app.include_router(tasks.router)
+app.include_router(audit.router)
+app.include_router(jobs.router)
 
 @app.get("/")
 def read_root():
@@ -50,7 +140,8 @@ def read_root():
         "auth_endpoints": {
             "register": "/auth/register",
             "login": "/auth/login",
-            "refresh": "/auth/refresh"
+            "refresh": "/auth/refresh",
+            "logout": "/auth/logout"
         }
     }
 
@@ -60,5 +151,15 @@ def health_check():
         "status": "healthy",
         "service": settings.app_name,
         "authentication": "enabled",
-        "database": "connected"
+        "database": "connected",
+        "password_hashing": password_hasher.stats(),
+        "response_cache": response_cache.stats(),
+        "board_events": board_events.stats(),
+        "invalidation": invalidation_bus.stats(),
+        "board_stats_cache": board_stats_cache.stats(),
+        "audit_log": audit_log.stats(),
+        "jobs": job_runner.stats(),
+        "database_pool": engine.pool.status(),
+        "database_read_pool": read_engine.pool.status(),
+        "database_shards": shard_router.shard_ids
     }
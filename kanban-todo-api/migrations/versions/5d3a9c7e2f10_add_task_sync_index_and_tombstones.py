@@ -0,0 +1,38 @@
+"""Add (board_id, updated_at) task index and task_tombstones for delta sync
+
+Revision ID: 5d3a9c7e2f10
+Revises: 8e1f0b6c5d24
+Create Date: 2026-10-19 12:41:05.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d3a9c7e2f10'
+down_revision: Union[str, Sequence[str], None] = '8e1f0b6c5d24'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_tasks_board_id_updated_at', 'tasks', ['board_id', 'updated_at'], unique=False)
+    op.create_table('task_tombstones',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('board_id', sa.Integer(), nullable=False),
+        sa.Column('task_id', sa.Integer(), nullable=False),
+        sa.Column('deleted_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_task_tombstones_board_id_deleted_at', 'task_tombstones', ['board_id', 'deleted_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_task_tombstones_board_id_deleted_at', table_name='task_tombstones')
+    op.drop_table('task_tombstones')
+    op.drop_index('ix_tasks_board_id_updated_at', table_name='tasks')
@@ -0,0 +1,35 @@
+"""Add board revision and listing_versions for ETags
+
+Revision ID: 8e1f0b6c5d24
+Revises: 2c7d4e9a1b3f
+Create Date: 2026-10-19 10:03:17.542906
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e1f0b6c5d24'
+down_revision: Union[str, Sequence[str], None] = '2c7d4e9a1b3f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('boards', sa.Column('revision', sa.Integer(), server_default='1', nullable=False))
+    op.create_table('listing_versions',
+        sa.Column('scope', sa.String(length=50), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('scope')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('listing_versions')
+    with op.batch_alter_table('boards') as batch_op:
+        batch_op.drop_column('revision')
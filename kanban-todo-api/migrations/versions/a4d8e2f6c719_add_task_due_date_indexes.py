@@ -0,0 +1,29 @@
+"""Add due_date indexes on tasks
+
+Revision ID: a4d8e2f6c719
+Revises: f2b7c9d4e516
+Create Date: 2026-10-19 17:22:05.310447
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4d8e2f6c719'
+down_revision: Union[str, Sequence[str], None] = 'f2b7c9d4e516'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_tasks_board_id_due_date', 'tasks', ['board_id', 'due_date'], unique=False)
+    op.create_index('ix_tasks_assigned_to_due_date', 'tasks', ['assigned_to', 'due_date'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_tasks_assigned_to_due_date', table_name='tasks')
+    op.drop_index('ix_tasks_board_id_due_date', table_name='tasks')
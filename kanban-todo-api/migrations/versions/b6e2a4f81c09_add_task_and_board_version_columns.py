@@ -0,0 +1,32 @@
+"""Add version columns to tasks and boards for optimistic locking
+
+Revision ID: b6e2a4f81c09
+Revises: 5d3a9c7e2f10
+Create Date: 2026-10-19 14:02:37.541870
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6e2a4f81c09'
+down_revision: Union[str, Sequence[str], None] = '5d3a9c7e2f10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('tasks', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+    op.add_column('boards', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('boards') as batch_op:
+        batch_op.drop_column('version')
+    with op.batch_alter_table('tasks') as batch_op:
+        batch_op.drop_column('version')
@@ -0,0 +1,38 @@
+"""Add board_shards and id_allocations for sharding
+
+Revision ID: b7e3c1d9f420
+Revises: a4d8e2f6c719
+Create Date: 2026-10-19 18:05:41.127630
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e3c1d9f420'
+down_revision: Union[str, Sequence[str], None] = 'a4d8e2f6c719'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('board_shards',
+        sa.Column('board_id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('shard', sa.String(length=50), nullable=False),
+        sa.PrimaryKeyConstraint('board_id')
+    )
+    op.create_table('id_allocations',
+        sa.Column('name', sa.String(length=50), nullable=False),
+        sa.Column('next_id', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('id_allocations')
+    op.drop_table('board_shards')
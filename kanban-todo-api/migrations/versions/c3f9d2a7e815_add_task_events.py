@@ -0,0 +1,45 @@
+"""Add append-only task_events table
+
+Revision ID: c3f9d2a7e815
+Revises: b6e2a4f81c09
+Create Date: 2026-10-19 15:20:44.902113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3f9d2a7e815'
+down_revision: Union[str, Sequence[str], None] = 'b6e2a4f81c09'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Type statusenum đã được tạo cùng bảng tasks (Postgres)
+status_enum = postgresql.ENUM('todo', 'in_progress', 'done', name='statusenum', create_type=False)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('task_events',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('task_id', sa.Integer(), nullable=False),
+        sa.Column('board_id', sa.Integer(), nullable=False),
+        sa.Column('type', sa.String(length=20), nullable=False),
+        sa.Column('from_status', status_enum, nullable=True),
+        sa.Column('to_status', status_enum, nullable=True),
+        sa.Column('assigned_to', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_task_events_board_id_task_id', 'task_events', ['board_id', 'task_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_task_events_board_id_task_id', table_name='task_events')
+    op.drop_table('task_events')
@@ -0,0 +1,41 @@
+"""Add audit_log table
+
+Revision ID: e8a1f4c6b203
+Revises: c3f9d2a7e815
+Create Date: 2026-10-19 16:05:12.418736
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8a1f4c6b203'
+down_revision: Union[str, Sequence[str], None] = 'c3f9d2a7e815'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('audit_log',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('actor_id', sa.Integer(), nullable=True),
+        sa.Column('action', sa.String(length=50), nullable=False),
+        sa.Column('target_type', sa.String(length=20), nullable=False),
+        sa.Column('target_id', sa.Integer(), nullable=True),
+        sa.Column('details', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_audit_log_actor_id', 'audit_log', ['actor_id'], unique=False)
+    op.create_index('ix_audit_log_target', 'audit_log', ['target_type', 'target_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_audit_log_target', table_name='audit_log')
+    op.drop_index('ix_audit_log_actor_id', table_name='audit_log')
+    op.drop_table('audit_log')
@@ -0,0 +1,71 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import time
+from datetime import datetime
+
+from pydantic_core import to_json
+
+from app.database.models import Task, StatusEnum, PriorityEnum
+from app.schemas.task import TaskResponse, task_list_adapter
+from app.core.responses import list_response
+
+def build_tasks(tasks_count: int) -> list:
+    """ORM Task objects (transient, không cần database) giống kết quả query một board"""
+    now = datetime.utcnow()
+    statuses = list(StatusEnum)
+    priorities = list(PriorityEnum)
+    return [
+        Task(
+            id=i,
+            board_id=1,
+            title=f"Task {i}",
+            description="Mô tả task " * 10,
+            status=statuses[i % len(statuses)],
+            priority=priorities[i % len(priorities)],
+            position=i,
+            assigned_to=i % 7 or None,
+            version=1,
+            created_at=now,
+            updated_at=now,
+        )
+        for i in range(tasks_count)
+    ]
+
+def per_row_path(tasks: list) -> bytes:
+    """Vòng lặp Python: model_validate từng row rồi serialize list"""
+    return to_json([TaskResponse.model_validate(task) for task in tasks])
+
+def adapter_path(tasks: list) -> bytes:
+    """TypeAdapter(List[TaskResponse]): validate + dump cả list trong pydantic-core"""
+    return list_response(task_list_adapter, tasks).body
+
+def measure(func, tasks: list, repeat: int) -> float:
+    func(tasks)  # warm up
+    started_at = time.perf_counter()
+    for _ in range(repeat):
+        func(tasks)
+    return (time.perf_counter() - started_at) / repeat
+
+def main():
+    parser = argparse.ArgumentParser(description="Chi phí serialize mỗi row cho board nhiều tasks")
+    parser.add_argument("--tasks", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    print(f"{'tasks':>8} {'per-row loop (µs/row)':>22} {'TypeAdapter (µs/row)':>21} {'speedup':>9}")
+    for tasks_count in args.tasks:
+        tasks = build_tasks(tasks_count)
+        assert per_row_path(tasks) == adapter_path(tasks)
+
+        loop_seconds = measure(per_row_path, tasks, args.repeat)
+        adapter_seconds = measure(adapter_path, tasks, args.repeat)
+        print(
+            f"{tasks_count:>8} {loop_seconds / tasks_count * 1e6:>22.2f} "
+            f"{adapter_seconds / tasks_count * 1e6:>21.2f} {loop_seconds / adapter_seconds:>8.1f}x"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base, User, Board, Task, board_repository, task_repository
+from app.schemas.board import board_list_adapter
+from app.schemas.task import task_list_adapter
+from app.core.responses import dump_list
+
+def seed(session_factory, tasks_count: int, boards_count: int) -> int:
+    """Một board lớn + nhiều board nhỏ, insert bằng Core cho nhanh"""
+    now = datetime.utcnow()
+    with session_factory() as db:
+        db.execute(insert(User), [{
+            "id": 1, "username": "bench", "password_hash": "x", "full_name": "Benchmark User",
+            "role": "user", "is_active": True, "created_at": now, "updated_at": now,
+        }])
+        db.execute(insert(Board), [{
+            "id": board_id, "name": f"Board {board_id}", "description": "Mô tả board",
+            "is_public": board_id % 2 == 0, "owner_id": 1, "revision": 1,
+            "created_at": now, "updated_at": now,
+        } for board_id in range(1, boards_count + 1)])
+        db.execute(insert(Task), [{
+            "title": f"Task {i}", "description": "Mô tả task " * 80,  # ~900 ký tự
+            "status": ["todo", "in_progress", "done"][i % 3],
+            "priority": ["low", "medium", "high"][i % 3],
+            "position": i, "board_id": 1 if i < tasks_count else 2 + i % (boards_count - 1),
+            "created_at": now, "updated_at": now,
+        } for i in range(tasks_count + boards_count * 20)])
+        db.commit()
+    return 1
+
+def orm_tasks(db, board_id: int) -> bytes:
+    """Đường cũ: load ORM entities rồi serialize"""
+    tasks = db.query(Task).filter(Task.board_id == board_id).order_by(Task.position).all()
+    return dump_list(task_list_adapter, tasks)
+
+def projected_tasks(db, board_id: int) -> bytes:
+    return dump_list(task_list_adapter, task_repository.list_rows(db, board_id=board_id))
+
+def orm_boards(db, user_id: int) -> bytes:
+    """Đường cũ: load boards, với mỗi board load owner và toàn bộ tasks để đếm"""
+    boards = db.query(Board).filter((Board.owner_id == user_id) | (Board.is_public == True)).all()
+    rows = []
+    for board in boards[:100]:
+        tasks = db.query(Task).filter(Task.board_id == board.id).order_by(Task.position).all()
+        rows.append({
+            "id": board.id, "name": board.name, "description": board.description,
+            "is_public": board.is_public, "owner_id": board.owner_id,
+            "owner_name": board.owner.full_name or board.owner.username,
+            "version": board.version, "created_at": board.created_at, "updated_at": board.updated_at,
+            "tasks_count": len(tasks),
+        })
+    return board_list_adapter.dump_json(board_list_adapter.validate_python(rows))
+
+def projected_boards(db, user_id: int) -> bytes:
+    return dump_list(board_list_adapter, board_repository.list_rows(db, user_id=user_id, limit=100))
+
+def measure(session_factory, func, arg, repeat: int):
+    """Latency trung bình (ms) và peak memory (KB), mỗi lần chạy dùng session mới"""
+    with session_factory() as db:
+        expected = func(db, arg)  # warm up
+
+    started_at = time.perf_counter()
+    for _ in range(repeat):
+        with session_factory() as db:
+            func(db, arg)
+    latency_ms = (time.perf_counter() - started_at) / repeat * 1000
+
+    tracemalloc.start()
+    with session_factory() as db:
+        func(db, arg)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return expected, latency_ms, peak / 1024
+
+def main():
+    parser = argparse.ArgumentParser(description="So sánh ORM entities và column projections cho list views")
+    parser.add_argument("--tasks", type=int, default=10000, help="Số tasks trong board lớn")
+    parser.add_argument("--boards", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Database riêng cho benchmark, không đụng vào database của app
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'benchmark.db')}")
+        Base.metadata.create_all(engine)
+        session_factory = sessionmaker(bind=engine, autoflush=False)
+        board_id = seed(session_factory, args.tasks, args.boards)
+
+        print(f"{'view':<28} {'ORM (ms)':>10} {'projection (ms)':>16} {'ORM peak (KB)':>14} {'projection peak (KB)':>21}")
+        cases = [
+            (f"task list ({args.tasks} tasks)", orm_tasks, projected_tasks, board_id),
+            (f"board listing ({args.boards} boards)", orm_boards, projected_boards, 1),
+        ]
+        for name, old, new, arg in cases:
+            old_body, old_ms, old_kb = measure(session_factory, old, arg, args.repeat)
+            new_body, new_ms, new_kb = measure(session_factory, new, arg, args.repeat)
+            assert old_body == new_body, name
+            print(f"{name:<28} {old_ms:>10.1f} {new_ms:>16.1f} {old_kb:>14.0f} {new_kb:>21.0f}")
+        engine.dispose()
+
+if __name__ == "__main__":
+    main()
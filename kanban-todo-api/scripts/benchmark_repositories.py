@@ -0,0 +1,103 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, insert
+
+from app.database import Base, User, Board, Task, get_repositories
+from app.database.connection import session_for
+from app.database.memory import MemoryStore, MemoryBoardRepository, MemoryTaskRepository
+from app.database.models import StatusEnum, PriorityEnum
+
+STATUSES = list(StatusEnum)
+
+def rows(boards_count: int, tasks_per_board: int):
+    now = datetime.utcnow()
+    users = [{
+        "id": 1, "username": "bench", "password_hash": "x", "role": "user",
+        "is_active": True, "created_at": now, "updated_at": now,
+    }]
+    boards = [{
+        "id": b, "name": f"Board {b}", "is_public": b % 2 == 0, "owner_id": 1, "revision": 1, "version": 1,
+        "created_at": now, "updated_at": now,
+    } for b in range(1, boards_count + 1)]
+    tasks = [{
+        "id": (b - 1) * tasks_per_board + i, "title": f"Task {i}", "status": STATUSES[i % 3], "priority": "medium",
+        "position": i // 3, "board_id": b, "assigned_to": 1 if i % 5 == 0 else None,
+        "due_date": now + timedelta(hours=i - tasks_per_board // 2), "version": 1, "created_at": now, "updated_at": now,
+    } for b in range(1, boards_count + 1) for i in range(1, tasks_per_board + 1)]
+    return users, boards, tasks
+
+def operations(boards, tasks, boards_count: int, tasks_per_board: int):
+    """Các thao tác repository hay dùng trong routers, mỗi thao tác một lần gọi"""
+    now = datetime.utcnow()
+    return {
+        "list_rows(board)": lambda db, i: tasks.list_rows(db, board_id=i % boards_count + 1),
+        "get_by_status": lambda db, i: tasks.get_by_status(db, i % boards_count + 1, StatusEnum.done),
+        "count_by_board": lambda db, i: tasks.count_by_board(db, i % boards_count + 1, StatusEnum.todo),
+        "my assigned": lambda db, i: tasks.list_rows(db, assigned_to=1, limit=100),
+        "due_rows(user)": lambda db, i: tasks.due_rows(db, due_from=now, due_before=now + timedelta(days=1), user_id=1, limit=100),
+        "board list_rows": lambda db, i: boards.list_rows(db, user_id=1),
+        "move_task": lambda db, i: tasks.move_task(db, i % (boards_count * tasks_per_board) + 1, STATUSES[i % 3]),
+    }
+
+def measure(run, calls: int, session_factory=None) -> float:
+    """Latency trung bình (µs) mỗi lần gọi, mỗi lần gọi một session như một request"""
+    started_at = time.perf_counter()
+    for i in range(calls):
+        if session_factory is None:
+            run(None, i)
+        else:
+            with session_factory() as db:
+                run(db, i)
+                db.commit()
+    return (time.perf_counter() - started_at) / calls * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description="So sánh repository SQL (SQLite file) với backend trong memory")
+    parser.add_argument("--boards", type=int, default=50)
+    parser.add_argument("--tasks-per-board", type=int, default=200)
+    parser.add_argument("--calls", type=int, default=500, help="Số lần gọi mỗi thao tác")
+    args = parser.parse_args()
+
+    users, boards, tasks = rows(args.boards, args.tasks_per_board)
+    store = MemoryStore()
+    for row in users:
+        store.insert_user(row)
+    for row in boards:
+        store.insert_board(row)
+    for row in tasks:
+        store.insert_task({**row, "priority": PriorityEnum(row["priority"])})
+    memory_ops = operations(MemoryBoardRepository(store), MemoryTaskRepository(store), args.boards, args.tasks_per_board)
+
+    sql = get_repositories("sql")
+    sql_ops = operations(sql.boards, sql.tasks, args.boards, args.tasks_per_board)
+
+    print(f"{args.boards} boards x {args.tasks_per_board} tasks, {args.calls} calls")
+    print(f"{'operation':<18} {'sql (µs)':>10} {'memory (µs)':>12} {'speedup':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        # Database riêng cho benchmark, không đụng vào database của app
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'benchmark.db')}")
+        Base.metadata.create_all(engine)
+        with engine.begin() as conn:
+            conn.execute(insert(User), users)
+            conn.execute(insert(Board), boards)
+            conn.execute(insert(Task), tasks)
+
+        def session_factory():
+            return session_for(engine)
+
+        for name in sql_ops:
+            measure(sql_ops[name], min(50, args.calls), session_factory)  # warm up
+            sql_us = measure(sql_ops[name], args.calls, session_factory)
+            memory_us = measure(memory_ops[name], args.calls)
+            print(f"{name:<18} {sql_us:>10.1f} {memory_us:>12.1f} {sql_us / memory_us:>7.1f}x")
+        engine.dispose()
+
+if __name__ == "__main__":
+    main()
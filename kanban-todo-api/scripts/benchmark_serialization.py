@@ -0,0 +1,77 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import asyncio
+import json
+import time
+from datetime import datetime
+
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app.schemas.board import BoardWithTasks
+from app.schemas.task import TaskResponse
+from app.core.responses import FastJSONResponse
+
+def build_board(tasks_count: int) -> BoardWithTasks:
+    """Board lớn giống response của GET /boards/{id}"""
+    now = datetime.utcnow()
+    tasks = [
+        TaskResponse(
+            id=i,
+            board_id=1,
+            title=f"Task {i}",
+            description="Mô tả task " * 10,
+            priority=["low", "medium", "high"][i % 3],
+            status=["todo", "in_progress", "done"][i % 3],
+            position=i,
+            assigned_to=i % 7 or None,
+            version=1,
+            created_at=now,
+            updated_at=now,
+        )
+        for i in range(tasks_count)
+    ]
+    board = BoardWithTasks(
+        id=1, name="Benchmark board", owner_id=1, version=1, created_at=now, updated_at=now
+    )
+    board.tasks = tasks
+    return board
+
+def response_model_path(field, board: BoardWithTasks) -> bytes:
+    """Đường cũ: validate lại theo response_model, jsonable_encoder, json.dumps"""
+    content = asyncio.run(serialize_response(field=field, response_content=board, is_coroutine=False))
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+def fast_path(board: BoardWithTasks) -> bytes:
+    """Đường mới: route trả FastJSONResponse, pydantic-core serialize thẳng model"""
+    return FastJSONResponse(board).body
+
+def measure(func, repeat: int) -> float:
+    func()  # warm up
+    started_at = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - started_at) / repeat * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description="So sánh CPU serialize response board lớn")
+    parser.add_argument("--tasks", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    field = create_response_field(name="response", type_=BoardWithTasks)
+    print(f"{'tasks':>8} {'response_model (ms)':>20} {'fast path (ms)':>16} {'speedup':>9} {'bytes':>10}")
+    for tasks_count in args.tasks:
+        board = build_board(tasks_count)
+        # Hai đường phải cho ra cùng một JSON
+        assert json.loads(response_model_path(field, board)) == json.loads(fast_path(board))
+
+        old_ms = measure(lambda: response_model_path(field, board), args.repeat)
+        new_ms = measure(lambda: fast_path(board), args.repeat)
+        print(f"{tasks_count:>8} {old_ms:>20.2f} {new_ms:>16.2f} {old_ms / new_ms:>8.1f}x {len(fast_path(board)):>10}")
+
+if __name__ == "__main__":
+    main()
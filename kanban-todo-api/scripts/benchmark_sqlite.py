@@ -0,0 +1,127 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import random
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+from sqlalchemy import insert
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm.exc import StaleDataError
+
+from app.core.config import settings
+from app.database import Base, User, Board, Task, task_repository
+from app.database.connection import ReadWriteSession, create_database_engine
+from app.database.models import StatusEnum
+
+STATUSES = list(StatusEnum)
+
+def seed(engine, boards_count: int, tasks_per_board: int) -> None:
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        conn.execute(insert(User), [{
+            "id": 1, "username": "bench", "password_hash": "x", "role": "user",
+            "is_active": True, "created_at": now, "updated_at": now,
+        }])
+        conn.execute(insert(Board), [{
+            "id": b, "name": f"Board {b}", "is_public": False, "owner_id": 1, "revision": 1,
+            "created_at": now, "updated_at": now,
+        } for b in range(1, boards_count + 1)])
+        conn.execute(insert(Task), [{
+            "id": (b - 1) * tasks_per_board + i, "title": f"Task {i}", "status": "todo", "priority": "medium",
+            "position": i, "board_id": b, "created_at": now, "updated_at": now,
+        } for b in range(1, boards_count + 1) for i in range(1, tasks_per_board + 1)])
+
+def sessions(mode: str, url: str):
+    """baseline: engine như trước (mặc định pysqlite), tuned: PRAGMA + một kết nối ghi + pool đọc"""
+    if mode == "baseline":
+        settings.sqlite_tuned = False
+        engine = create_database_engine(url)
+        settings.sqlite_tuned = True
+        return sessionmaker(bind=engine), [engine]
+    writer = create_database_engine(url, pool_size=1, role="writer")
+    reader = create_database_engine(url, pool_size=settings.sqlite_reader_pool_size, role="reader")
+    return sessionmaker(class_=ReadWriteSession, bind=writer, read_bind=reader), [writer, reader]
+
+def run(session_factory, threads: int, seconds: float, write_ratio: float, boards_count: int, tasks_count: int):
+    """Mỗi thread lặp: đọc task list của một board hoặc move một task (một transaction mỗi thao tác)"""
+    latencies = {"read": [], "write": []}
+    errors = {"locked": 0, "conflicts": 0}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def worker(seed_value: int):
+        rng = random.Random(seed_value)
+        local = {"read": [], "write": []}
+        local_errors = {"locked": 0, "conflicts": 0}
+        while time.perf_counter() < deadline:
+            kind = "write" if rng.random() < write_ratio else "read"
+            started_at = time.perf_counter()
+            try:
+                with session_factory() as db:
+                    if kind == "write":
+                        task_repository.move_task(db, rng.randint(1, tasks_count), rng.choice(STATUSES), rng.randint(0, 50))
+                        db.commit()
+                    else:
+                        task_repository.list_rows(db, board_id=rng.randint(1, boards_count))
+            except OperationalError:
+                # "database is locked"
+                local_errors["locked"] += 1
+                continue
+            except StaleDataError:
+                # Hai thread move cùng task (API trả về 409)
+                local_errors["conflicts"] += 1
+                continue
+            local[kind].append(time.perf_counter() - started_at)
+        with lock:
+            for key in latencies:
+                latencies[key].extend(local[key])
+            for key in errors:
+                errors[key] += local_errors[key]
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return latencies, errors
+
+def main():
+    parser = argparse.ArgumentParser(description="Throughput đọc/ghi xen kẽ của SQLite: cấu hình cũ và chế độ tuned")
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=5.0, help="Thời gian chạy mỗi chế độ")
+    parser.add_argument("--write-ratio", type=float, nargs="+", default=[0.1, 0.5])
+    parser.add_argument("--boards", type=int, default=20)
+    parser.add_argument("--tasks-per-board", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{args.threads} threads, {args.seconds:.0f}s mỗi chế độ, {args.boards} boards x {args.tasks_per_board} tasks")
+    print(f"{'writes':>6} {'mode':>9} {'ops/s':>8} {'reads/s':>8} {'writes/s':>9} {'read p95':>9} {'write p95':>10} {'locked':>7} {'409':>5}")
+    for write_ratio in args.write_ratio:
+        for mode in ("baseline", "tuned"):
+            with tempfile.TemporaryDirectory() as tmp:
+                # Database riêng cho benchmark, không đụng vào database của app
+                url = f"sqlite:///{os.path.join(tmp, 'benchmark.db')}"
+                session_factory, engines = sessions(mode, url)
+                Base.metadata.create_all(engines[0])
+                seed(engines[0], args.boards, args.tasks_per_board)
+                latencies, errors = run(
+                    session_factory, args.threads, args.seconds, write_ratio,
+                    args.boards, args.boards * args.tasks_per_board,
+                )
+                for engine in engines:
+                    engine.dispose()
+            reads, writes = len(latencies["read"]), len(latencies["write"])
+            read_p95 = np.percentile(latencies["read"], 95) * 1000 if reads else float("nan")
+            write_p95 = np.percentile(latencies["write"], 95) * 1000 if writes else float("nan")
+            print(f"{write_ratio:>6.0%} {mode:>9} {(reads + writes) / args.seconds:>8.0f} {reads / args.seconds:>8.0f} "
+                  f"{writes / args.seconds:>9.0f} {read_p95:>7.1f}ms {write_p95:>8.1f}ms {errors['locked']:>7} {errors['conflicts']:>5}")
+
+if __name__ == "__main__":
+    main()
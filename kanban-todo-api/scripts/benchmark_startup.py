@@ -0,0 +1,71 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import statistics
+import subprocess
+import tempfile
+import time
+import urllib.request
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_SNIPPET = """
+import time
+started_at = time.perf_counter()
+import main
+print(time.perf_counter() - started_at)
+"""
+
+def app_env(database_path: str, environment: str) -> dict:
+    env = dict(os.environ)
+    env.setdefault("SECRET_KEY", "benchmark-secret")
+    env.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "30")
+    env["DATABASE_URL"] = f"sqlite:///{database_path}"
+    env["ENVIRONMENT"] = environment
+    return env
+
+def measure_import(env: dict) -> float:
+    """Thời gian `import main` (ms) trong một process Python mới"""
+    output = subprocess.check_output([sys.executable, "-c", IMPORT_SNIPPET], cwd=PROJECT_DIR, env=env)
+    return float(output.decode().strip().splitlines()[-1]) * 1000
+
+def measure_first_response(env: dict, port: int, timeout: float = 30) -> float:
+    """Từ lúc spawn uvicorn tới khi GET /health trả 200 (ms)"""
+    started_at = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=PROJECT_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - started_at < timeout:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1) as response:
+                    if response.status == 200:
+                        return (time.perf_counter() - started_at) * 1000
+            except OSError:
+                time.sleep(0.005)
+        raise RuntimeError("Server không phản hồi trong thời gian cho phép")
+    finally:
+        process.terminate()
+        process.wait()
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold start: thời gian import main và time-to-first-response")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--port", type=int, default=8799)
+    parser.add_argument("--environment", nargs="+", default=["development", "production"])
+    args = parser.parse_args()
+
+    print(f"{'environment':<14} {'import main (ms)':>17} {'first response (ms)':>20}")
+    for environment in args.environment:
+        with tempfile.TemporaryDirectory() as tmp:
+            # Database riêng cho benchmark, development tạo tables khi startup
+            env = app_env(os.path.join(tmp, "benchmark.db"), environment)
+            imports = [measure_import(env) for _ in range(args.runs)]
+            first_responses = [measure_first_response(env, args.port) for _ in range(args.runs)]
+        print(f"{environment:<14} {statistics.median(imports):>17.0f} {statistics.median(first_responses):>20.0f}")
+
+if __name__ == "__main__":
+    main()
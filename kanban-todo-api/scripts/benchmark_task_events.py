@@ -0,0 +1,98 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+from sqlalchemy import create_engine, insert
+
+from app.core.config import settings
+from app.core.analytics import CREATED, MOVED, flow_metrics
+from app.database import Base, User, Board, Task, task_repository
+from app.database.connection import session_for
+from app.database.models import StatusEnum
+
+def seed(engine, tasks_count: int) -> None:
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        conn.execute(insert(User), [{
+            "id": 1, "username": "bench", "password_hash": "x", "role": "user",
+            "is_active": True, "created_at": now, "updated_at": now,
+        }])
+        conn.execute(insert(Board), [{
+            "id": 1, "name": "Board", "is_public": False, "owner_id": 1, "revision": 1,
+            "created_at": now, "updated_at": now,
+        }])
+        conn.execute(insert(Task), [{
+            "id": i, "title": f"Task {i}", "status": "todo", "priority": "medium", "position": i,
+            "board_id": 1, "created_at": now, "updated_at": now,
+        } for i in range(1, tasks_count + 1)])
+
+def measure_moves(engine, tasks_count: int, enabled: bool, round_index: int) -> float:
+    """Latency trung bình (µs) của move_task (một commit mỗi lần) khi bật/tắt task_events"""
+    settings.task_events_enabled = enabled
+    statuses = [StatusEnum.in_progress, StatusEnum.done, StatusEnum.todo]
+    started_at = time.perf_counter()
+    for i in range(1, tasks_count + 1):
+        with session_for(engine) as db:
+            task_repository.move_task(db, i, statuses[(i + round_index) % 3], i)
+            db.commit()
+    return (time.perf_counter() - started_at) / tasks_count * 1e6
+
+def synthetic_events(tasks_count: int, rng: np.random.Generator):
+    """Mỗi task: created -> in_progress -> done (vài task dừng giữa chừng), ~3 events/task"""
+    now = time.time()
+    created = now - rng.uniform(0, 90 * 86400, tasks_count)
+    started = created + rng.exponential(2 * 86400, tasks_count)
+    done = started + rng.exponential(3 * 86400, tasks_count)
+    finished = done < now
+
+    task_ids = np.repeat(np.arange(tasks_count), 3)
+    types = np.tile(np.array([CREATED, MOVED, MOVED], dtype=np.int8), tasks_count)
+    statuses = np.tile(np.array([0, 1, 2], dtype=np.int8), tasks_count)
+    timestamps = np.column_stack([created, started, done]).ravel()
+    keep = np.column_stack([np.ones(tasks_count, bool), started < now, finished]).ravel()
+    return task_ids[keep], types[keep], statuses[keep], timestamps[keep]
+
+def main():
+    parser = argparse.ArgumentParser(description="Chi phí ghi task_events và thời gian tính flow analytics")
+    parser.add_argument("--moves", type=int, default=1000, help="Số lần move_task mỗi vòng")
+    parser.add_argument("--rounds", type=int, default=5, help="Số vòng cho mỗi chế độ")
+    parser.add_argument("--tasks", type=int, nargs="+", default=[100_000, 1_000_000], help="Số task cho analytics")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Database riêng cho benchmark, không đụng vào database của app
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'benchmark.db')}")
+        Base.metadata.create_all(engine)
+        seed(engine, args.moves)
+        measure_moves(engine, min(200, args.moves), True, 0)  # warm up
+        # Chạy xen kẽ hai chế độ, lấy median để giảm nhiễu của fsync
+        results = {False: [], True: []}
+        for round_index in range(1, 2 * args.rounds + 1):
+            enabled = round_index % 2 == 0
+            results[enabled].append(measure_moves(engine, args.moves, enabled, round_index))
+        without_events, with_events = float(np.median(results[False])), float(np.median(results[True]))
+        settings.task_events_enabled = True
+        engine.dispose()
+    print(f"move_task: {without_events:.0f} µs không ghi events, {with_events:.0f} µs có ghi events "
+          f"({(with_events / without_events - 1) * 100:+.1f}%)")
+
+    rng = np.random.default_rng(42)
+    window_start = time.time() - 30 * 86400
+    print(f"{'tasks':>10} {'events':>10} {'flow_metrics (ms)':>18}")
+    for tasks_count in args.tasks:
+        events = synthetic_events(tasks_count, rng)
+        flow_metrics(events, window_start, 30)  # warm up
+        started_at = time.perf_counter()
+        metrics = flow_metrics(events, window_start, 30)
+        elapsed_ms = (time.perf_counter() - started_at) * 1000
+        assert metrics["lead_time"].count > 0
+        print(f"{tasks_count:>10} {events[0].size:>10} {elapsed_ms:>18.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+from sqlalchemy import event, insert
+
+from app.database import Base, User, Board, Task, board_version, task_repository
+from app.database.connection import create_database_engine, session_for
+from app.database.models import StatusEnum
+from app.schemas.task import TaskResponse
+
+STATUSES = list(StatusEnum)
+
+def seed(engine, boards_count: int, tasks_per_board: int) -> None:
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        conn.execute(insert(User), [{
+            "id": u, "username": f"bench{u}", "password_hash": "x", "role": "user",
+            "is_active": True, "created_at": now, "updated_at": now,
+        } for u in (1, 2)])
+        conn.execute(insert(Board), [{
+            "id": b, "name": f"Board {b}", "is_public": False, "owner_id": 1, "revision": 1,
+            "created_at": now, "updated_at": now,
+        } for b in range(1, boards_count + 1)])
+        conn.execute(insert(Task), [{
+            "id": (b - 1) * tasks_per_board + i, "title": f"Task {i}", "status": "todo", "priority": "medium",
+            "position": i, "board_id": b, "created_at": now, "updated_at": now,
+        } for b in range(1, boards_count + 1) for i in range(1, tasks_per_board + 1)])
+
+def operations(boards_count: int, tasks_count: int):
+    """
+    Repository calls của POST /tasks, PUT /tasks/{id}, PATCH move và PATCH assign.
+    Mỗi thao tác trả về (task, board): board được load trước như permission check của routers
+    """
+    def require_task(db, i):
+        task = task_repository.get(db, i % tasks_count + 1)
+        return task, db.get(Board, task.board_id)
+
+    def create(db, i):
+        board = db.get(Board, i % boards_count + 1)
+        position = task_repository.count_by_board(db, board.id, StatusEnum.todo)
+        return task_repository.create(db, obj_in={"title": f"New {i}", "board_id": board.id, "position": position}), board
+
+    def update(db, i):
+        task, board = require_task(db, i)
+        return task_repository.update(db, db_obj=task, obj_in={"title": f"Task {i}"}), board
+
+    def move(db, i):
+        task, board = require_task(db, i)
+        return task_repository.move_task(db, task.id, STATUSES[i % 3], i % 50), board
+
+    def assign(db, i):
+        task, board = require_task(db, i)
+        return task_repository.update(db, db_obj=task, obj_in={"assigned_to": i % 2 + 1}), board
+
+    return {"create": create, "update": update, "move": move, "assign": assign}
+
+def measure(engine, run, refresh: bool, calls: int):
+    """
+    Mỗi lần gọi như một request: ghi, dựng TaskResponse và ETag của board
+    (revision mới), commit. refresh: SELECT lại task sau khi ghi như trước
+    """
+    statements = [0]
+
+    def on_execute(*args):
+        statements[0] += 1
+
+    event.listen(engine, "before_cursor_execute", on_execute)
+    latencies = []
+    for i in range(calls):
+        started_at = time.perf_counter()
+        with session_for(engine) as db:
+            task, board = run(db, i)
+            if refresh:
+                db.refresh(task)
+            TaskResponse.model_validate(task)
+            board_version(board)
+            db.commit()
+        latencies.append(time.perf_counter() - started_at)
+    event.remove(engine, "before_cursor_execute", on_execute)
+    return statements[0] / calls, np.array(latencies) * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description="Latency ghi task: SELECT lại sau khi ghi và UPDATE ... RETURNING")
+    parser.add_argument("--boards", type=int, default=20)
+    parser.add_argument("--tasks-per-board", type=int, default=100)
+    parser.add_argument("--calls", type=int, default=1000, help="Số request mỗi thao tác")
+    args = parser.parse_args()
+
+    print(f"{args.boards} boards x {args.tasks_per_board} tasks, {args.calls} calls")
+    print(f"{'operation':<10} {'mode':>10} {'statements':>11} {'mean':>9} {'p95':>9}")
+    for name, run in operations(args.boards, args.boards * args.tasks_per_board).items():
+        for mode in ("refresh", "returning"):
+            with tempfile.TemporaryDirectory() as tmp:
+                # Database riêng cho benchmark, không đụng vào database của app
+                engine = create_database_engine(f"sqlite:///{os.path.join(tmp, 'benchmark.db')}")
+                if mode == "refresh":
+                    # Đường cũ: revision được expire rồi SELECT lại khi đọc
+                    engine.dialect.update_returning = False
+                Base.metadata.create_all(engine)
+                seed(engine, args.boards, args.tasks_per_board)
+                measure(engine, run, mode == "refresh", min(100, args.calls))  # warm up
+                statements, latencies = measure(engine, run, mode == "refresh", args.calls)
+                engine.dispose()
+            print(f"{name:<10} {mode:>10} {statements:>11.1f} {latencies.mean():>7.0f}µs {np.percentile(latencies, 95):>7.0f}µs")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import tempfile
+import time
+from datetime import datetime
+
+from sqlalchemy import event, insert
+
+from app.database import Base, User, Board, Task, task_repository, user_repository, refresh_token_repository
+from app.database.connection import create_database_engine, session_for
+from app.database.models import StatusEnum
+
+STATUSES = list(StatusEnum)
+
+def seed(engine, tasks_count: int) -> None:
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        conn.execute(insert(User), [{
+            "id": 1, "username": "bench", "password_hash": "x", "role": "user",
+            "is_active": True, "created_at": now, "updated_at": now,
+        }])
+        conn.execute(insert(Board), [{
+            "id": 1, "name": "Board", "is_public": False, "owner_id": 1, "revision": 1,
+            "created_at": now, "updated_at": now,
+        }])
+        conn.execute(insert(Task), [{
+            "id": i, "title": f"Task {i}", "status": "todo", "priority": "medium", "position": i,
+            "board_id": 1, "created_at": now, "updated_at": now,
+        } for i in range(1, tasks_count + 1)])
+
+def endpoints(tasks_count: int):
+    """Các thao tác ghi của write endpoints (repository calls giống routers)"""
+    def create_task(db, i):
+        position = task_repository.count_by_board(db, 1, StatusEnum.todo)
+        yield task_repository.create(db, obj_in={"title": f"New {i}", "board_id": 1, "position": position})
+
+    def update_task(db, i):
+        yield task_repository.update(db, db_obj=task_repository.get(db, i % tasks_count + 1), obj_in={"title": f"Task {i}"})
+
+    def move_task(db, i):
+        yield task_repository.move_task(db, i % tasks_count + 1, STATUSES[i % 3], i % 50)
+
+    def change_password(db, i):
+        user = user_repository.get(db, 1)
+        yield user_repository.set_password_hash(db, user, f"hash-{i}")
+        yield refresh_token_repository.revoke_all_for_user(db, user.id)
+
+    def login(db, i):
+        yield refresh_token_repository.issue(db, 1)
+
+    return {
+        "POST /tasks": create_task,
+        "PUT /tasks/{id}": update_task,
+        "PATCH move": move_task,
+        "PATCH password": change_password,
+        "POST login": login,
+    }
+
+def per_call(db, calls) -> None:
+    """Cách cũ: mỗi repository call commit rồi refresh object"""
+    for result in calls:
+        db.commit()
+        if isinstance(result, Base):
+            db.refresh(result)
+
+def unit_of_work(db, calls) -> None:
+    """Repository chỉ flush, request commit một lần"""
+    for _ in calls:
+        pass
+    db.commit()
+
+def measure(engine, run, mode, calls: int):
+    """(round trips mỗi request, commits mỗi request, latency trung bình µs)"""
+    counts = {"statements": 0, "commits": 0}
+
+    def on_execute(*args):
+        counts["statements"] += 1
+
+    def on_commit(conn):
+        counts["commits"] += 1
+
+    event.listen(engine, "before_cursor_execute", on_execute)
+    event.listen(engine, "commit", on_commit)
+    started_at = time.perf_counter()
+    for i in range(calls):
+        with session_for(engine) as db:
+            mode(db, run(db, i))
+    elapsed = time.perf_counter() - started_at
+    event.remove(engine, "before_cursor_execute", on_execute)
+    event.remove(engine, "commit", on_commit)
+    # Mỗi COMMIT cũng là một round trip tới database
+    return (counts["statements"] + counts["commits"]) / calls, counts["commits"] / calls, elapsed / calls * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description="Round trips của write endpoints: commit mỗi repository call và unit of work")
+    parser.add_argument("--tasks", type=int, default=500)
+    parser.add_argument("--calls", type=int, default=500, help="Số request mỗi endpoint")
+    args = parser.parse_args()
+
+    print(f"{args.calls} requests mỗi endpoint")
+    print(f"{'endpoint':<16} {'mode':>13} {'round trips':>12} {'commits':>8} {'latency':>10}")
+    for name, run in endpoints(args.tasks).items():
+        for label, mode in (("per call", per_call), ("unit of work", unit_of_work)):
+            with tempfile.TemporaryDirectory() as tmp:
+                # Database riêng cho benchmark, không đụng vào database của app
+                engine = create_database_engine(f"sqlite:///{os.path.join(tmp, 'benchmark.db')}")
+                Base.metadata.create_all(engine)
+                seed(engine, args.tasks)
+                round_trips, commits, latency_us = measure(engine, run, mode, args.calls)
+                engine.dispose()
+            print(f"{name:<16} {label:>13} {round_trips:>12.1f} {commits:>8.1f} {latency_us:>8.0f}µs")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+import sys
+import os
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from datetime import datetime, timedelta
+
+from app.core.config import settings
+from app.database import SessionLocal, task_repository
+
+def prune_sync_tombstones():
+    """Xóa tombstones cũ hơn thời gian giữ lại (chạy định kỳ, ví dụ cron hằng ngày)"""
+    older_than = datetime.utcnow() - timedelta(days=settings.sync_tombstone_retention_days)
+    db = SessionLocal()
+
+    try:
+        count = task_repository.prune_tombstones(db, older_than)
+        db.commit()
+        print(f"🧹 Deleted {count} tombstones older than {older_than.isoformat()}")
+
+    except Exception as e:
+        print(f"Error pruning tombstones: {e}")
+        raise
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    prune_sync_tombstones()
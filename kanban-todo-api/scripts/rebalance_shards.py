@@ -0,0 +1,64 @@
+import sys
+import os
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+
+from app.core.config import settings
+from app.database import shard_router
+from app.database.connection import create_tables
+
+def rebalance_shards(dry_run: bool, board_id: int = None, target: str = None, grace_seconds: float = 0.0):
+    """
+    Chuyển board về shard theo hash (hoặc chuyển một board sang shard chỉ định)
+    và ghi lại directory cho board chưa có trong board_shards.
+    Nên chạy lúc ít ghi: board bị sửa trong lúc copy sẽ được bỏ qua, chạy lại sau.
+    """
+    if not shard_router.enabled:
+        print("ℹ️  Sharding chưa bật (DATABASE_SHARDS rỗng), không có gì để làm")
+        return
+    if target is not None and target not in shard_router.shards:
+        raise SystemExit(f"Shard không tồn tại: {target} (có: {', '.join(shard_router.shard_ids)})")
+
+    create_tables()
+    moved = skipped = failed = 0
+    for current_board_id, source in list(shard_router.board_locations()):
+        if board_id is not None and current_board_id != board_id:
+            continue
+        wanted = target or shard_router.hash_shard(current_board_id)
+        if wanted == source:
+            # Board đã đúng shard: đảm bảo directory khớp (board tạo trước khi bật sharding)
+            if not dry_run:
+                with shard_router.directory.begin() as conn:
+                    shard_router.set_board_shard(conn, current_board_id, source)
+            skipped += 1
+            continue
+        print(f"{'🔎' if dry_run else '🚚'} Board {current_board_id}: {source} -> {wanted}")
+        if dry_run:
+            moved += 1
+            continue
+        try:
+            counts = shard_router.move_board(current_board_id, source, wanted, grace_seconds)
+            print(f"   ✅ {counts}")
+            moved += 1
+        except Exception as e:
+            print(f"   ⚠️  {e}")
+            failed += 1
+
+    print(f"{'Would move' if dry_run else 'Moved'} {moved} boards, {skipped} already in place, {failed} failed")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Chuyển boards giữa các shard (DATABASE_SHARDS)")
+    parser.add_argument("--dry-run", action="store_true", help="Chỉ in các board sẽ được chuyển")
+    parser.add_argument("--board", type=int, help="Chỉ xử lý board này")
+    parser.add_argument("--to", dest="target", help="Shard đích (mặc định: shard theo hash)")
+    parser.add_argument(
+        "--grace",
+        type=float,
+        default=settings.shard_directory_cache_seconds,
+        help="Giữ bản cũ thêm bao nhiêu giây (process khác còn cache shard cũ)",
+    )
+    args = parser.parse_args()
+    rebalance_shards(args.dry_run, args.board, args.target, args.grace)
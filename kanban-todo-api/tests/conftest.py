@@ -0,0 +1,113 @@
+import itertools
+import os
+import subprocess
+import sys
+import tempfile
+import textwrap
+
+# Settings đọc từ environment lúc import app: database riêng cho test, bcrypt cost thấp
+_tmp_dir = tempfile.mkdtemp(prefix="kanban-tests-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_tmp_dir, 'test.db')}")
+os.environ.setdefault("SECRET_KEY", "test-secret")
+os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "30")
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+os.environ.setdefault("DATABASE_POOL_WARMUP", "0")
+os.environ.setdefault("LOGIN_IP_BURST", "100000")  # Mọi request của TestClient cùng một IP
+os.environ.setdefault("LOGIN_IP_PER_MINUTE", "100000")
+os.environ.setdefault("AUDIT_FLUSH_INTERVAL_MS", "50")
+os.environ.setdefault("JOB_POLL_INTERVAL", "0.05")
+os.environ.setdefault("JOB_RETRY_BACKOFF_SECONDS", "0.01")
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from app.database import SessionLocal
+
+_usernames = itertools.count(1)
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope="session")
+def client():
+    with TestClient(main.app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def make_user(client):
+    """Đăng ký user mới (username không trùng giữa các test), trả về (user, headers, tokens)"""
+    def create(role: str = "user", password: str = "secret123"):
+        username = f"user{next(_usernames)}"
+        response = client.post("/auth/register", json={"username": username, "password": password, "role": role})
+        assert response.status_code == 201, response.text
+        login = client.post("/auth/login-json", json={"username": username, "password": password})
+        assert login.status_code == 200, login.text
+        tokens = login.json()
+        headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+        return response.json(), headers, tokens
+    return create
+
+
+@pytest.fixture
+def user(make_user):
+    return make_user()
+
+
+@pytest.fixture
+def headers(user):
+    return user[1]
+
+
+@pytest.fixture
+def admin_headers(make_user):
+    return make_user(role="admin")[1]
+
+
+@pytest.fixture
+def board(client, headers):
+    response = client.post("/boards/", json={"name": "Board", "is_public": True}, headers=headers)
+    assert response.status_code == 201, response.text
+    return response.json()
+
+
+@pytest.fixture
+def make_task(client, headers, board):
+    def create(**fields):
+        payload = {"title": "Task", "board_id": board["id"], **fields}
+        response = client.post("/tasks/", json=payload, headers=headers)
+        assert response.status_code == 201, response.text
+        return response.json()
+    return create
+
+
+@pytest.fixture
+def run_app(tmp_path):
+    """
+    Chạy script trong process mới (settings đọc lại từ environment, import main từ đầu)
+    với database riêng trong tmp_path, trả về stdout
+    """
+    def run(script: str, **env) -> str:
+        environment = {
+            **os.environ,
+            "DATABASE_URL": f"sqlite:///{tmp_path / 'app.db'}",
+            "SECRET_KEY": "test-secret",
+            "PYTHONPATH": PROJECT_DIR,
+            **env,
+        }
+        result = subprocess.run(
+            [sys.executable, "-c", textwrap.dedent(script)],
+            cwd=tmp_path, env=environment, capture_output=True, text=True, timeout=120,
+        )
+        assert result.returncode == 0, result.stderr
+        return result.stdout
+    return run
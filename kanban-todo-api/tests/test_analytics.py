@@ -0,0 +1,91 @@
+from datetime import datetime
+
+import numpy as np
+
+from app.core.analytics import CREATED, DELETED, MOVED, board_analytics, flow_metrics
+from app.database.models import Task, TaskEvent, StatusEnum
+
+HOUR = 3600.0
+TODO, IN_PROGRESS, DONE = 0, 1, 2
+
+
+def events(*rows):
+    """rows: (task_id, type, status, timestamp giây)"""
+    task_ids, types, statuses, timestamps = zip(*rows)
+    return np.array(task_ids, dtype=np.int64), np.array(types, dtype=np.int8), np.array(statuses, dtype=np.int8), np.array(timestamps, dtype=float)
+
+
+def test_task_writes_record_events(client, headers, user, make_task, db):
+    task = make_task()
+    client.patch(f"/tasks/{task['id']}/move", json={"status": "in_progress"}, headers=headers)
+    client.patch(f"/tasks/{task['id']}/assign", json={"assigned_to": user[0]["id"]}, headers=headers)
+    client.patch(f"/tasks/{task['id']}/move", json={"status": "done"}, headers=headers)
+    client.delete(f"/tasks/{task['id']}", headers=headers)
+
+    rows = db.query(TaskEvent).filter(TaskEvent.board_id == task["board_id"], TaskEvent.task_id == task["id"]).order_by(TaskEvent.id).all()
+    assert [(e.type, e.from_status, e.to_status) for e in rows] == [
+        ("created", None, StatusEnum.todo),
+        ("moved", StatusEnum.todo, StatusEnum.in_progress),
+        ("assigned", None, None),
+        ("moved", StatusEnum.in_progress, StatusEnum.done),
+        ("deleted", StatusEnum.done, None),
+    ]
+    assert rows[2].assigned_to == user[0]["id"]
+
+
+def test_rolled_back_write_records_no_events(db, board):
+    task = Task(title="Draft", board_id=board["id"], position=0)
+    db.add(task)
+    db.flush()
+    task_id = task.id
+    assert db.query(TaskEvent).filter(TaskEvent.task_id == task_id, TaskEvent.board_id == board["id"]).count() == 1
+    db.rollback()
+    assert db.query(TaskEvent).filter(TaskEvent.task_id == task_id, TaskEvent.board_id == board["id"]).count() == 0
+
+
+def test_flow_metrics_lead_and_cycle_time():
+    start = 0.0
+    metrics = flow_metrics(events(
+        (1, CREATED, TODO, start),
+        (1, MOVED, IN_PROGRESS, start + 1 * HOUR),
+        (1, MOVED, DONE, start + 3 * HOUR),
+        (2, CREATED, TODO, start),
+        (2, MOVED, DONE, start + 5 * HOUR),
+        (2, MOVED, TODO, start + 6 * HOUR),  # Mở lại: không tính
+        (3, CREATED, TODO, start),
+        (3, MOVED, DONE, start + HOUR),
+        (3, DELETED, -1, start + 2 * HOUR),  # Đã xóa: không tính
+    ), window_start=start, days=2)
+    assert metrics["lead_time"].count == 1
+    assert metrics["lead_time"].mean_hours == 3.0
+    assert metrics["cycle_time"].mean_hours == 2.0
+    assert list(metrics["throughput"]) == [1, 0]
+
+
+def test_flow_metrics_reused_task_id_starts_new_lifecycle():
+    metrics = flow_metrics(events(
+        (1, CREATED, TODO, 0.0),
+        (1, DELETED, -1, HOUR),
+        (1, CREATED, TODO, 10 * HOUR),
+        (1, MOVED, DONE, 12 * HOUR),
+    ), window_start=0.0, days=1)
+    assert metrics["lead_time"].mean_hours == 2.0
+
+
+def test_board_analytics_endpoint(client, headers, board, make_task, db):
+    task = make_task()
+    client.patch(f"/tasks/{task['id']}/move", json={"status": "in_progress"}, headers=headers)
+    client.patch(f"/tasks/{task['id']}/move", json={"status": "done"}, headers=headers)
+
+    response = client.get(f"/boards/{board['id']}/analytics", params={"days": 7})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["completed"] == 1
+    assert len(body["throughput"]) == 7
+    assert body["throughput"][-1]["completed"] == 1
+    assert body["lead_time"]["count"] == 1
+    assert body["cycle_time"]["count"] == 1
+    assert client.get(f"/boards/{board['id']}/analytics", params={"days": 0}).status_code == 422
+
+    empty = board_analytics(db, 999999, 3, now=datetime(2024, 1, 10))
+    assert empty.completed == 0 and empty.lead_time.count == 0
@@ -0,0 +1,100 @@
+import time
+
+import pytest
+from sqlalchemy import func, select
+
+from app.core.audit import AuditWriter, audit_log
+from app.database import Base, SessionLocal
+from app.database.connection import create_database_engine
+from app.database.models import AuditLog
+
+
+@pytest.fixture
+def audit_engine(tmp_path):
+    engine = create_database_engine(f"sqlite:///{tmp_path / 'audit.db'}")
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+def count_rows(engine) -> int:
+    with engine.connect() as conn:
+        return conn.execute(select(func.count(AuditLog.id))).scalar_one()
+
+
+def wait_for(condition, timeout: float = 2):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timeout"
+        time.sleep(0.02)
+
+
+def test_entries_are_written_in_batches(audit_engine):
+    writer = AuditWriter(audit_engine, flush_interval=1, batch_size=2, max_buffer=10)
+    for i in range(3):
+        writer.record("user.updated", "user", i, note=i)
+    assert count_rows(audit_engine) == 0  # Request không chạm database
+    writer.flush()
+    assert count_rows(audit_engine) == 3
+    assert writer.stats()["batches"] == 2
+
+
+def test_background_thread_flushes_after_interval(audit_engine):
+    writer = AuditWriter(audit_engine, flush_interval=0.05, batch_size=100, max_buffer=10)
+    writer.start()
+    try:
+        writer.record("board.deleted", "board", 1)
+        wait_for(lambda: count_rows(audit_engine) == 1)
+    finally:
+        writer.stop()
+
+
+def test_full_buffer_drops_entries(audit_engine):
+    writer = AuditWriter(audit_engine, flush_interval=1, batch_size=10, max_buffer=2)
+    for i in range(3):
+        writer.record("user.updated", "user", i)
+    assert writer.stats()["dropped"] == 1
+    assert writer.stats()["pending"] == 2
+
+
+def test_failed_write_is_counted(tmp_path):
+    engine = create_database_engine(f"sqlite:///{tmp_path / 'empty.db'}")  # Chưa có bảng audit_log
+    writer = AuditWriter(engine, flush_interval=1, batch_size=10, max_buffer=10)
+    writer.record("user.updated", "user", 1)
+    writer.flush()
+    assert writer.stats()["failed"] == 1
+    engine.dispose()
+
+
+def test_entries_wait_for_commit(audit_engine):
+    writer = AuditWriter(audit_engine, flush_interval=1, batch_size=10, max_buffer=10)
+    with SessionLocal() as db:
+        db.connection()  # Bắt đầu transaction
+        writer.record("user.deleted", "user", 1, db=db)
+        assert writer.stats()["pending"] == 0
+        db.commit()
+    assert writer.stats()["pending"] == 1
+
+    with SessionLocal() as db:
+        db.connection()
+        writer.record("user.deleted", "user", 2, db=db)
+        db.rollback()
+    assert writer.stats()["pending"] == 1
+
+
+def test_admin_actions_are_audited(client, admin_headers, user, make_user):
+    target = user[0]["id"]
+    response = client.put(f"/users/{target}", json={"role": "admin"}, headers=admin_headers)
+    assert response.status_code == 200
+
+    def entries():
+        return client.get("/audit/", params={"target_type": "user", "target_id": target}, headers=admin_headers).json()
+
+    wait_for(lambda: {entry["action"] for entry in entries()} == {"user.updated", "user.role_changed"})
+    assert client.get("/audit/", headers=make_user()[1]).status_code == 403
+
+
+def test_failed_admin_action_is_not_audited(client, admin_headers):
+    recorded = audit_log.stats()["recorded"]
+    assert client.put("/users/999999", json={"role": "admin"}, headers=admin_headers).status_code == 404
+    assert audit_log.stats()["recorded"] == recorded
@@ -0,0 +1,67 @@
+from app.database import SessionLocal, refresh_token_repository
+from app.database.models import RefreshToken
+
+
+def refresh(client, token):
+    return client.post("/auth/refresh", json={"refresh_token": token})
+
+
+def test_refresh_rotates_token(client, user):
+    _, _, tokens = user
+    response = refresh(client, tokens["refresh_token"])
+    assert response.status_code == 200
+    rotated = response.json()
+    assert rotated["refresh_token"] != tokens["refresh_token"]
+    assert client.get("/users/me", headers={"Authorization": f"Bearer {rotated['access_token']}"}).status_code == 200
+    assert refresh(client, rotated["refresh_token"]).status_code == 200
+
+
+def test_refresh_reuse_revokes_family(client, user, db):
+    _, _, tokens = user
+    rotated = refresh(client, tokens["refresh_token"]).json()
+
+    # Token cũ bị gửi lại -> 401 và token mới cùng family cũng bị thu hồi
+    assert refresh(client, tokens["refresh_token"]).status_code == 401
+    assert refresh(client, rotated["refresh_token"]).status_code == 401
+
+    family_id = refresh_token_repository.get_by_token(db, tokens["refresh_token"]).family_id
+    family = db.query(RefreshToken).filter(RefreshToken.family_id == family_id).all()
+    assert len(family) == 2
+    assert all(token.revoked_at is not None for token in family)
+
+
+def test_refresh_rejects_unknown_token(client):
+    assert refresh(client, "not-a-token").status_code == 401
+
+
+def test_concurrent_rotate_only_one_wins(user):
+    _, _, tokens = user
+
+    # Hai request cùng đọc token khi nó chưa bị thu hồi, rồi cùng rotate
+    first, second = SessionLocal(), SessionLocal()
+    try:
+        token_a = refresh_token_repository.get_by_token(first, tokens["refresh_token"])
+        token_b = refresh_token_repository.get_by_token(second, tokens["refresh_token"])
+        assert token_a.revoked_at is None and token_b.revoked_at is None
+
+        assert refresh_token_repository.rotate(first, token_a) is not None
+        first.commit()
+        assert refresh_token_repository.rotate(second, token_b) is None
+        second.commit()
+
+        # Không có token thứ hai nào được cấp từ token đã rotate
+        family = first.query(RefreshToken).filter(RefreshToken.family_id == token_a.family_id).all()
+        assert len(family) == 2
+    finally:
+        first.close()
+        second.close()
+
+
+def test_logout_revokes_refresh_token(client, user):
+    _, _, tokens = user
+    assert client.post("/auth/logout", json={"refresh_token": tokens["refresh_token"]}).status_code == 200
+    assert refresh(client, tokens["refresh_token"]).status_code == 401
+
+
+def test_login_wrong_password(client, user):
+    assert client.post("/auth/login-json", json={"username": user[0]["username"], "password": "wrong"}).status_code == 401
@@ -0,0 +1,106 @@
+from sqlalchemy import select
+
+from app.database import ListingVersion, board_repository
+
+
+def test_board_listing_etag(client, headers, board):
+    first = client.get("/boards/", headers=headers)
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+    assert etag.startswith('W/"')
+
+    cached = client.get("/boards/", headers={**headers, "If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+    assert cached.headers["ETag"] == etag
+
+    # Tạo board mới -> listing version đổi, ETag cũ không còn khớp
+    client.post("/boards/", json={"name": "Another"}, headers=headers)
+    changed = client.get("/boards/", headers={**headers, "If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert len(changed.json()) == len(first.json()) + 1
+
+
+def test_board_detail_etag_changes_with_tasks(client, headers, board, make_task):
+    first = client.get(f"/boards/{board['id']}", headers=headers)
+    etag = first.headers["ETag"]
+    assert client.get(f"/boards/{board['id']}", headers={**headers, "If-None-Match": etag}).status_code == 304
+
+    make_task(title="New")
+    changed = client.get(f"/boards/{board['id']}", headers={**headers, "If-None-Match": etag})
+    assert changed.status_code == 200
+    assert [task["title"] for task in changed.json()["tasks"]] == ["New"]
+
+
+def test_task_listing_etag(client, headers, board, make_task):
+    task = make_task()
+    first = client.get("/tasks/", params={"board_id": board["id"]}, headers=headers)
+    etag = first.headers["ETag"]
+    assert client.get("/tasks/", params={"board_id": board["id"]}, headers={**headers, "If-None-Match": etag}).status_code == 304
+
+    client.patch(f"/tasks/{task['id']}/move", json={"status": "done", "position": 0}, headers=headers)
+    moved = client.get("/tasks/", params={"board_id": board["id"]}, headers={**headers, "If-None-Match": etag})
+    assert moved.status_code == 200
+    assert moved.json()[0]["status"] == "done"
+
+
+def test_if_none_match_uses_weak_comparison(client, headers, board):
+    etag = client.get(f"/boards/{board['id']}", headers=headers).headers["ETag"]
+    weak = "W/" + etag
+    # Danh sách nhiều tag, tag khớp có prefix W/ (If-None-Match so sánh weak)
+    assert client.get(f"/boards/{board['id']}", headers={**headers, "If-None-Match": f'"other", {weak}'}).status_code == 304
+    assert client.get(f"/boards/{board['id']}", headers={**headers, "If-None-Match": '"other"'}).status_code == 200
+
+
+def test_board_listing_projection(client, headers, user, board, make_task, db):
+    make_task()
+    make_task()
+    listing = client.get("/boards/", headers=headers, params={"limit": 1000}).json()
+    item = next(row for row in listing if row["id"] == board["id"])
+    # tasks_count và owner_name tính trong SQL
+    assert item["tasks_count"] == 2
+    assert item["owner_name"] == user[0]["username"]
+
+    rows = board_repository.list_rows(db, user_id=user[0]["id"], limit=1000)
+    assert {row.id for row in rows} >= {board["id"]}
+    assert "description" in rows[0]._fields and "tasks" not in rows[0]._fields
+
+
+def test_board_listing_scopes(db, user, make_user, client):
+    other_headers = make_user()[1]
+    private = client.post("/boards/", json={"name": "Private", "is_public": False}, headers=other_headers).json()
+    public_ids = {row.id for row in board_repository.list_rows(db, public_only=True, limit=1000)}
+    visible_ids = {row.id for row in board_repository.list_rows(db, user_id=user[0]["id"], limit=1000)}
+    all_ids = {row.id for row in board_repository.list_rows(db, limit=1000)}
+    assert private["id"] not in public_ids
+    assert private["id"] not in visible_ids
+    assert private["id"] in all_ids
+
+
+def listing_versions(db):
+    db.rollback()  # Đọc dữ liệu mới nhất
+    return dict(db.execute(select(ListingVersion.scope, ListingVersion.version)).all())
+
+
+def test_public_listing_version_is_per_owner(client, headers, user, make_user, board, db):
+    _, other_headers, _ = make_user()
+    other_board = client.post("/boards/", json={"name": "Other", "is_public": True}, headers=other_headers).json()
+    private = client.post("/boards/", json={"name": "Private"}, headers=headers).json()
+    etag = client.get("/boards/public").headers["ETag"]
+    before = listing_versions(db)
+
+    # Task mới trên public board chỉ tăng scope của owner, không có row "public" chung
+    client.post("/tasks/", json={"title": "Task", "board_id": board["id"]}, headers=headers)
+    after = listing_versions(db)
+    changed = {scope for scope in after if after[scope] != before.get(scope)}
+    assert changed == {f"user:{user[0]['id']}", f"public:{user[0]['id']}"}
+    assert "public" not in after
+    assert after[f"public:{other_board['owner_id']}"] == before[f"public:{other_board['owner_id']}"]
+    changed_etag = client.get("/boards/public", headers={"If-None-Match": etag})
+    assert changed_etag.status_code == 200
+
+    # Task trên private board không đổi danh sách public boards
+    etag = changed_etag.headers["ETag"]
+    client.post("/tasks/", json={"title": "Task", "board_id": private["id"]}, headers=headers)
+    assert client.get("/boards/public", headers={"If-None-Match": etag}).status_code == 304
@@ -0,0 +1,107 @@
+import pytest
+
+import app.routers.boards as boards_router
+from app.core.cache import (
+    CacheBackend, CacheEntry, MemoryCacheBackend, ResponseCache, SQLiteCacheBackend, board_tag, response_cache,
+)
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def backend(request, tmp_path):
+    if request.param == "memory":
+        return MemoryCacheBackend(max_entries=2)
+    return SQLiteCacheBackend(str(tmp_path / "cache.db"), max_entries=2)
+
+
+def entry(body: bytes) -> CacheEntry:
+    return CacheEntry(body=body, etag=f'W/"{body.decode()}"')
+
+
+def test_backend_interface_is_abstract():
+    class Incomplete(CacheBackend):
+        def get(self, key):
+            return None
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_backend_invalidates_by_tag(backend):
+    backend.set("a", entry(b"a"), ["board:1"], 60, backend.generations(["board:1"]))
+    backend.set("b", entry(b"b"), ["board:2"], 60, backend.generations(["board:2"]))
+    backend.invalidate_tags(["board:1"])
+    assert backend.get("a") is None
+    assert backend.get("b").body == b"b"
+
+
+def test_backend_rejects_build_that_raced_a_write(backend):
+    generations = backend.generations(["board:1"])
+    backend.invalidate_tags(["board:1"])  # Ghi commit trong lúc đang build
+    assert not backend.set("a", entry(b"a"), ["board:1"], 60, generations)
+    assert backend.get("a") is None
+
+
+def test_backend_evicts_least_recently_used(backend):
+    for key in ("a", "b", "c"):
+        backend.set(key, entry(key.encode()), [], 60, {})
+    assert backend.get("a") is None
+    assert backend.get("c") is not None
+
+
+def test_backend_expires_entries(backend):
+    backend.set("a", entry(b"a"), [], 0, {})
+    assert backend.get("a") is None
+
+
+def test_response_cache_builds_once():
+    cache = ResponseCache(MemoryCacheBackend(), ttl=60, lock_timeout=1)
+    builds = []
+
+    def build():
+        builds.append(1)
+        return entry(b"a")
+
+    assert cache.get_or_build("key", [], build)[1] is False
+    assert cache.get_or_build("key", [], build)[1] is True
+    assert len(builds) == 1
+    assert cache.stats()["hits"] == 1
+
+
+def test_anonymous_board_detail_is_cached_and_invalidated(client, board, make_task):
+    first = client.get(f"/boards/{board['id']}")
+    assert first.headers["X-Cache"] == "MISS"
+    assert client.get(f"/boards/{board['id']}").headers["X-Cache"] == "HIT"
+
+    # Ghi task commit -> entry của board bị xóa
+    make_task(title="Fresh")
+    changed = client.get(f"/boards/{board['id']}")
+    assert changed.headers["X-Cache"] == "MISS"
+    assert changed.headers["ETag"] != first.headers["ETag"]
+    assert [task["title"] for task in changed.json()["tasks"]] == ["Fresh"]
+
+
+def test_anonymous_revalidation_skips_build(client, board, monkeypatch):
+    etag = client.get(f"/boards/{board['id']}").headers["ETag"]
+
+    response_cache.invalidate([board_tag(board["id"])])
+    calls = []
+    original = boards_router.build_board_detail
+    monkeypatch.setattr(boards_router, "build_board_detail", lambda *args: calls.append(1) or original(*args))
+
+    # Cache miss nhưng ETag khớp -> 304 mà không dựng lại response
+    response = client.get(f"/boards/{board['id']}", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert calls == []
+
+
+def test_anonymous_private_board_is_forbidden(client, headers):
+    created = client.post("/boards/", json={"name": "Private", "is_public": False}, headers=headers).json()
+    assert client.get(f"/boards/{created['id']}").status_code == 403
+
+
+def test_public_listing_cache_invalidated_by_new_public_board(client, headers):
+    before = client.get("/boards/public", params={"limit": 100})
+    client.post("/boards/", json={"name": "Listed", "is_public": True}, headers=headers)
+    after = client.get("/boards/public", params={"limit": 100})
+    assert after.headers["X-Cache"] == "MISS"
+    assert after.headers["ETag"] != before.headers["ETag"]
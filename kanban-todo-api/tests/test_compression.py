@@ -0,0 +1,110 @@
+import gzip
+
+import pytest
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.core.compression import CompressionMiddleware, brotli, choose_encoding
+from app.core.etag import encoded_etag, etag_matches, not_modified
+
+BODY = b'{"data": "' + b"x" * 4096 + b'"}'
+
+
+@pytest.fixture(scope="module")
+def compressed_client():
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=1024)
+
+    @app.get("/strong")
+    def strong():
+        return Response(BODY, media_type="application/json", headers={"ETag": '"task-1-2"'})
+
+    @app.get("/weak")
+    def weak():
+        return Response(BODY, media_type="application/json", headers={"ETag": 'W/"board-1"'})
+
+    @app.get("/small")
+    def small():
+        return Response(b"{}", media_type="application/json", headers={"ETag": '"task-1-2"'})
+
+    @app.get("/conditional")
+    def conditional(request: Request):
+        if etag_matches(request, '"task-1-2"'):
+            return not_modified('"task-1-2"')
+        return Response(BODY, media_type="application/json", headers={"ETag": '"task-1-2"'})
+
+    @app.get("/stream")
+    def stream():
+        return StreamingResponse(iter([BODY, BODY]), media_type="application/json")
+
+    return TestClient(app)
+
+
+def test_choose_encoding():
+    assert choose_encoding("gzip, deflate") == "gzip"
+    assert choose_encoding("identity") is None
+    assert choose_encoding("gzip;q=0, *;q=0") is None
+    assert choose_encoding("br;q=0.5, gzip") == "gzip"
+    if brotli is not None:
+        assert choose_encoding("gzip, br") == "br"
+
+
+def test_strong_etag_carries_encoding(compressed_client):
+    response = compressed_client.get("/strong", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.headers["ETag"] == '"task-1-2-gzip"'
+    assert "Accept-Encoding" in response.headers["Vary"]
+    assert response.content == BODY  # httpx tự giải nén
+
+    identity = compressed_client.get("/strong", headers={"Accept-Encoding": "identity"})
+    assert "Content-Encoding" not in identity.headers
+    assert identity.headers["ETag"] == '"task-1-2"'
+
+
+def test_weak_etag_unchanged(compressed_client):
+    response = compressed_client.get("/weak", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.headers["ETag"] == 'W/"board-1"'
+
+
+def test_small_body_not_compressed(compressed_client):
+    response = compressed_client.get("/small", headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in response.headers
+    assert response.headers["ETag"] == '"task-1-2"'
+
+
+def test_not_modified_keeps_encoded_etag(compressed_client):
+    etag = compressed_client.get("/conditional", headers={"Accept-Encoding": "gzip"}).headers["ETag"]
+    assert etag == '"task-1-2-gzip"'
+    response = compressed_client.get("/conditional", headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+
+    # Client giữ bản không nén: 304 trả tag không có suffix
+    response = compressed_client.get("/conditional", headers={"Accept-Encoding": "gzip", "If-None-Match": '"task-1-2"'})
+    assert response.status_code == 304
+    assert response.headers["ETag"] == '"task-1-2"'
+
+
+def test_streaming_body_compressed(compressed_client):
+    with compressed_client.stream("GET", "/stream", headers={"Accept-Encoding": "gzip"}) as response:
+        raw = b"".join(response.iter_raw())
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Content-Length" not in response.headers
+    assert gzip.decompress(raw) == BODY * 2
+
+
+def test_encoded_etag():
+    assert encoded_etag('"task-1-2"', "br") == '"task-1-2-br"'
+    assert encoded_etag('W/"task-1-2"', "br") == 'W/"task-1-2"'
+
+
+def test_if_match_accepts_encoded_etag(client, headers, make_task):
+    task = make_task()
+    etag = f'"task-{task["id"]}-{task["version"]}'
+    response = client.put(f"/tasks/{task['id']}", json={"title": "Updated"}, headers={**headers, "If-Match": etag + '-gzip"'})
+    assert response.status_code == 200
+    # Version cũ vẫn 412 dù có suffix encoding
+    stale = client.put(f"/tasks/{task['id']}", json={"title": "Again"}, headers={**headers, "If-Match": etag + '-br"'})
+    assert stale.status_code == 412
@@ -0,0 +1,93 @@
+import pytest
+from sqlalchemy.orm.exc import StaleDataError
+
+import app.routers.tasks as tasks_router
+from app.database import SessionLocal
+from app.database.models import Task
+
+
+def test_board_detail_etag_round_trips_to_if_match(client, headers, board):
+    etag = client.get(f"/boards/{board['id']}", headers=headers).headers["ETag"]
+    assert not etag.startswith("W/")
+    # If-Match dùng strong comparison: bản weak của cùng tag không khớp
+    weak = client.put(f"/boards/{board['id']}", json={"name": "Weak"}, headers={**headers, "If-Match": "W/" + etag})
+    assert weak.status_code == 412
+    response = client.put(f"/boards/{board['id']}", json={"name": "Renamed"}, headers={**headers, "If-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["name"] == "Renamed"
+
+    # ETag cũ sau khi board đã đổi -> 412
+    stale = client.put(f"/boards/{board['id']}", json={"name": "Again"}, headers={**headers, "If-Match": etag})
+    assert stale.status_code == 412
+
+
+def test_board_detail_etag_is_stale_after_task_change(client, headers, board, make_task):
+    etag = client.get(f"/boards/{board['id']}", headers=headers).headers["ETag"]
+    make_task()
+    response = client.put(f"/boards/{board['id']}", json={"name": "Renamed"}, headers={**headers, "If-Match": etag})
+    assert response.status_code == 412
+    assert response.headers["ETag"] == f'"board-{board["id"]}-{board["version"]}"'
+
+
+def test_board_item_etag(client, headers):
+    created = client.post("/boards/", json={"name": "Versioned"}, headers=headers)
+    etag = created.headers["ETag"]
+    assert etag == f'"board-{created.json()["id"]}-{created.json()["version"]}"'
+    updated = client.put(f"/boards/{created.json()['id']}", json={"name": "V2"}, headers={**headers, "If-Match": etag})
+    assert updated.status_code == 200
+    assert updated.headers["ETag"] != etag
+    assert client.put(f"/boards/{created.json()['id']}", json={"name": "V3"}, headers={**headers, "If-Match": etag}).status_code == 412
+    # Weak ETag không khớp item ETag (strong comparison)
+    assert client.put(f"/boards/{created.json()['id']}", json={"name": "V3"}, headers={**headers, "If-Match": "W/" + updated.headers["ETag"]}).status_code == 412
+
+
+def test_task_if_match(client, headers, make_task):
+    task = make_task()
+    created_etag = f'"task-{task["id"]}-{task["version"]}"'
+    moved = client.patch(f"/tasks/{task['id']}/move", json={"status": "in_progress"}, headers={**headers, "If-Match": created_etag})
+    assert moved.status_code == 200
+    assert moved.json()["version"] == task["version"] + 1
+
+    for method, path, payload in (
+        ("PUT", f"/tasks/{task['id']}", {"title": "X"}),
+        ("PATCH", f"/tasks/{task['id']}/move", {"status": "done"}),
+        ("PATCH", f"/tasks/{task['id']}/assign", {"assigned_to": None}),
+    ):
+        response = client.request(method, path, json=payload, headers={**headers, "If-Match": created_etag})
+        assert response.status_code == 412, path
+        assert response.headers["ETag"] == moved.headers["ETag"]
+
+    # Không gửi If-Match thì vẫn ghi được
+    assert client.put(f"/tasks/{task['id']}", json={"title": "Free"}, headers=headers).status_code == 200
+
+
+def test_concurrent_task_update_raises_stale_data(make_task):
+    task = make_task()
+    first, second = SessionLocal(), SessionLocal()
+    try:
+        mine = first.get(Task, task["id"])
+        theirs = second.get(Task, task["id"])
+        theirs.title = "Theirs"
+        second.commit()
+
+        # Version đã đổi giữa lúc đọc và lúc ghi -> UPDATE ... WHERE version = ? không khớp row nào
+        mine.title = "Mine"
+        with pytest.raises(StaleDataError):
+            first.flush()
+        first.rollback()
+    finally:
+        first.close()
+        second.close()
+
+
+@pytest.mark.parametrize("if_match, expected", [(None, 409), ("*", 412)])
+def test_stale_data_maps_to_409_or_412(client, headers, make_task, monkeypatch, if_match, expected):
+    task = make_task()
+
+    def lost_race(*args, **kwargs):
+        raise StaleDataError("UPDATE statement on table 'tasks' expected to update 1 row(s); 0 were matched.")
+
+    monkeypatch.setattr(tasks_router.task_repository, "update", lost_race)
+    request_headers = {**headers, "If-Match": if_match} if if_match else headers
+    response = client.put(f"/tasks/{task['id']}", json={"title": "X"}, headers=request_headers)
+    assert response.status_code == expected
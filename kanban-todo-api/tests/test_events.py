@@ -0,0 +1,97 @@
+import asyncio
+import json
+
+import pytest
+
+from app.core.broadcast import (
+    BoardEventHub, BroadcastBackend, MemoryBroadcastBackend, SQLiteBroadcastBackend, board_event_stream, board_events,
+)
+
+
+async def next_event(subscription, timeout: float = 2):
+    return await asyncio.wait_for(subscription.get(), timeout)
+
+
+@pytest.mark.asyncio
+async def test_hub_delivers_to_board_subscribers():
+    hub = BoardEventHub(MemoryBroadcastBackend())
+    with hub.subscribe(1) as first, hub.subscribe(2) as second:
+        hub.publish(1, {"type": "task.created", "task": {"id": 7}})
+        event = await next_event(first)
+        assert event.type == "task.created"
+        assert json.loads(event.data)["task"]["id"] == 7
+        assert second.queue.empty()
+    assert hub.stats()["subscribers"] == 0
+
+
+@pytest.mark.asyncio
+async def test_slow_subscriber_gets_resync():
+    hub = BoardEventHub(MemoryBroadcastBackend(), max_queue=2)
+    with hub.subscribe(1) as subscription:
+        for i in range(3):
+            hub.publish(1, {"type": "task.updated", "task": {"id": i}})
+        await asyncio.sleep(0)
+        # Queue đầy: các event đang chờ bị bỏ, chỉ còn tín hiệu resync
+        assert await next_event(subscription) is None
+        assert hub.stats()["dropped_slow_consumers"] == 1
+        assert hub.stats()["subscribers"] == 0
+
+
+@pytest.mark.asyncio
+async def test_sqlite_backend_delivers_across_workers(tmp_path):
+    path = str(tmp_path / "events.db")
+    publisher = SQLiteBroadcastBackend(path, poll_interval=0.01)
+    hub = BoardEventHub(SQLiteBroadcastBackend(path, poll_interval=0.01))
+    try:
+        with hub.subscribe(1) as subscription:
+            BoardEventHub(publisher).publish(1, {"type": "task.deleted", "task": {"id": 3}})
+            assert (await next_event(subscription)).type == "task.deleted"
+    finally:
+        hub.backend.stop()
+
+
+@pytest.mark.asyncio
+async def test_committed_task_writes_publish_events(client, headers, board):
+    with board_events.subscribe(board["id"]) as subscription:
+        task = client.post("/tasks/", json={"title": "Live", "board_id": board["id"]}, headers=headers).json()
+        created = await next_event(subscription)
+        assert created.type == "task.created"
+        assert json.loads(created.data)["task"]["title"] == "Live"
+
+        client.patch(f"/tasks/{task['id']}/move", json={"status": "done"}, headers=headers)
+        assert (await next_event(subscription)).type == "task.moved"
+        client.delete(f"/tasks/{task['id']}", headers=headers)
+        assert (await next_event(subscription)).type == "task.deleted"
+
+        # Request lỗi (task đã xóa -> 404) không phát event nào
+        client.put(f"/tasks/{task['id']}", json={"title": "Gone"}, headers=headers)
+        with pytest.raises(asyncio.TimeoutError):
+            await next_event(subscription, timeout=0.2)
+
+
+@pytest.mark.asyncio
+async def test_stream_ends_when_board_becomes_private(client, headers, board):
+    stream = board_event_stream(board["id"], lambda data: data["is_public"], heartbeat_seconds=5)
+    assert (await stream.__anext__()).startswith("event: ready")
+
+    client.put(f"/boards/{board['id']}", json={"is_public": False}, headers=headers)
+    assert (await asyncio.wait_for(stream.__anext__(), 2)).startswith("event: access_revoked")
+    with pytest.raises(StopAsyncIteration):
+        await stream.__anext__()
+
+
+def test_backend_interface_is_abstract():
+    class Incomplete(BroadcastBackend):
+        def publish(self, board_id, event):
+            pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_events_endpoint_checks_permission(client, headers, make_user):
+    private = client.post("/boards/", json={"name": "Private", "is_public": False}, headers=headers).json()
+    assert client.get(f"/boards/{private['id']}/events").status_code == 403
+    other_token = make_user()[2]["access_token"]
+    assert client.get(f"/boards/{private['id']}/events", params={"access_token": other_token}).status_code == 403
+    assert client.get("/boards/999999/events").status_code == 404
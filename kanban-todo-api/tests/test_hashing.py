@@ -0,0 +1,61 @@
+import asyncio
+import threading
+
+import pytest
+
+from app.core.hashing import PasswordHasher, PasswordHasherBusy, get_hash_rounds
+from app.core.security import password_hasher
+from app.database import User
+
+
+def test_hash_and_verify_on_pool():
+    hasher = PasswordHasher(rounds=4, max_workers=2, max_pending=2)
+    hashed = hasher.hash("secret")
+    assert get_hash_rounds(hashed) == 4
+    assert hasher.verify("secret", hashed)
+    assert not hasher.verify("wrong", hashed)
+    assert asyncio.run(hasher.averify("secret", hashed))
+    assert hasher.stats()["completed"] == 4
+
+
+def test_full_pool_rejects_immediately():
+    hasher = PasswordHasher(rounds=4, max_workers=1, max_pending=0)
+    started, release = threading.Event(), threading.Event()
+
+    def block():
+        started.set()
+        release.wait(5)
+
+    future = hasher._submit(block)
+    started.wait(5)
+    with pytest.raises(PasswordHasherBusy):
+        hasher.hash("secret")
+    release.set()
+    future.result()
+    assert hasher.stats()["rejected"] == 1
+    # Slot được trả lại sau khi job xong
+    assert hasher.verify("secret", hasher.hash("secret"))
+
+
+def test_needs_rehash_when_cost_changes():
+    old = PasswordHasher(rounds=4).hash("secret")
+    assert PasswordHasher(rounds=5).needs_rehash(old)
+    assert not PasswordHasher(rounds=4).needs_rehash(old)
+
+
+def test_busy_pool_returns_503(client, monkeypatch):
+    def busy(*args, **kwargs):
+        raise PasswordHasherBusy()
+
+    monkeypatch.setattr(password_hasher, "_submit", busy)
+    response = client.post("/auth/register", json={"username": "busy-user", "password": "secret123"})
+    assert response.status_code == 503
+    assert "retry-after" in {key.lower() for key in response.headers}
+
+
+def test_login_rehashes_old_cost(client, make_user, db, monkeypatch):
+    user, _, _ = make_user()
+    monkeypatch.setattr(password_hasher, "rounds", 5)
+    response = client.post("/auth/login-json", json={"username": user["username"], "password": "secret123"})
+    assert response.status_code == 200
+    assert get_hash_rounds(db.get(User, user["id"]).password_hash) == 5
@@ -0,0 +1,83 @@
+import queue
+
+import pytest
+
+from app.core.broadcast import SQLiteBroadcastBackend
+from app.core.cache import CacheEntry, MemoryCacheBackend, ResponseCache, board_tag
+from app.core.invalidation import InvalidationBus
+from app.database import ChangeSet
+from app.database.connection import pool_size_per_worker
+
+
+@pytest.fixture
+def workers(tmp_path):
+    """Hai worker dùng chung một file SQLite làm bus"""
+    path = str(tmp_path / "invalidations.db")
+    buses = [
+        InvalidationBus(SQLiteBroadcastBackend(path, poll_interval=0.01, table="invalidations"))
+        for _ in range(2)
+    ]
+    received = [queue.Queue() for _ in buses]
+    for bus, inbox in zip(buses, received):
+        bus.add_listener(inbox.put)
+        bus.start()
+    yield buses, received
+    for bus in buses:
+        bus.stop()
+
+
+def test_other_worker_receives_changes(workers):
+    (sender, receiver), (sender_inbox, receiver_inbox) = workers
+    sender.publish(ChangeSet(board_ids={1, 2}, scopes={"public"}, user_ids={3}))
+
+    changes = receiver_inbox.get(timeout=2)
+    assert changes.board_ids == {1, 2}
+    assert changes.scopes == {"public"}
+    assert changes.user_ids == {3}
+    # Worker gửi đã tự invalidate, bỏ qua message của chính mình
+    with pytest.raises(queue.Empty):
+        sender_inbox.get(timeout=0.1)
+    assert receiver.stats()["received"] == 1
+    assert sender.stats()["published"] == 1
+
+
+def test_empty_change_set_is_not_published(workers):
+    (sender, _), (_, receiver_inbox) = workers
+    sender.publish(ChangeSet(events=[(1, {"type": "noop"})]))
+    assert sender.stats()["published"] == 0
+    with pytest.raises(queue.Empty):
+        receiver_inbox.get(timeout=0.1)
+
+
+def test_failing_listener_does_not_block_others(workers):
+    (sender, receiver), (_, receiver_inbox) = workers
+
+    def broken(changes):
+        raise RuntimeError("boom")
+
+    receiver._listeners.insert(0, broken)
+    sender.publish(ChangeSet(board_ids={5}))
+    assert receiver_inbox.get(timeout=2).board_ids == {5}
+
+
+def test_remote_change_evicts_local_cache(workers):
+    (sender, receiver), _ = workers
+    cache = ResponseCache(MemoryCacheBackend(), ttl=60, lock_timeout=1)
+    cache.get_or_build("/boards/7?", ["board:7"], lambda: CacheEntry(body=b"{}", etag='W/"x"'))
+    evicted = queue.Queue()
+
+    def invalidate(changes):
+        cache.invalidate(board_tag(board_id) for board_id in changes.board_ids)
+        evicted.put(True)
+
+    receiver.add_listener(invalidate)
+
+    sender.publish(ChangeSet(board_ids={7}))
+    evicted.get(timeout=2)
+    assert cache.backend.get("/boards/7?") is None
+
+
+def test_pool_size_per_worker():
+    assert pool_size_per_worker(20, 4) == 5
+    assert pool_size_per_worker(3, 8) == 1
+    assert pool_size_per_worker(10, 0) == 10
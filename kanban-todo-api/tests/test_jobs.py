@@ -0,0 +1,151 @@
+import time
+from datetime import datetime, timedelta
+from functools import partial
+
+import pytest
+from sqlalchemy import select, update
+
+from app.core.jobs import FAILED, QUEUED, RUNNING, SUCCEEDED, JobFailed, JobRunner
+from app.database import Base, Job
+from app.database.connection import create_database_engine, session_for
+
+
+@pytest.fixture
+def runner(tmp_path):
+    """Runner không start worker thread: test tự gọi _claim/_execute"""
+    engine = create_database_engine(f"sqlite:///{tmp_path / 'jobs.db'}")
+    Base.metadata.create_all(engine)
+    runner = JobRunner(
+        engine, partial(session_for, engine), workers=1, poll_interval=0.01,
+        max_attempts=2, backoff_seconds=0, stale_after_seconds=60,
+    )
+    yield runner
+    engine.dispose()
+
+
+def load(runner, job_id):
+    with runner.engine.connect() as conn:
+        return conn.execute(select(Job).where(Job.id == job_id)).first()
+
+
+def run_next(runner):
+    job = runner._claim()
+    assert job is not None
+    runner._execute(job)
+    return job
+
+
+def test_enqueue_unknown_type(runner):
+    with pytest.raises(ValueError):
+        runner.enqueue("nope", {})
+
+
+def test_job_succeeds_with_result(runner):
+    runner.handler("echo")(lambda db, job: {"value": job.payload["value"]})
+    job_id = runner.enqueue("echo", {"value": 42})
+    assert load(runner, job_id).status == QUEUED
+    run_next(runner)
+    job = load(runner, job_id)
+    assert job.status == SUCCEEDED
+    assert job.result == '{"value": 42}'
+    assert job.progress == 1.0
+    assert runner._claim() is None
+
+
+def test_failed_job_is_retried_then_fails(runner):
+    calls = []
+
+    @runner.handler("flaky")
+    def flaky(db, job):
+        calls.append(job.attempt)
+        raise RuntimeError("boom")
+
+    job_id = runner.enqueue("flaky", {})
+    run_next(runner)
+    job = load(runner, job_id)
+    assert job.status == QUEUED and job.attempts == 1
+    assert "RuntimeError: boom" in job.error
+
+    run_next(runner)
+    job = load(runner, job_id)
+    assert job.status == FAILED and job.attempts == 2
+    assert calls == [1, 2]
+    assert runner.stats()["retried"] == 1 and runner.stats()["failed"] == 1
+
+
+def test_retry_waits_for_backoff(runner):
+    runner.backoff_seconds = 60
+    runner.handler("flaky")(lambda db, job: 1 / 0)
+    runner.enqueue("flaky", {})
+    run_next(runner)
+    assert runner._claim() is None
+
+
+def test_job_failed_is_not_retried(runner):
+    @runner.handler("missing")
+    def missing(db, job):
+        raise JobFailed("Board không tồn tại")
+
+    job_id = runner.enqueue("missing", {})
+    run_next(runner)
+    job = load(runner, job_id)
+    assert job.status == FAILED and job.attempts == 1
+    assert job.error == "Board không tồn tại"
+
+
+def test_stale_running_job_is_reclaimed(runner):
+    runner.handler("echo")(lambda db, job: None)
+    job_id = runner.enqueue("echo", {})
+    assert runner._claim().id == job_id  # Worker nhận job rồi chết
+    assert load(runner, job_id).status == RUNNING
+    # Còn heartbeat: không worker nào khác nhận
+    assert runner._claim() is None
+
+    with runner.engine.begin() as conn:
+        conn.execute(update(Job).where(Job.id == job_id).values(heartbeat_at=datetime.utcnow() - timedelta(minutes=5)))
+    reclaimed = runner._claim()
+    assert reclaimed.id == job_id and reclaimed.attempts == 2
+    runner._execute(reclaimed)
+    assert load(runner, job_id).status == SUCCEEDED
+
+
+def test_claim_is_exclusive(runner):
+    runner.handler("echo")(lambda db, job: None)
+    runner.enqueue("echo", {})
+    other = JobRunner(runner.engine, runner.session_factory, 1, 0.01, 2, 0, 60)
+    assert runner._claim() is not None
+    assert other._claim() is None
+
+
+def wait_for_job(client, headers, job_id, timeout: float = 5):
+    deadline = time.monotonic() + timeout
+    while True:
+        job = client.get(f"/jobs/{job_id}", headers=headers).json()
+        if job["status"] in (SUCCEEDED, FAILED) or time.monotonic() > deadline:
+            return job
+        time.sleep(0.05)
+
+
+def test_background_board_delete(client, headers, board, make_task, make_user):
+    for _ in range(3):
+        make_task()
+    response = client.delete(f"/boards/{board['id']}", params={"background": True}, headers=headers)
+    assert response.status_code == 202
+    job_id = response.json()["job_id"]
+    assert response.headers["Location"] == f"/jobs/{job_id}"
+
+    # Job của người khác trả 404
+    assert client.get(f"/jobs/{job_id}", headers=make_user()[1]).status_code == 404
+
+    job = wait_for_job(client, headers, job_id)
+    assert job["status"] == SUCCEEDED
+    assert job["result"]["deleted_tasks_count"] == 3
+    assert client.get(f"/boards/{board['id']}", headers=headers).status_code == 404
+
+
+def test_export_job(client, headers, board, make_task):
+    make_task(title="Exported")
+    job_id = client.post(f"/boards/{board['id']}/export", headers=headers).json()["job_id"]
+    job = wait_for_job(client, headers, job_id)
+    assert job["status"] == SUCCEEDED
+    assert [task["title"] for task in job["result"]["tasks"]] == ["Exported"]
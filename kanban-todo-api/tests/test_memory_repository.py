@@ -0,0 +1,193 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.database import get_repositories, task_repository
+from app.database.memory import (
+    MemoryBoardRepository,
+    MemoryStore,
+    MemoryTaskRepository,
+    MemoryUserRepository,
+    memory_task_repository,
+)
+from app.database.models import StatusEnum
+
+
+@pytest.fixture
+def store():
+    return MemoryStore()
+
+
+@pytest.fixture
+def repos(store):
+    """Repositories trên store riêng của test (không đụng memory_store của app)"""
+    return MemoryUserRepository(store), MemoryBoardRepository(store), MemoryTaskRepository(store)
+
+
+@pytest.fixture
+def owner(repos):
+    users, _, _ = repos
+    return users.create(None, obj_in={"username": "alice", "email": "alice@example.com", "password_hash": "x"})
+
+
+def test_user_indexes(repos, owner):
+    users, _, _ = repos
+    assert users.get_by_username(None, "alice").id == owner.id
+    assert users.get_by_email(None, "alice@example.com").id == owner.id
+    assert users.get_by_username(None, "bob") is None
+    with pytest.raises(ValueError):
+        users.create(None, obj_in={"username": "alice", "password_hash": "x"})
+
+    # Đổi username: index cũ bị xóa
+    users.update(None, db_obj=owner, obj_in={"username": "alice2"})
+    assert users.get_by_username(None, "alice") is None
+    assert users.get_by_username(None, "alice2").id == owner.id
+    assert not hasattr(users.list_rows(None)[0], "password_hash")
+
+
+def test_board_indexes(repos, owner):
+    users, boards, _ = repos
+    other = users.create(None, obj_in={"username": "bob", "password_hash": "x"})
+    private = boards.create(None, obj_in={"name": "Private", "owner_id": owner.id})
+    public = boards.create(None, obj_in={"name": "Public", "owner_id": other.id, "is_public": True})
+    hidden = boards.create(None, obj_in={"name": "Hidden", "owner_id": other.id})
+
+    assert [b.id for b in boards.get_by_owner(None, owner.id)] == [private.id]
+    assert [b.id for b in boards.get_public_boards(None)] == [public.id]
+    assert [b.id for b in boards.get_accessible_boards(None, owner.id)] == [private.id, public.id]
+    assert [b.id for b in boards.get_all(None)] == [private.id, public.id, hidden.id]
+
+    rows = boards.list_rows(None, user_id=owner.id)
+    assert [(row.name, row.owner_name, row.tasks_count) for row in rows] == [("Private", "alice", 0), ("Public", "bob", 0)]
+
+    boards.update(None, db_obj=hidden, obj_in={"is_public": True})
+    assert [b.id for b in boards.get_public_boards(None)] == [public.id, hidden.id]
+
+
+def test_tasks_by_status_in_position_order(repos, owner):
+    _, boards, tasks = repos
+    board = boards.create(None, obj_in={"name": "Board", "owner_id": owner.id})
+    third = tasks.create(None, obj_in={"title": "c", "board_id": board.id, "position": 2})
+    first = tasks.create(None, obj_in={"title": "a", "board_id": board.id, "position": 0})
+    second = tasks.create(None, obj_in={"title": "b", "board_id": board.id, "position": 1})
+    done = tasks.create(None, obj_in={"title": "d", "board_id": board.id, "status": StatusEnum.done, "assigned_to": owner.id})
+
+    assert [t.id for t in tasks.get_by_status(None, board.id, StatusEnum.todo)] == [first.id, second.id, third.id]
+    assert [t.id for t in tasks.get_by_status(None, board.id, StatusEnum.done)] == [done.id]
+    assert tasks.count_by_board(None, board.id) == 4
+    assert tasks.count_by_board(None, board.id, StatusEnum.todo) == 3
+    assert [t.id for t in tasks.get_by_assigned_user(None, owner.id)] == [done.id]
+
+    # Move cập nhật index (board, status) và xếp cuối cột mới
+    moved = tasks.move_task(None, first.id, StatusEnum.done)
+    assert moved.position == 1
+    assert [t.id for t in tasks.get_by_status(None, board.id, StatusEnum.todo)] == [second.id, third.id]
+    assert [t.id for t in tasks.get_by_status(None, board.id, StatusEnum.done)] == [done.id, first.id]
+    assert tasks.move_task(None, 999, StatusEnum.done) is None
+
+    with pytest.raises(ValueError):
+        tasks.create(None, obj_in={"title": "x", "board_id": 999})
+
+
+def test_due_rows_use_range(repos, owner):
+    users, boards, tasks = repos
+    other = users.create(None, obj_in={"username": "bob", "password_hash": "x"})
+    board = boards.create(None, obj_in={"name": "Board", "owner_id": owner.id})
+    hidden = boards.create(None, obj_in={"name": "Hidden", "owner_id": other.id})
+    now = datetime(2030, 1, 1)
+    soon = tasks.create(None, obj_in={"title": "soon", "board_id": board.id, "due_date": now + timedelta(days=1)})
+    later = tasks.create(None, obj_in={"title": "later", "board_id": board.id, "due_date": now + timedelta(days=3)})
+    tasks.create(None, obj_in={"title": "far", "board_id": board.id, "due_date": now + timedelta(days=30)})
+    tasks.create(None, obj_in={"title": "done", "board_id": board.id, "due_date": now, "status": StatusEnum.done})
+    tasks.create(None, obj_in={"title": "other", "board_id": hidden.id, "due_date": now + timedelta(days=2)})
+
+    rows = tasks.due_rows(None, due_from=now, due_before=now + timedelta(days=7), user_id=owner.id)
+    assert [row.id for row in rows] == [soon.id, later.id]
+    rows = tasks.due_rows(None, due_before=now + timedelta(days=1), user_id=owner.id, include_done=True)
+    assert [row.title for row in rows] == ["done"]
+    assert len(tasks.due_rows(None, due_from=now, limit=1)) == 1
+
+
+def test_returned_rows_are_copies(repos, owner):
+    users, _, _ = repos
+    user = users.get(None, owner.id)
+    user.username = "mallory"
+    assert users.get(None, owner.id).username == "alice"
+    assert users.get_by_username(None, "mallory") is None
+
+
+def test_task_writes_bump_board_revision(repos, owner):
+    _, boards, tasks = repos
+    board = boards.create(None, obj_in={"name": "Board", "owner_id": owner.id})
+    revision = boards.get(None, board.id).revision
+    task = tasks.create(None, obj_in={"title": "a", "board_id": board.id})
+    assert boards.get(None, board.id).revision == revision + 1
+
+    updated = tasks.update(None, db_obj=task, obj_in={"title": "b"})
+    assert updated is task and task.title == "b" and task.version == 2
+    assert boards.get(None, board.id).revision == revision + 2
+
+    tasks.delete(None, id=task.id)
+    assert boards.get(None, board.id).revision == revision + 3
+    with pytest.raises(LookupError):
+        tasks.update(None, db_obj=task, obj_in={"title": "c"})
+
+
+def test_tombstones(repos, owner):
+    _, boards, tasks = repos
+    board = boards.create(None, obj_in={"name": "Board", "owner_id": owner.id})
+    task = tasks.create(None, obj_in={"title": "a", "board_id": board.id})
+    before = datetime.utcnow() - timedelta(seconds=1)
+    tasks.delete(None, id=task.id)
+
+    assert [row.task_id for row in tasks.deleted_since(None, board.id, before)] == [task.id]
+    assert tasks.deleted_since(None, board.id, datetime.utcnow() + timedelta(seconds=1)) == []
+    assert tasks.prune_tombstones(None, before) == 0
+    assert tasks.prune_tombstones(None, datetime.utcnow() + timedelta(seconds=1)) == 1
+    assert tasks.deleted_since(None, board.id, before) == []
+
+
+def test_delete_user_cascades(store, repos, owner):
+    users, boards, tasks = repos
+    other = users.create(None, obj_in={"username": "bob", "password_hash": "x"})
+    board = boards.create(None, obj_in={"name": "Board", "owner_id": owner.id})
+    other_board = boards.create(None, obj_in={"name": "Other", "owner_id": other.id})
+    tasks.create(None, obj_in={"title": "a", "board_id": board.id})
+    assigned = tasks.create(None, obj_in={"title": "b", "board_id": other_board.id, "assigned_to": owner.id})
+
+    users.delete(None, id=owner.id)
+    assert store.stats() == {"users": 1, "boards": 1, "tasks": 1}
+    assert tasks.get(None, assigned.id).assigned_to is None
+    assert tasks.get_by_assigned_user(None, owner.id) == []
+
+
+def test_snapshot_roundtrip(tmp_path):
+    path = str(tmp_path / "snapshot.json")
+    store = MemoryStore(snapshot_path=path)
+    users, boards, tasks = MemoryUserRepository(store), MemoryBoardRepository(store), MemoryTaskRepository(store)
+    user = users.create(None, obj_in={"username": "alice", "password_hash": "x"})
+    board = boards.create(None, obj_in={"name": "Board", "owner_id": user.id, "is_public": True})
+    task = tasks.create(None, obj_in={"title": "a", "board_id": board.id, "due_date": datetime(2030, 1, 1)})
+    deleted = tasks.create(None, obj_in={"title": "b", "board_id": board.id})
+    tasks.delete(None, id=deleted.id)
+    store.stop()
+    # Không có thay đổi: không ghi lại
+    assert store.snapshot() is False
+
+    restored = MemoryStore(snapshot_path=path)
+    restored_tasks = MemoryTaskRepository(restored)
+    assert restored.stats() == {"users": 1, "boards": 1, "tasks": 1}
+    assert MemoryUserRepository(restored).get_by_username(None, "alice").id == user.id
+    assert [b.id for b in MemoryBoardRepository(restored).get_public_boards(None)] == [board.id]
+    loaded = restored_tasks.get(None, task.id)
+    assert loaded.status == StatusEnum.todo and loaded.due_date == datetime(2030, 1, 1)
+    assert [row.task_id for row in restored_tasks.deleted_since(None, board.id, datetime.min)] == [deleted.id]
+    # Id tiếp tục sau snapshot
+    assert restored_tasks.create(None, obj_in={"title": "c", "board_id": board.id}).id == deleted.id + 1
+
+
+def test_get_repositories():
+    assert get_repositories("memory").tasks is memory_task_repository
+    assert get_repositories("sql").tasks is task_repository
+    with pytest.raises(ValueError):
+        get_repositories("mongo")
@@ -0,0 +1,68 @@
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import event
+
+from app.core.permissions import PermissionResolver
+from app.database.models import User
+
+
+def test_resolver_memoizes_boards(db, user, board):
+    owner = db.get(User, user[0]["id"])
+    resolver = PermissionResolver(db, owner)
+    engine = db.get_bind()
+    statements = []
+
+    def on_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", on_execute)
+    try:
+        first = resolver.require_board(board["id"], "write")
+        second = resolver.require_board(board["id"], "delete")
+    finally:
+        event.remove(engine, "before_cursor_execute", on_execute)
+    assert first is second
+    assert len([s for s in statements if "FROM boards" in s]) == 1
+
+
+def test_resolver_missing_board_is_404(db, user):
+    resolver = PermissionResolver(db, db.get(User, user[0]["id"]))
+    with pytest.raises(HTTPException) as exc:
+        resolver.require_board(999999)
+    assert exc.value.status_code == 404
+    with pytest.raises(HTTPException) as exc:
+        resolver.require_task(999999)
+    assert exc.value.status_code == 404
+
+
+def test_resolver_public_board_is_read_only(db, make_user, board):
+    other = db.get(User, make_user()[0]["id"])
+    resolver = PermissionResolver(db, other)
+    assert resolver.require_board(board["id"]).id == board["id"]
+    with pytest.raises(HTTPException) as exc:
+        resolver.require_board(board["id"], "write")
+    assert exc.value.status_code == 403
+
+    anonymous = PermissionResolver(db, None)
+    assert anonymous.can_access(resolver.get_board(board["id"]))
+    assert not anonymous.can_access(resolver.get_board(board["id"]), "write")
+
+
+def test_private_board_forbidden_for_other_users(client, headers, make_user, admin_headers):
+    created = client.post("/boards/", json={"name": "Private", "is_public": False}, headers=headers).json()
+    other_headers = make_user()[1]
+    assert client.get(f"/boards/{created['id']}", headers=other_headers).status_code == 403
+    assert client.put(f"/boards/{created['id']}", json={"name": "X"}, headers=other_headers).status_code == 403
+    assert client.get(f"/boards/{created['id']}").status_code == 403
+    # Admin có full access
+    assert client.get(f"/boards/{created['id']}", headers=admin_headers).status_code == 200
+
+
+def test_task_routes_check_board_permission(client, make_user, make_task):
+    task = make_task()
+    other_headers = make_user()[1]
+    # Board public: đọc được nhưng không sửa được
+    assert client.get(f"/tasks/{task['id']}", headers=other_headers).status_code == 200
+    assert client.put(f"/tasks/{task['id']}", json={"title": "X"}, headers=other_headers).status_code == 403
+    assert client.delete(f"/tasks/{task['id']}", headers=other_headers).status_code == 403
+    assert client.get("/tasks/999999", headers=other_headers).status_code == 404
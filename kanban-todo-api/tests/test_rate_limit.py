@@ -0,0 +1,117 @@
+import sqlite3
+import time
+
+import pytest
+
+from app.core.rate_limit import (
+    MAX_RETRY_AFTER_SECONDS, LoginCapacityExceeded, LoginRateLimiter, MemoryRateLimitStore, RateLimitExceeded,
+    RateLimitStore, SQLiteRateLimitStore, login_rate_limiter
+)
+
+
+@pytest.mark.parametrize("backend", ["memory", "sqlite"])
+def test_bucket_allows_burst_then_refuses(backend, tmp_path):
+    store = MemoryRateLimitStore() if backend == "memory" else SQLiteRateLimitStore(str(tmp_path / "rate_limit.db"))
+    assert [store.take("k", capacity=3, refill_rate=1 / 60) for _ in range(3)] == [0.0, 0.0, 0.0]
+    retry_after = store.take("k", capacity=3, refill_rate=1 / 60)
+    assert 0 < retry_after <= 60
+    # Bucket khác không bị ảnh hưởng
+    assert store.take("other", capacity=3, refill_rate=1 / 60) == 0.0
+
+
+def test_sqlite_buckets_are_shared_between_stores(tmp_path):
+    path = str(tmp_path / "rate_limit.db")
+    first, second = SQLiteRateLimitStore(path), SQLiteRateLimitStore(path)
+    assert first.take("k", capacity=1, refill_rate=0.01) == 0.0
+    assert second.take("k", capacity=1, refill_rate=0.01) > 0
+
+
+def test_store_interface_is_abstract():
+    class Incomplete(RateLimitStore):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_sqlite_store_prunes_refilled_buckets(tmp_path):
+    path = str(tmp_path / "rate_limit.db")
+    store = SQLiteRateLimitStore(path, prune_interval=0)
+    store.take("fast", capacity=1, refill_rate=1000)  # Đầy lại sau 1ms
+    store.take("slow", capacity=1, refill_rate=1 / 60)
+    time.sleep(0.01)
+    store.take("other", capacity=5, refill_rate=1 / 60)
+    with sqlite3.connect(path) as conn:
+        keys = {row[0] for row in conn.execute("SELECT key FROM rate_limit_buckets")}
+    assert keys == {"slow", "other"}
+    # Bucket chưa đầy vẫn giữ số token
+    assert store.take("slow", capacity=1, refill_rate=1 / 60) > 0
+
+
+def test_memory_store_evicts_least_recently_used_bucket():
+    # IP bucket (burst 20) và username bucket (burst 5) dùng chung một store đã đầy
+    store = MemoryRateLimitStore(max_keys=3)
+    limiter = LoginRateLimiter(store, user_burst=5, user_per_minute=1, ip_burst=20, ip_per_minute=1,
+                               max_concurrent_verifications=1)
+    for _ in range(10):
+        store.take("login:ip:1.2.3.4", limiter.ip_burst, limiter.ip_rate)
+    for i in range(10):
+        # Username mới mỗi lần: store luôn vượt max_keys, IP bucket vẫn được dùng nên không bị bỏ
+        limiter.check(f"user{i}", "1.2.3.4")
+        assert len(store._buckets) <= 3
+    # IP bucket không bị reset về burst: 20 - 10 - 10 = 0 token
+    with pytest.raises(RateLimitExceeded):
+        limiter.check("someone", "1.2.3.4")
+    assert "login:user:user0" not in store._buckets
+
+
+def test_limiter_checks_username_case_insensitive():
+    limiter = LoginRateLimiter(MemoryRateLimitStore(), 2, 1, 100, 100, 1)
+    limiter.check("Alice", "1.2.3.4")
+    limiter.check("alice", "5.6.7.8")
+    with pytest.raises(RateLimitExceeded):
+        limiter.check("ALICE ", "9.9.9.9")
+
+
+def test_limiter_rejects_zero_rates():
+    with pytest.raises(ValueError):
+        LoginRateLimiter(MemoryRateLimitStore(), 5, 0, 20, 60, 1)
+    with pytest.raises(ValueError):
+        LoginRateLimiter(MemoryRateLimitStore(), 5, 10, 20, 0, 1)
+
+
+def test_retry_after_is_capped():
+    assert RateLimitExceeded(float("inf")).retry_after == MAX_RETRY_AFTER_SECONDS
+
+
+def test_verification_slots_are_bounded():
+    limiter = LoginRateLimiter(MemoryRateLimitStore(), 5, 5, 5, 5, 1)
+    with limiter.verification_slot():
+        with pytest.raises(LoginCapacityExceeded):
+            with limiter.verification_slot():
+                pass
+    with limiter.verification_slot():
+        pass
+
+
+def test_login_returns_429_after_burst(client, make_user, monkeypatch):
+    user, _, _ = make_user()
+    monkeypatch.setattr(login_rate_limiter, "store", MemoryRateLimitStore())
+    monkeypatch.setattr(login_rate_limiter, "user_burst", 2)
+    statuses = [
+        client.post("/auth/login-json", json={"username": user["username"], "password": "wrong"}).status_code
+        for _ in range(3)
+    ]
+    assert statuses == [401, 401, 429]
+    response = client.post("/auth/login-json", json={"username": user["username"], "password": "secret123"})
+    assert response.status_code == 429
+    assert int(response.headers["retry-after"]) >= 1
+
+
+def test_login_returns_503_when_verifications_full(client, make_user, monkeypatch):
+    user, _, _ = make_user()
+    limiter = LoginRateLimiter(MemoryRateLimitStore(), 5, 5, 5, 5, 1)
+    monkeypatch.setattr("app.routers.auth.login_rate_limiter", limiter)
+    with limiter.verification_slot():
+        response = client.post("/auth/login-json", json={"username": user["username"], "password": "secret123"})
+    assert response.status_code == 503
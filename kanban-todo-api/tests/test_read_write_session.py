@@ -0,0 +1,93 @@
+import pytest
+from sqlalchemy import event, insert, select, text, update
+from sqlalchemy.exc import OperationalError
+
+from app.database import Base, SessionLocal
+from app.database.connection import ReadWriteSession, create_database_engine, engine, read_engine
+from app.database.models import Board, User
+
+
+@pytest.fixture
+def engines(tmp_path):
+    """Writer (một kết nối) + reader query_only trên database riêng, như SessionLocal khi sqlite_tuned"""
+    url = f"sqlite:///{tmp_path / 'rw.db'}"
+    writer = create_database_engine(url, pool_size=1, role="writer")
+    reader = create_database_engine(url, pool_size=2, role="reader")
+    Base.metadata.create_all(writer)
+    with writer.begin() as conn:
+        conn.execute(insert(User).values(id=1, username="alice", password_hash="x", role="user", is_active=True))
+    used = []
+    for name, bound in (("writer", writer), ("reader", reader)):
+        event.listen(bound, "before_cursor_execute", lambda *args, name=name: used.append(name))
+    yield writer, reader, used
+    writer.dispose()
+    reader.dispose()
+
+
+def test_app_session_is_split():
+    # Mặc định SQLITE_TUNED=true với database file
+    session = SessionLocal()
+    try:
+        assert isinstance(session, ReadWriteSession)
+        assert session.bind is engine and session.read_bind is read_engine
+        assert engine is not read_engine
+    finally:
+        session.close()
+
+
+def test_reads_go_to_reader(engines):
+    writer, reader, used = engines
+    with ReadWriteSession(bind=writer, read_bind=reader) as db:
+        assert db.get(User, 1).username == "alice"
+        assert db.scalar(select(User.username)) == "alice"
+    assert used and set(used) == {"reader"}
+
+
+def test_writes_and_later_reads_go_to_writer(engines):
+    writer, reader, used = engines
+    with ReadWriteSession(bind=writer, read_bind=reader) as db:
+        db.add(Board(name="Board", owner_id=1))
+        db.flush()
+        assert used[-1] == "writer"
+        # Sau lần ghi đầu tiên, đọc trong cùng transaction thấy dữ liệu chưa commit
+        del used[:]
+        assert db.scalar(select(Board.name)) == "Board"
+        assert set(used) == {"writer"}
+        db.commit()
+
+        # Transaction mới: đọc lại qua reader
+        del used[:]
+        assert db.scalar(select(Board.name)) == "Board"
+        assert set(used) == {"reader"}
+
+
+def test_flushing_changes_to_loaded_rows_goes_to_writer(engines):
+    writer, reader, used = engines
+    with ReadWriteSession(bind=writer, read_bind=reader) as db:
+        user = db.get(User, 1)
+        assert set(used) == {"reader"}
+        del used[:]
+        user.full_name = "Alice"
+        db.flush()
+        assert used and set(used) == {"writer"}
+        db.commit()
+    with writer.connect() as conn:
+        assert conn.scalar(select(User.full_name)) == "Alice"
+
+
+def test_core_dml_goes_to_writer(engines):
+    writer, reader, used = engines
+    with ReadWriteSession(bind=writer, read_bind=reader) as db:
+        db.execute(update(User).where(User.id == 1).values(full_name="Alice"))
+        assert set(used) == {"writer"}
+        db.rollback()
+        del used[:]
+        assert db.scalar(select(User.full_name)) is None
+        assert set(used) == {"reader"}
+
+
+def test_reader_is_query_only(engines):
+    _, reader, _ = engines
+    with reader.connect() as conn:
+        with pytest.raises(OperationalError):
+            conn.execute(text("UPDATE users SET full_name = 'x'"))
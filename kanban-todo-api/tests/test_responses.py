@@ -0,0 +1,82 @@
+import json
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from pydantic import ValidationError
+
+from app.core.responses import FastJSONResponse, dump_list, json_response, list_response
+from app.schemas.board import BoardCreate
+from app.schemas.task import PriorityEnum, StatusEnum, TaskCreate, TaskResponse, task_list_adapter
+
+
+def sample_task(**fields) -> TaskResponse:
+    now = datetime(2024, 1, 2, 3, 4, 5)
+    data = {
+        "id": 1, "board_id": 1, "title": "Task", "description": None, "status": StatusEnum.todo,
+        "priority": PriorityEnum.high, "position": 0, "assigned_to": None, "due_date": None,
+        "version": 1, "created_at": now, "updated_at": now,
+    }
+    return TaskResponse(**{**data, **fields})
+
+
+def test_fast_json_response_matches_model_dump_json():
+    task = sample_task()
+    response = json_response(task, status_code=201, headers={"ETag": '"task-1-1"'})
+    assert isinstance(response, FastJSONResponse)
+    assert response.status_code == 201
+    assert response.headers["ETag"] == '"task-1-1"'
+    assert response.body == task.model_dump_json().encode()
+
+
+def test_fast_json_response_encodes_datetimes_and_enums():
+    body = json.loads(FastJSONResponse({"at": datetime(2024, 1, 2), "status": StatusEnum.done}).body)
+    assert body == {"at": "2024-01-02T00:00:00", "status": "done"}
+
+
+def test_routes_return_prebuilt_models(client, headers, board):
+    response = client.post("/tasks/", json={"title": "Fast", "board_id": board["id"], "priority": "high"}, headers=headers)
+    assert response.status_code == 201
+    assert response.headers["content-type"] == "application/json"
+    body = response.json()
+    # Response khớp response_model dù FastAPI không validate lại
+    assert TaskResponse.model_validate(body).title == "Fast"
+    assert body["priority"] == "high"
+    assert body["status"] == "todo"
+
+
+def test_login_returns_login_response_schema(client, user):
+    _, _, tokens = user
+    assert set(tokens) == {"access_token", "refresh_token", "token_type", "user"}
+    assert tokens["token_type"] == "bearer"
+    assert "password_hash" not in tokens["user"]
+
+
+def test_dump_list_validates_attributes_and_rows():
+    task = sample_task()
+    # ORM object hay row tuple đều đọc qua from_attributes
+    as_object = SimpleNamespace(**task.model_dump())
+    body = json.loads(dump_list(task_list_adapter, [as_object, as_object]))
+    assert body == [json.loads(task.model_dump_json())] * 2
+
+    response = list_response(task_list_adapter, [], headers={"ETag": 'W/"x"'})
+    assert response.body == b"[]"
+    assert response.media_type == "application/json"
+
+
+def test_dump_list_rejects_incomplete_rows():
+    with pytest.raises(ValidationError):
+        dump_list(task_list_adapter, [SimpleNamespace(id=1, title="Task")])
+
+
+def test_schema_validators():
+    assert BoardCreate(name="  Board  ").name == "Board"
+    with pytest.raises(ValidationError):
+        BoardCreate(name="   ")
+    with pytest.raises(ValidationError):
+        TaskCreate(title="x" * 201, board_id=1)
+
+
+def test_invalid_payload_is_422(client, headers):
+    assert client.post("/boards/", json={"name": ""}, headers=headers).status_code == 422
+    assert client.post("/auth/register", json={"username": "ab", "password": "secret123"}).status_code == 422
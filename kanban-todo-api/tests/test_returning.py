@@ -0,0 +1,93 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import event, insert
+from sqlalchemy.orm.exc import StaleDataError
+
+from app.database import Base, board_version, task_repository
+from app.database.connection import create_database_engine, session_for
+from app.database.models import Board, Task, User
+
+
+@pytest.fixture
+def engine(tmp_path):
+    """Database riêng với một board và một task, đếm các câu SQL gửi đi"""
+    engine = create_database_engine(f"sqlite:///{tmp_path / 'returning.db'}")
+    Base.metadata.create_all(engine)
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        conn.execute(insert(User).values(id=1, username="alice", password_hash="x", role="user", is_active=True))
+        conn.execute(insert(Board).values(id=1, name="Board", owner_id=1, revision=1, created_at=now, updated_at=now))
+        conn.execute(insert(Task).values(id=1, title="Task", board_id=1, position=0, created_at=now, updated_at=now))
+    engine.statements = []
+    event.listen(engine, "before_cursor_execute", lambda conn, cursor, statement, *args: engine.statements.append(statement))
+    yield engine
+    engine.dispose()
+
+
+def selects_after(engine, start: int):
+    return [statement for statement in engine.statements[start:] if statement.lstrip().upper().startswith("SELECT")]
+
+
+def test_task_write_reads_revision_from_update(engine):
+    with session_for(engine) as db:
+        board = db.get(Board, 1)
+        task = task_repository.update(db, db_obj=db.get(Task, 1), obj_in={"title": "Renamed"})
+        assert any("RETURNING" in statement for statement in engine.statements)
+
+        start = len(engine.statements)
+        assert board.revision == 2
+        assert task.version == 2
+        board_version(board)
+        assert selects_after(engine, start) == []
+        db.commit()
+
+
+def test_board_write_reads_revision_from_update(engine):
+    with session_for(engine) as db:
+        board = db.get(Board, 1)
+        board.name = "Renamed"
+        db.flush()
+
+        start = len(engine.statements)
+        assert board.revision == 2
+        assert board.version == 2
+        assert selects_after(engine, start) == []
+        db.commit()
+
+
+def test_without_update_returning_revision_is_selected(engine):
+    engine.dialect.update_returning = False
+    with session_for(engine) as db:
+        board = db.get(Board, 1)
+        task_repository.update(db, db_obj=db.get(Task, 1), obj_in={"title": "Renamed"})
+
+        start = len(engine.statements)
+        assert board.revision == 2
+        assert len(selects_after(engine, start)) == 1
+        db.commit()
+
+
+def test_concurrent_board_update_raises_stale_data(engine):
+    first, second = session_for(engine), session_for(engine)
+    try:
+        first.get(Board, 1).name = "First"
+        second_board = second.get(Board, 1)
+        first.commit()
+
+        # Task change chỉ tăng revision, không tăng Board.version
+        with session_for(engine) as db:
+            task_repository.update(db, db_obj=db.get(Task, 1), obj_in={"title": "Moved"})
+            db.commit()
+
+        second_board.name = "Second"
+        with pytest.raises(StaleDataError):
+            second.flush()
+        second.rollback()
+    finally:
+        first.close()
+        second.close()
+
+    with session_for(engine) as db:
+        board = db.get(Board, 1)
+        assert (board.name, board.version, board.revision) == ("First", 2, 3)
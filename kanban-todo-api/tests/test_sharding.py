@@ -0,0 +1,118 @@
+import json
+
+import pytest
+from sqlalchemy import insert, select
+
+from app.database import Base
+from app.database.connection import DEFAULT_SHARD, create_database_engine, sharded_metadata
+from app.database.models import Board, Task
+from app.database.sharding import ShardRouter, board_ids_in
+
+
+@pytest.fixture
+def router(tmp_path):
+    """Directory (database chính) + một shard, không đụng tới SessionLocal của app"""
+    directory = create_database_engine(f"sqlite:///{tmp_path / 'main.db'}")
+    shard = create_database_engine(f"sqlite:///{tmp_path / 'shard1.db'}")
+    Base.metadata.create_all(directory)
+    sharded_metadata().create_all(shard)
+    router = ShardRouter(directory, {DEFAULT_SHARD: directory, "shard1": shard}, cache_seconds=60, id_block_size=10)
+    yield router
+    directory.dispose()
+    shard.dispose()
+
+
+def test_board_ids_in_where_clause():
+    assert board_ids_in(select(Task).where(Task.board_id == 3)) == {3}
+    assert board_ids_in(select(Task).where(Task.board_id.in_([1, 2]), Task.title == "x")) == {1, 2}
+    assert board_ids_in(select(Board).where(Board.id == 5)) == {5}
+    assert board_ids_in(select(Task).where(Task.id == 5)) is None
+    assert board_ids_in(select(Task)) is None
+
+
+def test_hash_shard_is_stable(router):
+    shards = {router.hash_shard(board_id) for board_id in range(1, 50)}
+    assert shards == {DEFAULT_SHARD, "shard1"}
+    assert router.hash_shard(7) == router.hash_shard(7)
+
+
+def test_directory_lookup(router):
+    # Board không có trong directory: có từ trước khi bật sharding, nằm ở database chính
+    assert router.shard_for_board(1) == DEFAULT_SHARD
+    router.forget(1)
+    with router.directory.begin() as conn:
+        router.set_board_shard(conn, 1, "shard1")
+    assert router.shard_for_board(1) == "shard1"
+
+    # Directory đổi nhưng process vẫn dùng cache tới khi hết hạn hoặc forget()
+    with router.directory.begin() as conn:
+        router.set_board_shard(conn, 1, DEFAULT_SHARD)
+    assert router.shard_for_board(1) == "shard1"
+    router.forget(1)
+    assert router.shard_for_board(1) == DEFAULT_SHARD
+
+
+def test_global_ids_start_after_existing_rows(router):
+    with router.shards["shard1"].begin() as conn:
+        conn.execute(insert(Board.__table__).values(id=40, name="Old", is_public=False, owner_id=1, revision=1))
+    ids = [router.next_id("boards") for _ in range(25)]
+    assert ids == list(range(41, 66))
+
+    # Process khác nhận block riêng, không trùng id
+    other = ShardRouter(router.directory, router.shards, cache_seconds=60, id_block_size=10)
+    assert other.next_id("boards") == 71
+
+
+def test_statement_routing(router):
+    with router.directory.begin() as conn:
+        router.set_board_shard(conn, 2, "shard1")
+    assert router._shards_for_statement(select(Task).where(Task.board_id == 2)) == ["shard1"]
+    assert router._shards_for_statement(select(Task).where(Task.board_id.in_([1, 2]))) == [DEFAULT_SHARD, "shard1"]
+    assert router._shards_for_statement(select(Task)) == [DEFAULT_SHARD, "shard1"]
+    with pytest.raises(ValueError):
+        router.shard_chooser(None, None, clause=select(Task))
+
+
+def test_sharded_app_end_to_end(run_app, tmp_path):
+    shards = json.dumps([f"sqlite:///{tmp_path / 'shard1.db'}", f"sqlite:///{tmp_path / 'shard2.db'}"])
+    output = run_app("""
+        import sqlite3
+        from fastapi.testclient import TestClient
+        import main
+
+        with TestClient(main.app) as client:
+            client.post("/auth/register", json={"username": "sharded", "password": "secret123"})
+            token = client.post("/auth/login-json", json={"username": "sharded", "password": "secret123"}).json()["access_token"]
+            headers = {"Authorization": f"Bearer " + token}
+            boards = [client.post("/boards/", json={"name": f"B{i}", "is_public": True}, headers=headers).json() for i in range(6)]
+            for board in boards:
+                client.post("/tasks/", json={"title": f"T{board['id']}", "board_id": board["id"]}, headers=headers)
+
+            listing = client.get("/boards/", headers=headers).json()
+            print("listing ids sorted:", [b["id"] for b in listing] == sorted(b["id"] for b in boards))
+            print("tasks counted:", all(b["tasks_count"] == 1 for b in listing))
+            print("owner names:", {b["owner_name"] for b in listing})
+            detail = client.get(f"/boards/{boards[0]['id']}", headers=headers).json()
+            print("detail tasks:", [t["title"] for t in detail["tasks"]])
+            print("delete:", client.delete(f"/boards/{boards[1]['id']}", headers=headers).status_code)
+            print("deleted board:", client.get(f"/boards/{boards[1]['id']}", headers=headers).status_code)
+
+        placed = {}
+        for name in ("app.db", "shard1.db", "shard2.db"):
+            placed[name] = sorted(row[0] for row in sqlite3.connect(name).execute("SELECT id FROM boards"))
+        files = {"default": "app.db", "shard1": "shard1.db", "shard2": "shard2.db"}
+        print("placed by hash:", all(
+            board_id in placed[files[main.shard_router.hash_shard(board_id)]] for ids in placed.values() for board_id in ids
+        ))
+        print("boards placed:", sum(len(ids) for ids in placed.values()))
+        print("users only in main:", [sqlite3.connect(n).execute("SELECT name FROM sqlite_master WHERE name='users'").fetchone() is not None for n in placed])
+    """, DATABASE_SHARDS=shards, SQLITE_TUNED="false")
+    assert "listing ids sorted: True" in output
+    assert "tasks counted: True" in output
+    assert "owner names: {'sharded'}" in output
+    assert "detail tasks: ['T" in output
+    assert "delete: 200" in output
+    assert "deleted board: 404" in output
+    assert "placed by hash: True" in output
+    assert "boards placed: 5" in output
+    assert "users only in main: [True, False, False]" in output
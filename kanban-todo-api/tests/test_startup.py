@@ -0,0 +1,45 @@
+from app.database import warm_up_pool
+
+
+def test_import_main_has_no_side_effects(run_app):
+    output = run_app("""
+        import os, sys
+        import main
+        print("db exists:", os.path.exists("app.db"))
+        print("jose.jwt loaded:", "jose.jwt" in sys.modules)
+    """)
+    assert "db exists: False" in output
+    assert "jose.jwt loaded: False" in output
+
+
+def test_lifespan_creates_tables_in_development(run_app):
+    output = run_app("""
+        import sqlite3
+        from fastapi.testclient import TestClient
+        import main
+        with TestClient(main.app) as client:
+            print("health:", client.get("/health").status_code)
+        tables = {row[0] for row in sqlite3.connect("app.db").execute("SELECT name FROM sqlite_master WHERE type='table'")}
+        print("users table:", "users" in tables)
+    """, DATABASE_POOL_WARMUP="2")
+    assert "health: 200" in output
+    assert "users table: True" in output
+    assert "Database pool warmed up with 2 connections" in output
+
+
+def test_lifespan_skips_create_all_outside_development(run_app):
+    output = run_app("""
+        import sqlite3
+        from fastapi.testclient import TestClient
+        import main
+        with TestClient(main.app):
+            pass
+        tables = [row[0] for row in sqlite3.connect("app.db").execute("SELECT name FROM sqlite_master WHERE type='table' AND name='users'")]
+        print("users table:", bool(tables))
+    """, ENVIRONMENT="production")
+    assert "users table: False" in output
+
+
+def test_warm_up_pool_opens_connections(client):
+    assert warm_up_pool(1) == 1
+    assert warm_up_pool(0) == 0
@@ -0,0 +1,61 @@
+from datetime import datetime, timedelta
+
+from app.core.stats import BoardStatsCache, board_stats_cache
+
+
+def test_board_stats_counts(client, headers, user, board, make_task):
+    yesterday = (datetime.utcnow() - timedelta(days=1)).isoformat()
+    make_task(priority="high", due_date=yesterday)
+    make_task(priority="high", status="done", due_date=yesterday)  # Done thì không tính overdue
+    make_task(priority="low", assigned_to=user[0]["id"])
+
+    stats = client.get(f"/boards/{board['id']}/stats", headers=headers).json()
+    assert stats["total"] == 3
+    assert stats["by_status"] == {"todo": 2, "in_progress": 0, "done": 1}
+    assert stats["by_priority"] == {"low": 1, "medium": 0, "high": 2}
+    assert stats["assigned"] == 1 and stats["unassigned"] == 2
+    assert stats["overdue"] == 1
+
+
+def test_multi_board_stats_keep_request_order(client, headers, board, make_task):
+    make_task()
+    other = client.post("/boards/", json={"name": "Empty"}, headers=headers).json()
+    response = client.get("/boards/stats", params=[("board_id", other["id"]), ("board_id", board["id"])], headers=headers)
+    assert response.status_code == 200
+    assert [(s["board_id"], s["total"]) for s in response.json()] == [(other["id"], 0), (board["id"], 1)]
+
+
+def test_stats_errors(client, headers, make_user):
+    assert client.get("/boards/stats", headers=headers).status_code == 400
+    too_many = [("board_id", i) for i in range(1, 102)]
+    assert client.get("/boards/stats", params=too_many, headers=headers).status_code == 400
+
+    private = client.post("/boards/", json={"name": "Private", "is_public": False}, headers=headers).json()
+    other_headers = make_user()[1]
+    assert client.get(f"/boards/{private['id']}/stats", headers=other_headers).status_code == 403
+    assert client.get("/boards/999999/stats", headers=headers).status_code == 404
+
+
+def test_stats_etag_and_cache(client, headers, board, make_task):
+    first = client.get(f"/boards/{board['id']}/stats", headers=headers)
+    etag = first.headers["ETag"]
+    assert client.get(f"/boards/{board['id']}/stats", headers={**headers, "If-None-Match": etag}).status_code == 304
+
+    hits = board_stats_cache.stats()["hits"]
+    client.get("/boards/stats", params={"board_id": board["id"]}, headers=headers)
+    assert board_stats_cache.stats()["hits"] == hits + 1
+
+    # Ghi task -> board version đổi -> ETag và stats mới
+    make_task()
+    changed = client.get(f"/boards/{board['id']}/stats", headers={**headers, "If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.json()["total"] == 1
+
+
+def test_stats_cache_is_lru():
+    cache = BoardStatsCache(max_entries=2)
+    for key in ("a", "b", "c"):
+        cache.set((key, 0), key)
+    assert cache.get(("a", 0)) is None
+    assert cache.get(("c", 0)) == "c"
+    assert cache.stats() == {"entries": 2, "hits": 1, "misses": 1}
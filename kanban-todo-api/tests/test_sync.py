@@ -0,0 +1,86 @@
+from datetime import datetime, timedelta
+
+from app.core.config import settings
+from app.core.sync import SyncToken, _to_us, parse_sync_token
+
+
+def changes(client, board_id, since=None):
+    response = client.get(f"/boards/{board_id}/changes", params={"since": since} if since else {})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def days_ago(days: int) -> int:
+    return _to_us(datetime.utcnow() - timedelta(days=days))
+
+
+def test_delta_sync_returns_changes_and_tombstones(client, headers, board, make_task):
+    kept = make_task(title="Kept")
+    removed = make_task(title="Removed")
+    first = changes(client, board["id"])
+    assert first["full"] is True
+    assert {task["id"] for task in first["tasks"]} == {kept["id"], removed["id"]}
+
+    client.delete(f"/tasks/{removed['id']}", headers=headers)
+    client.put(f"/tasks/{kept['id']}", json={"title": "Edited"}, headers=headers)
+    delta = changes(client, board["id"], first["sync_token"])
+    assert delta["full"] is False
+    assert [task["title"] for task in delta["tasks"]] == ["Edited"]
+    assert delta["deleted_task_ids"] == [removed["id"]]
+
+
+def test_unchanged_board_refreshes_sync_time(client, board):
+    first = changes(client, board["id"])
+    again = changes(client, board["id"], first["sync_token"])
+    assert again["full"] is False
+    assert again["tasks"] == [] and again["deleted_task_ids"] == []
+    assert parse_sync_token(again["sync_token"]).synced_at >= parse_sync_token(first["sync_token"]).synced_at
+
+
+def test_idle_board_older_than_retention_is_not_full_sync(client, board, make_task):
+    make_task()
+    current = parse_sync_token(changes(client, board["id"])["sync_token"])
+    # Board không đổi từ rất lâu: mốc thay đổi cuối và lần sync cuối đều cũ hơn retention
+    old = days_ago(settings.sync_tombstone_retention_days + 10)
+    token = SyncToken(current.board_created, current.revision, old, old)
+    result = changes(client, board["id"], token.encode())
+    assert result["full"] is False
+    assert parse_sync_token(result["sync_token"]).synced_at > old
+
+
+def test_recent_sync_with_old_last_change_is_delta(client, board, make_task):
+    make_task()
+    current = parse_sync_token(changes(client, board["id"])["sync_token"])
+    make_task(title="New")
+    # Client sync hôm qua, thay đổi cuối nó thấy cũ hơn retention
+    token = SyncToken(current.board_created, current.revision, days_ago(settings.sync_tombstone_retention_days + 10), days_ago(1))
+    result = changes(client, board["id"], token.encode())
+    assert result["full"] is False
+
+
+def test_sync_older_than_retention_is_full(client, board, make_task):
+    make_task()
+    current = parse_sync_token(changes(client, board["id"])["sync_token"])
+    make_task(title="New")
+    old = days_ago(settings.sync_tombstone_retention_days + 1)
+    result = changes(client, board["id"], SyncToken(current.board_created, current.revision, old, old).encode())
+    assert result["full"] is True
+    assert len(result["tasks"]) == 2
+
+
+def test_token_of_other_board_is_full_sync(client, board):
+    current = parse_sync_token(changes(client, board["id"])["sync_token"])
+    token = SyncToken(current.board_created + 1, current.revision, current.timestamp, current.synced_at)
+    assert changes(client, board["id"], token.encode())["full"] is True
+
+
+def test_parse_sync_token():
+    assert parse_sync_token("1.2.3.4") == SyncToken(1, 2, 3, 4)
+    # Token cũ 3 phần: thời điểm sync = mốc thay đổi cuối
+    assert parse_sync_token("1.2.3") == SyncToken(1, 2, 3, 3)
+    assert parse_sync_token("1.2") is None
+    assert parse_sync_token("x.y.z") is None
+
+
+def test_invalid_token_is_400(client, board):
+    assert client.get(f"/boards/{board['id']}/changes", params={"since": "nope"}).status_code == 400
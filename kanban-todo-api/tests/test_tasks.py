@@ -0,0 +1,83 @@
+from datetime import datetime, timedelta
+
+from app.database import task_repository
+from app.schemas.task import PriorityEnum, StatusEnum
+
+
+def test_task_list_filters_in_sql(client, headers, board, make_task, db):
+    high = make_task(title="High", priority="high")
+    make_task(title="Low", priority="low", status="done")
+
+    def titles(**params):
+        response = client.get("/tasks/", params={"board_id": board["id"], **params}, headers=headers)
+        return [task["title"] for task in response.json()]
+
+    assert titles() == ["High", "Low"]
+    assert titles(priority="high") == ["High"]
+    assert titles(status="done") == ["Low"]
+    assert titles(priority="unknown") == []
+    assert client.get("/tasks/", params={"board_id": board["id"], "status": "nope"}, headers=headers).status_code == 400
+
+    rows = task_repository.list_rows(db, board_id=board["id"], status=StatusEnum.todo, priority=PriorityEnum.high)
+    assert [row.id for row in rows] == [high["id"]]
+
+
+def at(**delta) -> str:
+    return (datetime.utcnow() + timedelta(**delta)).isoformat()
+
+
+def test_due_date_is_writable_and_clearable(client, headers, make_task):
+    task = make_task(due_date="2030-01-01T07:00:00+07:00")
+    # Due date có timezone được lưu theo UTC
+    assert task["due_date"] == "2030-01-01T00:00:00"
+    cleared = client.put(f"/tasks/{task['id']}", json={"due_date": None}, headers=headers).json()
+    assert cleared["due_date"] is None
+
+
+def test_overdue_and_upcoming(client, headers, board, make_task):
+    late = make_task(title="Late", due_date=at(days=-2))
+    later = make_task(title="Later", due_date=at(days=-1))
+    make_task(title="Done", status="done", due_date=at(days=-3))
+    soon = make_task(title="Soon", due_date=at(days=2))
+    make_task(title="Far", due_date=at(days=30))
+    make_task(title="No due date")
+
+    params = {"board_id": board["id"]}
+    overdue = client.get("/tasks/overdue", params=params, headers=headers).json()
+    assert [task["id"] for task in overdue] == [late["id"], later["id"]]
+    upcoming = client.get("/tasks/upcoming", params={**params, "days": 7}, headers=headers).json()
+    assert [task["id"] for task in upcoming] == [soon["id"]]
+
+
+def test_assigned_to_me_filter(client, headers, user, board, make_task):
+    mine = make_task(due_date=at(days=-1), assigned_to=user[0]["id"])
+    make_task(due_date=at(days=-1))
+    overdue = client.get("/tasks/overdue", params={"board_id": board["id"], "assigned_to_me": True}, headers=headers).json()
+    assert [task["id"] for task in overdue] == [mine["id"]]
+
+
+def test_calendar_includes_done_tasks(client, headers, board, make_task):
+    done = make_task(status="done", due_date="2030-03-10T12:00:00")
+    todo = make_task(due_date="2030-03-20T12:00:00")
+    make_task(due_date="2030-04-02T12:00:00")
+    response = client.get("/tasks/calendar", params={
+        "board_id": board["id"], "start": "2030-03-01T00:00:00", "end": "2030-04-01T00:00:00",
+    }, headers=headers)
+    assert [task["id"] for task in response.json()] == [done["id"], todo["id"]]
+
+
+def test_calendar_rejects_invalid_range(client, headers):
+    def calendar(start, end):
+        return client.get("/tasks/calendar", params={"start": start, "end": end}, headers=headers).status_code
+
+    assert calendar("2030-03-02T00:00:00", "2030-03-01T00:00:00") == 400
+    assert calendar("2030-01-01T00:00:00", "2031-06-01T00:00:00") == 400
+
+
+def test_due_views_hide_other_users_private_boards(client, make_user):
+    owner_headers = make_user()[1]
+    private = client.post("/boards/", json={"name": "Private", "is_public": False}, headers=owner_headers).json()
+    client.post("/tasks/", json={"title": "Hidden", "board_id": private["id"], "due_date": at(days=-1)}, headers=owner_headers)
+    other_headers = make_user()[1]
+    overdue = client.get("/tasks/overdue", params={"board_id": private["id"]}, headers=other_headers).json()
+    assert overdue == []
@@ -0,0 +1,91 @@
+import pytest
+from fastapi import APIRouter, Depends, FastAPI, HTTPException, Request
+from fastapi.testclient import TestClient
+from sqlalchemy import event, func, insert, select
+
+from app.core.audit import AuditWriter
+from app.core.deps import UnitOfWorkRoute
+from app.database import Base, board_repository, get_db, task_repository
+from app.database.connection import create_database_engine, session_for
+from app.database.models import Board, Task, User
+
+
+@pytest.fixture
+def uow(tmp_path):
+    """
+    App nhỏ với UnitOfWorkRoute trên database riêng: get_db được override nhưng vẫn
+    để session trong request.state.db như get_db thật. Trả về (client, engine, commits, audit)
+    """
+    engine = create_database_engine(f"sqlite:///{tmp_path / 'uow.db'}")
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(User).values(id=1, username="alice", password_hash="x", role="user", is_active=True))
+    commits = []
+    event.listen(engine, "commit", lambda conn: commits.append(conn))
+    audit = AuditWriter(engine, flush_interval=1, batch_size=10, max_buffer=10)
+
+    def override_db(request: Request):
+        db = session_for(engine)
+        request.state.db = db
+        try:
+            yield db
+        finally:
+            db.close()
+
+    router = APIRouter(route_class=UnitOfWorkRoute)
+
+    @router.post("/boards")
+    def create_board(fail: bool = False, db=Depends(get_db)):
+        # Nhiều repository call, mỗi call chỉ flush
+        board = board_repository.create(db, obj_in={"name": "Board", "owner_id": 1})
+        for i in range(3):
+            task_repository.create(db, obj_in={"title": f"Task {i}", "board_id": board.id, "position": i})
+        audit.record("board.created", "board", board.id, db=db)
+        if fail:
+            raise HTTPException(status_code=409, detail="Conflict")
+        return {"id": board.id}
+
+    @router.post("/crash")
+    def crash(db=Depends(get_db)):
+        board_repository.create(db, obj_in={"name": "Crash", "owner_id": 1})
+        raise RuntimeError("boom")
+
+    app = FastAPI()
+    app.include_router(router)
+    app.dependency_overrides[get_db] = override_db
+    with TestClient(app, raise_server_exceptions=False) as client:
+        yield client, engine, commits, audit
+    engine.dispose()
+
+
+def count(engine, model) -> int:
+    with engine.connect() as conn:
+        return conn.execute(select(func.count()).select_from(model)).scalar_one()
+
+
+def test_one_commit_per_request(uow):
+    client, engine, commits, audit = uow
+    response = client.post("/boards")
+    assert response.status_code == 200
+    assert len(commits) == 1
+    assert count(engine, Board) == 1
+    assert count(engine, Task) == 3
+    # Audit entry chỉ vào buffer sau khi commit
+    assert audit.stats()["pending"] == 1
+
+
+def test_http_exception_rolls_back_flushed_writes(uow):
+    client, engine, commits, audit = uow
+    response = client.post("/boards", params={"fail": True})
+    assert response.status_code == 409
+    assert commits == []
+    assert count(engine, Board) == 0
+    assert count(engine, Task) == 0
+    assert audit.stats()["pending"] == 0
+
+
+def test_unhandled_error_rolls_back(uow):
+    client, engine, commits, _ = uow
+    assert client.post("/crash").status_code == 500
+    assert commits == []
+    assert count(engine, Board) == 0
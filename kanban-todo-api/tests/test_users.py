@@ -0,0 +1,24 @@
+from app.database import user_repository
+
+
+def test_user_list_projection_has_no_password_hash(client, headers, db, user):
+    response = client.get("/users/", headers=headers)
+    assert response.status_code == 200
+    users = response.json()
+    assert any(item["id"] == user[0]["id"] for item in users)
+    assert all("password_hash" not in item for item in users)
+
+    rows = user_repository.list_rows(db, limit=1000)
+    assert "password_hash" not in rows[0]._fields
+
+
+def test_user_list_paginates_in_sql(client, headers, make_user):
+    make_user()
+    page = client.get("/users/", params={"skip": 1, "limit": 1}, headers=headers).json()
+    everyone = client.get("/users/", params={"limit": 1000}, headers=headers).json()
+    assert page == everyone[1:2]
+
+
+def test_user_list_requires_authentication(client):
+    # HTTPBearer trả 403 khi thiếu header Authorization
+    assert client.get("/users/").status_code == 403